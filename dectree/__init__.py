@@ -1,4 +1,5 @@
 from .codegen import gen_code
-from .compiler import compile
+from .builder import build
+from .compiler import compile, dispose
 from .transpiler import transpile
 from .propfuncs import *
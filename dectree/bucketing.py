@@ -0,0 +1,131 @@
+"""
+Shared breakpoint bucketing of membership functions.
+
+All membership functions of ``dectree.propfuncs`` are piecewise linear
+functions of ``x`` whose pieces are separated by a few breakpoints. Gathering
+the breakpoints of all properties of a type into one sorted table splits the
+real axis into buckets: the open intervals between breakpoints, the
+breakpoints themselves, and NaN. Once the bucket of a value is located, the
+truth value of every property whose function is constant within that bucket
+is a table lookup.
+"""
+
+import ast
+import math
+from typing import Dict, List, Optional, Callable
+
+from .types import PropDef
+from .types import PropName
+from .types import TypeDef
+
+# Types with fewer bucketed properties are evaluated as usual,
+# as locating the bucket is not cheaper than a single comparison ladder
+MIN_BUCKETED_PROPS = 2
+
+
+class BucketTable:
+    """
+    The buckets of the properties of a type.
+
+    Given the sorted *breakpoints* p[0] < ... < p[k-1] and j, the number of
+    breakpoints less than x, the bucket of x is 2*j + 1 if x equals p[j],
+    2*k + 1 if x is NaN, and 2*j otherwise.
+
+    :param breakpoints: The sorted breakpoints
+    :param truths: Maps property names to their truth value in each of the
+        2*k + 2 buckets, None, if a property's function is not constant
+        within a bucket
+    """
+    __slots__ = ('breakpoints', 'truths')
+
+    def __init__(self,
+                 breakpoints: List[float],
+                 truths: Dict[PropName, List[Optional[float]]]):
+        self.breakpoints = breakpoints
+        self.truths = truths
+
+    @property
+    def num_buckets(self) -> int:
+        return 2 * len(self.breakpoints) + 2
+
+    def get_bucket(self, x: float) -> int:
+        if math.isnan(x):
+            return self.num_buckets - 1
+        j = sum(1 for p in self.breakpoints if p < x)
+        if j < len(self.breakpoints) and self.breakpoints[j] == x:
+            return 2 * j + 1
+        return 2 * j
+
+
+def get_bucket_table(type_def: TypeDef) -> Optional[BucketTable]:
+    """
+    Get the bucket table of the properties of a type.
+
+    :param type_def: The type definition
+    :return: The bucket table, or None if the type has less than two
+        properties with breakpoints
+    """
+    funcs = {}
+    breakpoints = set()
+    for prop_name, prop_def in type_def.items():
+        prop_breakpoints = _get_breakpoints(prop_def)
+        if prop_breakpoints:
+            funcs[prop_name] = _get_func(prop_def)
+            breakpoints.update(prop_breakpoints)
+    if len(funcs) < MIN_BUCKETED_PROPS:
+        return None
+
+    breakpoints = sorted(breakpoints)
+    samples = _get_bucket_samples(breakpoints)
+    truths = {}
+    for prop_name, func in funcs.items():
+        prop_truths = []
+        for bucket_samples in samples:
+            values = {float(func(x)) for x in bucket_samples}
+            prop_truths.append(values.pop() if len(values) == 1 else None)
+        truths[prop_name] = prop_truths
+    return BucketTable(breakpoints, truths)
+
+
+def _get_bucket_samples(breakpoints: List[float]) -> List[List[float]]:
+    # As functions are linear within each open interval,
+    # three values tell whether they are constant there
+    samples = [[breakpoints[0] - d for d in (3.0, 2.0, 1.0)]]
+    for p1, p2 in zip(breakpoints[:-1], breakpoints[1:]):
+        samples.append([p1])
+        samples.append([p1 + f * (p2 - p1) for f in (0.25, 0.5, 0.75)])
+    samples.append([breakpoints[-1]])
+    samples.append([breakpoints[-1] + d for d in (1.0, 2.0, 3.0)])
+    samples.append([math.nan])
+    return samples
+
+
+def _get_breakpoints(prop_def: PropDef) -> List[float]:
+    _, func_params, func_body_pattern = prop_def
+    func_body = func_body_pattern.format(**func_params)
+    names = {}
+    breakpoints = []
+    for node in ast.walk(ast.parse(func_body)):
+        if isinstance(node, ast.Assign):
+            names[node.targets[0].id] = _eval_const(node.value, names)
+        elif isinstance(node, ast.Compare):
+            if not isinstance(node.left, ast.Name) or node.left.id != 'x':
+                raise ValueError(f'Unsupported membership function:'
+                                 f' {func_body}')
+            breakpoints.append(_eval_const(node.comparators[0], names))
+    return breakpoints
+
+
+def _get_func(prop_def: PropDef) -> Callable[[float], float]:
+    _, func_params, func_body_pattern = prop_def
+    func_body = func_body_pattern.format(**func_params)
+    func_lines = ['def f(x):'] + [f'    {line}'
+                                  for line in func_body.split('\n')]
+    namespace = {}
+    exec('\n'.join(func_lines), namespace)
+    return namespace['f']
+
+
+def _eval_const(expr, names: Dict[str, float]) -> float:
+    code = compile(ast.Expression(body=expr), '<breakpoint>', 'eval')
+    return float(eval(code, {}, dict(names)))
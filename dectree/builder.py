@@ -0,0 +1,125 @@
+"""
+Ahead-of-time compilation of decision trees into extension modules.
+
+Deprecation note: the extension modules are built with ``numba.pycc``, which
+Numba has marked as pending deprecation since version 0.57 and will remove in
+a future release. ``build()`` raises an ``ImportError`` if the installed Numba
+no longer provides it. Applications that can afford JIT compilation should
+use ``dectree.compiler.compile()`` with a ``cache_dir`` instead.
+"""
+
+import os
+import os.path
+from io import StringIO
+from typing import Dict, Any, Optional
+
+from .compiler import _load_module_from_code
+from .config import CONFIG_NAME_ARRAYS
+from .config import CONFIG_NAME_FLOAT_TYPE
+from .config import CONFIG_NAME_FUNCTION_NAME
+from .config import CONFIG_NAME_NO_JIT
+from .config import CONFIG_NAME_PARALLEL
+from .config import CONFIG_NAME_PARAMETERIZE
+from .config import CONFIG_NAME_VECTORIZE
+from .config import FLOAT_TYPE_CHOICES
+from .config import VECTORIZE_FUNC
+from .config import get_config_value
+from .transpiler import transpile
+
+
+def build(src_file,
+          out_dir: Optional[str] = None,
+          module_name: Optional[str] = None,
+          **options: Dict[str, Any]) -> str:
+    """
+    Build an ahead-of-time (AOT) compiled extension module from the decision
+    tree in *src_file* using Numba's ``numba.pycc``. Importing and using the
+    extension module neither requires Numba nor involves any JIT compilation.
+
+    For each float type, i.e. ``float32`` and ``float64``, the extension
+    module exports a function ``<func_name>_<float_type>`` that takes one
+    contiguous 1-D array per input variable followed by one preallocated 1-D
+    array per output variable, in the order given by the
+    ``get_input_names()`` and ``get_output_names()`` functions of the
+    transpiled module. Input arrays have the input's dtype, if declared,
+    e.g. ``uint8`` for ``Radiance[uint8]``. It also exports a function
+    ``<func_name>_arrays_<float_type>`` that takes a contiguous 2-D input
+    array of shape (number of inputs, N) and a 2-D output array of shape
+    (number of outputs, N) whose rows are in the same order. Both are the
+    functions generated by the ``arrays`` option, see ``dectree --help``.
+
+    ``numba.pycc`` is pending deprecation, see the module's docstring.
+
+    Usage pattern:::
+
+        ext_path = build(src_file, out_dir='build')
+        # In another process, with 'build' on the module search path:
+        import dectree_test
+        dectree_test.apply_rules_float32(glint, radiance,
+                                         cloudy, certain, radiance_mod)
+
+    :param src_file: A file descriptor or a path-like object to the decision
+        tree definition source file (YAML format)
+    :param out_dir: output directory for the extension module, defaults to
+        the directory of *src_file*
+    :param module_name: name of the extension module, defaults to the base
+        name of *src_file*
+    :param options: options, refer to `dectree --help`; vectorize is always
+        "func"
+    :return: the path of the extension module
+    """
+    for config_name in (CONFIG_NAME_NO_JIT,
+                        CONFIG_NAME_PARALLEL,
+                        CONFIG_NAME_PARAMETERIZE):
+        if get_config_value(options, config_name):
+            raise ValueError(f'Option "{config_name}" cannot be used for'
+                             f' ahead-of-time compilation')
+
+    # Imported here, so dectree can be used without the AOT compiler's
+    # dependencies
+    try:
+        from numba.pycc import CC
+    except ImportError as e:
+        raise ImportError('Ahead-of-time compilation requires numba.pycc,'
+                          ' which is not available in the installed version'
+                          ' of Numba; use dectree.compiler.compile()'
+                          ' with a cache_dir instead') from e
+
+    src_path = src_file if isinstance(src_file, (str, os.PathLike)) else None
+    if out_dir is None:
+        out_dir = '.' if src_path is None else os.path.dirname(src_path)
+    if module_name is None:
+        if src_path is None:
+            raise ValueError('module_name must be given,'
+                             ' if src_file is not a path')
+        module_name = os.path.splitext(os.path.basename(src_path))[0]
+    if src_path is None:
+        src_code = src_file.read()
+    else:
+        with open(src_path) as fp:
+            src_code = fp.read()
+
+    function_name = get_config_value(options, CONFIG_NAME_FUNCTION_NAME)
+
+    cc = CC(module_name)
+    cc.output_dir = out_dir or '.'
+    cc.verbose = False
+
+    for float_type in FLOAT_TYPE_CHOICES:
+        float_options = dict(options)
+        float_options[CONFIG_NAME_VECTORIZE] = VECTORIZE_FUNC
+        float_options[CONFIG_NAME_ARRAYS] = True
+        float_options[CONFIG_NAME_FLOAT_TYPE] = float_type
+        text_io = StringIO()
+        transpile(StringIO(src_code), text_io, **float_options)
+        dectree_module = _load_module_from_code(text_io.getvalue())
+        kernel = getattr(dectree_module, f'{function_name}_kernel')
+        cc.export(f'{function_name}_{float_type}',
+                  kernel.signatures[0])(kernel.py_func)
+        arrays_func = getattr(dectree_module, f'{function_name}_arrays')
+        cc.export(f'{function_name}_arrays_{float_type}',
+                  arrays_func.signatures[0])(arrays_func.py_func)
+
+    os.makedirs(cc.output_dir, exist_ok=True)
+    cc.compile()
+    return os.path.join(cc.output_dir, cc.output_file)
@@ -1,30 +1,70 @@
 import ast
+import re
 from collections import OrderedDict
 from io import StringIO
-from typing import Dict, Any, Tuple, Optional, Union
+from typing import Dict, Any, List, Tuple, Optional, Set, Union, Iterable
 
 from .config import CONFIG_NAME_AND_PATTERN
+from .config import CONFIG_NAME_ARRAY_KERNEL
+from .config import CONFIG_NAME_ARRAYS
+from .config import CONFIG_NAME_BITMASK_OUTPUT
+from .config import CONFIG_NAME_BLOCK_SIZE
+from .config import CONFIG_NAME_BUCKETING
+from .config import CONFIG_NAME_CLASS_CONFIDENCE
+from .config import CONFIG_NAME_CLASS_OUTPUT
+from .config import CONFIG_NAME_CLASS_VALUES
+from .config import CONFIG_NAME_CRISP
+from .config import CONFIG_NAME_CSE
 from .config import CONFIG_NAME_FLOAT_TYPE
 from .config import CONFIG_NAME_FUNCTION_NAME
 from .config import CONFIG_NAME_INPUTS_NAME
+from .config import CONFIG_NAME_JIT_CACHE
 from .config import CONFIG_NAME_NOT_PATTERN
 from .config import CONFIG_NAME_NO_JIT
 from .config import CONFIG_NAME_OR_PATTERN
 from .config import CONFIG_NAME_OUTPUTS_NAME
+from .config import CONFIG_NAME_PARALLEL
 from .config import CONFIG_NAME_PARAMETERIZE
 from .config import CONFIG_NAME_PARAMS_NAME
+from .config import CONFIG_NAME_PARAM_ARRAYS
+from .config import CONFIG_NAME_QUANTIZE
+from .config import CONFIG_NAME_QUANTIZE_SCALE
+from .config import CONFIG_NAME_REGION_INPUT
+from .config import CONFIG_NAME_SHORT_CIRCUIT
+from .config import CONFIG_NAME_SIMPLIFY
+from .config import CONFIG_NAME_SWEEP
 from .config import CONFIG_NAME_TYPES
 from .config import CONFIG_NAME_VECTORIZE
+from .config import QUANTIZE_CHOICES
+from .config import QUANTIZE_NONE
 from .config import VECTORIZE_FUNC
 from .config import VECTORIZE_NONE
 from .config import VECTORIZE_PROP
 from .config import get_config_value
+from .bucketing import BucketTable
+from .bucketing import get_bucket_table
 from .decompiler import ExprDecompiler
+from .ir import And
+from .ir import Body
+from .ir import Condition
+from .ir import Const
+from .ir import Elif
+from .ir import Else
+from .ir import If
+from .ir import Membership
+from .ir import Not
+from .ir import iter_assignments
+from .ir import iter_conditions
+from .ir import iter_memberships
+from .ir import parse_condition
+from .ir import rules_to_ir
+from .optimizer import PassManager
+from .optimizer import Program
+from .optimizer import get_passes
 from .types import DerivedDefs
 from .types import PropDef
 from .types import PropFuncParamName
 from .types import PropName
-from .types import RuleBody
 from .types import Rules
 from .types import TypeDefs
 from .types import TypeName
@@ -35,6 +75,46 @@ NO_INSPECTION = '# noinspection PyPep8Naming,SpellCheckingInspection'
 
 BUILT_IN_SCALAR_TYPES = {'float', 'int', 'boolean'}
 
+INPUTS_REF = 'inputs.'
+OUTPUTS_REF = 'outputs.'
+KERNEL_INPUTS_REF = 'in_'
+KERNEL_OUTPUTS_REF = 'out_'
+BUCKET_INDEX_PREFIX = 'k_'
+LOCAL_OUTPUT_PREFIX = 'o_'
+LOCAL_INPUT_PREFIX = 'v_'
+
+# Largest class value of a class output, see option "class_output"
+MAX_CLASS_VALUE = 65535
+
+# Largest values of the dtypes of quantized outputs, see option "quantize"
+QUANTIZE_MAX_VALUES = {'uint8': 255, 'uint16': 65535}
+
+# Dtypes of bitmask outputs and their number of bits,
+# see option "bitmask_output"
+BITMASK_DTYPES = (('uint8', 8), ('uint16', 16),
+                  ('uint32', 32), ('uint64', 64))
+
+# Number of bits of integers that floats represent exactly
+FLOAT_MANTISSA_BITS = {'float32': 24, 'float64': 53}
+
+CRISP_NOT_PATTERN = 'not {x}'
+CRISP_AND_PATTERN = '({x} and {y})'
+CRISP_OR_PATTERN = '({x} or {y})'
+
+# Dtypes that may be declared for inputs, e.g. "Radiance[uint16]"
+INPUT_DTYPES = ('int8', 'int16', 'int32', 'int64',
+                'uint8', 'uint16', 'uint32', 'uint64',
+                'float32', 'float64')
+
+# Integer input dtypes whose memberships are looked up in precomputed tables
+LOOKUP_DTYPES = {'uint8': 256, 'uint16': 65536}
+
+_TYPE_SPEC_REGEX = re.compile(r'^\s*(\w+)\s*\[\s*(\w+)\s*\]\s*$')
+
+_CRISP_FUNC_BODY_REGEX = re.compile(
+    r'^return 1\.0 if x (==|!=|<|<=|>|>=) (\S+) else 0\.0$'
+)
+
 
 def gen_code(type_defs: TypeDefs,
              input_defs: VarDefs,
@@ -70,12 +150,21 @@ class CodeGen:
         assert out_file
 
         self.type_defs = OrderedDict(type_defs)
-        self.input_defs = OrderedDict(input_defs)
+        self.input_defs = OrderedDict()
+        # Maps input names to their dtype if given as "Type[dtype]"
+        self.input_dtypes = OrderedDict()
+        for var_name, type_spec in input_defs.items():
+            type_name, dtype = _parse_type_spec(var_name, type_spec)
+            self.input_defs[var_name] = type_name
+            if dtype is not None:
+                self.input_dtypes[var_name] = dtype
         self.output_defs = OrderedDict(output_defs)
         self.derived_defs = OrderedDict(derived_defs)
         self.rules = list(rules)
         self.out_file = out_file
         self.output_assignments = None
+        self.nesting_level = 0
+        self.skipped_assignments = []
 
         for var_name, (type_name, _) in derived_defs.items():
             if var_name not in self.output_defs:
@@ -91,6 +180,39 @@ class CodeGen:
                                           CONFIG_NAME_VECTORIZE)
         self.parameterize = get_config_value(options,
                                              CONFIG_NAME_PARAMETERIZE)
+        self.parallel = get_config_value(options,
+                                         CONFIG_NAME_PARALLEL)
+        self.cse = get_config_value(options,
+                                    CONFIG_NAME_CSE)
+        self.short_circuit = get_config_value(options,
+                                              CONFIG_NAME_SHORT_CIRCUIT)
+        self.crisp = get_config_value(options,
+                                      CONFIG_NAME_CRISP)
+        self.block_size = int(get_config_value(options,
+                                               CONFIG_NAME_BLOCK_SIZE))
+        self.jit_cache = get_config_value(options,
+                                          CONFIG_NAME_JIT_CACHE)
+        self.array_kernel = get_config_value(options,
+                                             CONFIG_NAME_ARRAY_KERNEL)
+        self.arrays = get_config_value(options,
+                                       CONFIG_NAME_ARRAYS)
+        self.simplify = get_config_value(options,
+                                         CONFIG_NAME_SIMPLIFY)
+        self.bucketing = get_config_value(options,
+                                          CONFIG_NAME_BUCKETING)
+        self.class_output = get_config_value(options,
+                                             CONFIG_NAME_CLASS_OUTPUT)
+        self.class_confidence = get_config_value(options,
+                                                 CONFIG_NAME_CLASS_CONFIDENCE)
+        self.quantize = get_config_value(options,
+                                         CONFIG_NAME_QUANTIZE)
+        self.bitmask_output = get_config_value(options,
+                                               CONFIG_NAME_BITMASK_OUTPUT)
+        self.region_input = get_config_value(options,
+                                             CONFIG_NAME_REGION_INPUT)
+        self.quantize_scale = float(
+            get_config_value(options, CONFIG_NAME_QUANTIZE_SCALE)
+        )
         self.function_name = get_config_value(options,
                                               CONFIG_NAME_FUNCTION_NAME)
         self.inputs_name = get_config_value(options,
@@ -110,25 +232,372 @@ class CodeGen:
         self.float_type = _get_config_op_pattern(options,
                                                  CONFIG_NAME_FLOAT_TYPE)
 
+        program = Program(self.type_defs,
+                          self.input_defs,
+                          self.output_defs,
+                          self.derived_defs,
+                          rules_to_ir(self.rules))
+        # The class values may name outputs removed by "outputs" slicing
+        self.unsliced_output_names = [var_name for var_name
+                                      in self.output_defs.keys()
+                                      if not var_name.startswith('_')
+                                      and var_name not in self.derived_defs]
+        PassManager(get_passes(options)).run(program)
+        self.rules = program.rules
+        self.derived_defs = program.derived_defs
+        self.output_defs = program.output_defs
+        self.common_memberships = program.common_memberships
+
+        if self.parallel and (self.no_jit
+                              or self.vectorize != VECTORIZE_FUNC):
+            raise ValueError(f'Option "{CONFIG_NAME_PARALLEL}" requires JIT'
+                             f' and vectorize="{VECTORIZE_FUNC}"')
+
+        if self.array_kernel and (self.no_jit
+                                  or self.vectorize != VECTORIZE_FUNC):
+            raise ValueError(f'Option "{CONFIG_NAME_ARRAY_KERNEL}" requires'
+                             f' JIT and vectorize="{VECTORIZE_FUNC}"')
+
+        if self.arrays and (self.no_jit or self.vectorize != VECTORIZE_FUNC):
+            raise ValueError(f'Option "{CONFIG_NAME_ARRAYS}" requires'
+                             f' JIT and vectorize="{VECTORIZE_FUNC}"')
+
+        if self.short_circuit and self.vectorize == VECTORIZE_PROP:
+            raise ValueError(f'Option "{CONFIG_NAME_SHORT_CIRCUIT}"'
+                             f' cannot be used with'
+                             f' vectorize="{VECTORIZE_PROP}"')
+
+        if self.block_size < 0 \
+                or self.block_size and self.vectorize != VECTORIZE_PROP:
+            raise ValueError(f'Option "{CONFIG_NAME_BLOCK_SIZE}" must be a'
+                             f' positive integer and requires'
+                             f' vectorize="{VECTORIZE_PROP}"')
+
+        self.param_arrays = self._get_param_arrays(
+            get_config_value(options, CONFIG_NAME_PARAM_ARRAYS)
+        )
+
+        # Maps input names to their dtype, if their memberships are looked up
+        # in tables. These depend on the parameters, if parameterized.
+        # Inputs of built-in types have no memberships.
+        self.lookup_dtypes = OrderedDict()
+        if not self.parameterize:
+            for var_name, dtype in self.input_dtypes.items():
+                if dtype in LOOKUP_DTYPES \
+                        and self.input_defs[var_name] in self.type_defs:
+                    self.lookup_dtypes[var_name] = dtype
+
+        if self.bucketing and (self.vectorize == VECTORIZE_PROP
+                               or self.parameterize
+                               or self.crisp):
+            raise ValueError(f'Option "{CONFIG_NAME_BUCKETING}"'
+                             f' cannot be used with'
+                             f' vectorize="{VECTORIZE_PROP}",'
+                             f' "{CONFIG_NAME_PARAMETERIZE}",'
+                             f' or "{CONFIG_NAME_CRISP}"')
+
+        # Maps type names to the bucket tables of their properties
+        self.bucket_tables: Dict[TypeName, BucketTable] = {}
+        if self.bucketing:
+            for type_name, type_def in self.type_defs.items():
+                bucket_table = get_bucket_table(type_def)
+                if bucket_table is not None:
+                    self.bucket_tables[type_name] = bucket_table
+
+        # Maps output names to their dtype if different from float_type
+        self.output_dtypes = {}
+
+        if self.crisp:
+            if self.vectorize == VECTORIZE_PROP:
+                raise ValueError(f'Option "{CONFIG_NAME_CRISP}"'
+                                 f' cannot be used with'
+                                 f' vectorize="{VECTORIZE_PROP}"')
+            self.crisp_func_bodies = self._get_crisp_func_bodies()
+            self.not_pattern = CRISP_NOT_PATTERN
+            self.and_pattern = CRISP_AND_PATTERN
+            self.or_pattern = CRISP_OR_PATTERN
+            for var_name in self.output_defs.keys():
+                if var_name not in self.derived_defs:
+                    self.output_dtypes[var_name] = 'bool_'
+
+        # Maps the names of the outputs combined into the class output
+        # to their class values. Their truth values are loop-local.
+        self.class_values = OrderedDict()
+        if self.class_confidence and not self.class_output:
+            raise ValueError(f'Option "{CONFIG_NAME_CLASS_CONFIDENCE}"'
+                             f' requires "{CONFIG_NAME_CLASS_OUTPUT}"')
+        if self.class_output:
+            if self.vectorize == VECTORIZE_PROP:
+                raise ValueError(f'Option "{CONFIG_NAME_CLASS_OUTPUT}"'
+                                 f' cannot be used with'
+                                 f' vectorize="{VECTORIZE_PROP}"')
+            self.class_values = self._get_class_values(
+                get_config_value(options, CONFIG_NAME_CLASS_VALUES)
+            )
+            for option_name, var_name in ((CONFIG_NAME_CLASS_OUTPUT,
+                                           self.class_output),
+                                          (CONFIG_NAME_CLASS_CONFIDENCE,
+                                           self.class_confidence)):
+                if var_name and (not var_name.isidentifier()
+                                 or var_name.startswith('_')
+                                 or var_name in self.input_defs
+                                 or var_name in self.output_defs
+                                 or var_name == self.class_output
+                                 and option_name != CONFIG_NAME_CLASS_OUTPUT):
+                    raise ValueError(f'Option "{option_name}" must be the name'
+                                     f' of a new output, got "{var_name}"')
+            max_class_value = max(self.class_values.values())
+            self.output_dtypes[self.class_output] = \
+                'uint8' if max_class_value <= 255 else 'uint16'
+
+        # Names of the outputs whose truth values are quantized.
+        # Their truth values are loop-local.
+        self.quantized_names = []
+        if self.quantize != QUANTIZE_NONE:
+            if self.quantize not in QUANTIZE_CHOICES:
+                raise ValueError(f'Option "{CONFIG_NAME_QUANTIZE}" must be'
+                                 f' one of {", ".join(QUANTIZE_CHOICES)}')
+            if self.vectorize == VECTORIZE_PROP or self.crisp:
+                raise ValueError(f'Option "{CONFIG_NAME_QUANTIZE}"'
+                                 f' cannot be used with'
+                                 f' vectorize="{VECTORIZE_PROP}"'
+                                 f' or "{CONFIG_NAME_CRISP}"')
+            max_value = QUANTIZE_MAX_VALUES[self.quantize]
+            if not self.quantize_scale:
+                self.quantize_scale = float(max_value)
+            elif not 0.0 < self.quantize_scale <= max_value:
+                raise ValueError(f'Option "{CONFIG_NAME_QUANTIZE_SCALE}"'
+                                 f' must be in the range 0 to {max_value}'
+                                 f' for "{self.quantize}"')
+            self.quantized_names = self._get_truth_output_names()
+            for var_name in self.quantized_names:
+                self.output_dtypes[var_name] = self.quantize
+            if self.class_confidence:
+                self.output_dtypes[self.class_confidence] = self.quantize
+
+        # Names of the outputs packed into the bits of the bitmask output
+        # in the order of their bits. Their values are loop-local.
+        self.bitmask_names = []
+        if self.bitmask_output:
+            if not self.crisp:
+                raise ValueError(f'Option "{CONFIG_NAME_BITMASK_OUTPUT}"'
+                                 f' requires "{CONFIG_NAME_CRISP}"')
+            var_name = self.bitmask_output
+            if not var_name.isidentifier() \
+                    or var_name.startswith('_') \
+                    or var_name in self.input_defs \
+                    or var_name in self.output_defs \
+                    or var_name in (self.class_output, self.class_confidence):
+                raise ValueError(f'Option "{CONFIG_NAME_BITMASK_OUTPUT}" must'
+                                 f' be the name of a new output,'
+                                 f' got "{var_name}"')
+            self.bitmask_names = self._get_truth_output_names()
+            num_bits = len(self.bitmask_names)
+            dtype = next((dtype for dtype, dtype_bits in BITMASK_DTYPES
+                          if num_bits <= dtype_bits), None)
+            if not num_bits or dtype is None:
+                raise ValueError(f'Option "{CONFIG_NAME_BITMASK_OUTPUT}"'
+                                 f' requires 1 to {BITMASK_DTYPES[-1][1]}'
+                                 f' outputs to pack, got {num_bits}')
+            if self.arrays and num_bits > FLOAT_MANTISSA_BITS[self.float_type]:
+                raise ValueError(f'Option "{CONFIG_NAME_BITMASK_OUTPUT}"'
+                                 f' cannot pack {num_bits} outputs into'
+                                 f' the {self.float_type} rows of'
+                                 f' "{CONFIG_NAME_ARRAYS}"')
+            self.output_dtypes[self.bitmask_output] = dtype
+
+        # Names of the parameters given by the rows of the parameter
+        # matrix of the sweep function
+        self.sweep_params = self._get_sweep_params(
+            get_config_value(options, CONFIG_NAME_SWEEP)
+        )
+
+        # Outputs that are combined into other outputs are kept in
+        # local variables
+        local_var_names = {
+            var_name: LOCAL_OUTPUT_PREFIX + var_name
+            for var_name in list(self.class_values.keys())
+            + self.quantized_names
+            + self.bitmask_names
+        }
         self.expr_gen = FuzzyExprGen(type_defs,
                                      self.input_defs,
                                      self.output_defs,
                                      self.derived_defs,
                                      parameterize=self.parameterize,
                                      vectorize=self.vectorize,
+                                     block_size=self.block_size,
                                      no_jit=self.no_jit,
                                      not_pattern=self.not_pattern,
                                      and_pattern=self.and_pattern,
-                                     or_pattern=self.or_pattern)
+                                     or_pattern=self.or_pattern,
+                                     bucket_tables=self.bucket_tables,
+                                     input_dtypes=self.input_dtypes,
+                                     lookup_dtypes=self.lookup_dtypes,
+                                     float_type=self.float_type,
+                                     param_arrays=self.param_arrays,
+                                     region_input=self.region_input,
+                                     local_var_names=local_var_names)
+
+    def _get_crisp_func_bodies(self) -> Dict[Tuple[TypeName, PropName], str]:
+        crisp_func_bodies = {}
+        for type_name, type_def in self.type_defs.items():
+            for prop_name, prop_def in type_def.items():
+                prop_value, func_params, func_body_pattern = prop_def
+                if self.parameterize and func_params:
+                    func_body = func_body_pattern.format(
+                        **{key: key for key in func_params.keys()})
+                else:
+                    func_body = func_body_pattern.format(**func_params)
+                func_body = func_body.strip()
+                match = _CRISP_FUNC_BODY_REGEX.match(func_body)
+                if match:
+                    op, x0 = match.groups()
+                    crisp_func_body = f'return x {op} {x0}'
+                elif func_body in ('return 1.0', 'return 0.0'):
+                    crisp_func_body = f'return {func_body == "return 1.0"}'
+                else:
+                    raise ValueError(f'Property "{prop_name}" of type'
+                                     f' "{type_name}" is not crisp:'
+                                     f' {prop_value}')
+                crisp_func_bodies[(type_name, prop_name)] = crisp_func_body
+        return crisp_func_bodies
+
+    def _get_param_arrays(self, param_arrays: Union[str, List[str]]) \
+            -> List[str]:
+        param_arrays = self._get_param_names(CONFIG_NAME_PARAM_ARRAYS,
+                                             param_arrays)
+        if not param_arrays:
+            if self.region_input:
+                raise ValueError(f'Option "{CONFIG_NAME_REGION_INPUT}"'
+                                 f' requires "{CONFIG_NAME_PARAM_ARRAYS}"')
+            return []
+
+        if not self.parameterize:
+            raise ValueError(f'Option "{CONFIG_NAME_PARAM_ARRAYS}"'
+                             f' requires "{CONFIG_NAME_PARAMETERIZE}"')
+        if self.region_input:
+            dtype = self.input_dtypes.get(self.region_input)
+            if dtype is None or not dtype.startswith('uint'):
+                raise ValueError(f'Option "{CONFIG_NAME_REGION_INPUT}" must'
+                                 f' be the name of an input declared with'
+                                 f' an unsigned integer dtype,'
+                                 f' got "{self.region_input}"')
+        elif self.vectorize == VECTORIZE_NONE:
+            raise ValueError(f'Option "{CONFIG_NAME_PARAM_ARRAYS}" requires'
+                             f' "{CONFIG_NAME_REGION_INPUT}" or'
+                             f' vectorize="{VECTORIZE_PROP}" or'
+                             f' vectorize="{VECTORIZE_FUNC}"')
+        return param_arrays
+
+    def _get_sweep_params(self, sweep_params: Union[str, List[str]]) \
+            -> List[str]:
+        sweep_params = self._get_param_names(CONFIG_NAME_SWEEP,
+                                             sweep_params)
+        if not sweep_params:
+            return []
+        if not self.parameterize or self.no_jit \
+                or self.vectorize != VECTORIZE_FUNC:
+            raise ValueError(f'Option "{CONFIG_NAME_SWEEP}" requires'
+                             f' "{CONFIG_NAME_PARAMETERIZE}", JIT,'
+                             f' and vectorize="{VECTORIZE_FUNC}"')
+        # The outputs of all parameter sets are stored in one float array
+        if self.param_arrays or self.class_output \
+                or self.quantize != QUANTIZE_NONE or self.bitmask_output:
+            raise ValueError(f'Option "{CONFIG_NAME_SWEEP}" cannot be used'
+                             f' with "{CONFIG_NAME_PARAM_ARRAYS}",'
+                             f' "{CONFIG_NAME_CLASS_OUTPUT}",'
+                             f' "{CONFIG_NAME_QUANTIZE}",'
+                             f' or "{CONFIG_NAME_BITMASK_OUTPUT}"')
+        return sweep_params
+
+    def _get_param_names(self,
+                         config_name: str,
+                         param_names: Union[str, List[str]]) -> List[str]:
+        # Parameter names are given as a comma-separated list or "*"
+        if isinstance(param_names, str):
+            param_names = [name.strip() for name in param_names.split(',')
+                           if name.strip()]
+        param_names = list(param_names or [])
+        if not param_names:
+            return []
+
+        qualified_param_names = [
+            _get_qualified_param_name(type_name, prop_name, param_name)
+            for type_name, type_def in self.type_defs.items()
+            for prop_name, (_, func_params, _) in type_def.items()
+            for param_name in func_params.keys()
+        ]
+        if param_names == ['*']:
+            return qualified_param_names
+        for param_name in param_names:
+            if param_name not in qualified_param_names:
+                raise ValueError(f'Option "{config_name}" refers'
+                                 f' to unknown parameter "{param_name}"')
+        return [param_name for param_name in qualified_param_names
+                if param_name in param_names]
+
+    def _get_truth_output_names(self) -> List[VarName]:
+        # The public outputs assigned by the rules, unless they are
+        # combined into the class output
+        return [var_name for var_name in self.output_defs.keys()
+                if not var_name.startswith('_')
+                and var_name not in self.derived_defs
+                and var_name not in self.class_values]
+
+    def _get_class_values(self, class_values: Union[str, Dict[str, Any]]) \
+            -> Dict[VarName, int]:
+        class_var_names = self._get_truth_output_names()
+        if isinstance(class_values, str):
+            items = []
+            for item in class_values.split(','):
+                if item.strip():
+                    var_name, _, class_value = item.partition('=')
+                    items.append((var_name.strip(), class_value.strip()))
+        else:
+            items = list((class_values or {}).items())
+        if not items:
+            items = [(var_name, index + 1)
+                     for index, var_name in enumerate(class_var_names)]
+
+        parsed_class_values = OrderedDict()
+        for var_name, class_value in items:
+            if var_name not in self.unsliced_output_names:
+                raise ValueError(f'Option "{CONFIG_NAME_CLASS_VALUES}" refers'
+                                 f' to unknown output "{var_name}"')
+            try:
+                class_value = int(class_value)
+            except (TypeError, ValueError):
+                class_value = 0
+            if not 1 <= class_value <= MAX_CLASS_VALUE:
+                raise ValueError(f'Class value of output "{var_name}"'
+                                 f' must be an integer in the range'
+                                 f' 1 to {MAX_CLASS_VALUE}')
+            # Outputs removed by slicing are not combined
+            if var_name in class_var_names:
+                parsed_class_values[var_name] = class_value
+        if not parsed_class_values:
+            raise ValueError(f'Option "{CONFIG_NAME_CLASS_VALUES}" refers'
+                             f' to none of the requested outputs')
+        return parsed_class_values
 
     def gen_code(self):
         self.output_assignments = {}
         self._write_imports()
         self._write_type_prop_functions()
+        self._write_bucket_tables()
+        self._write_lookup_tables()
         self._write_inputs_class()
         self._write_outputs_class()
         self._write_params()
         self._write_apply_rules_function()
+        # The arrays function passes the rows of its arrays to the kernel
+        if self.array_kernel or self.arrays:
+            self._write_apply_rules_kernel_function()
+        if self.arrays:
+            self._write_apply_rules_arrays_function()
+        if self.sweep_params:
+            self._write_apply_rules_sweep_function()
 
     def _write_imports(self):
         self._write_lines('',
@@ -139,12 +608,25 @@ class CodeGen:
         if not self.no_jit:
             self._write_lines('from numba.experimental import jitclass',
                               'from numba import jit',
+                              'from numba import void',
                               f'from numba import {self.float_type}')
             if self.vectorize == VECTORIZE_PROP:
                 self._write_lines('from numba import vectorize')
+            if self.parallel:
+                self._write_lines('from numba import prange',
+                                  'from numba import set_num_threads')
+            if self.parallel or self.bucket_tables:
+                self._write_lines('from numba import int64')
+            if self.parallel:
+                self._write_lines('from numba.types import Omitted')
+            dtypes = set(self.output_dtypes.values())
+            dtypes.update(self.input_dtypes.values())
+            if self.crisp:
+                dtypes.add('bool_')
+            for dtype in sorted(dtypes - {self.float_type}):
+                self._write_lines(f'from numba import {dtype}')
 
     def _write_type_prop_functions(self):
-        numba_decorator = self._get_numba_decorator(prop_func=True)
         for type_name, type_def in self.type_defs.items():
             for prop_name, prop_def in type_def.items():
                 prop_value, func_params, func_body_pattern = prop_def
@@ -156,7 +638,14 @@ class CodeGen:
                 else:
                     func_header = f'def _{type_name}_{prop_name}(x):'
                     func_body = func_body_pattern.format(**func_params)
-
+                if self.crisp:
+                    func_body = self.crisp_func_bodies[(type_name, prop_name)]
+                elif self.no_jit and self.vectorize == VECTORIZE_PROP:
+                    func_body = _get_array_func_body(func_body)
+
+                num_params = len(func_params) if self.parameterize else 0
+                numba_decorator = self._get_numba_decorator(
+                    prop_func=True, num_params=num_params)
                 func_body_lines = [f'    {line}'
                                    for line in func_body.split('\n')]
                 self._write_lines(
@@ -168,6 +657,100 @@ class CodeGen:
                     *func_body_lines
                 )
 
+    def _write_bucket_tables(self):
+        for type_name, bucket_table in self.bucket_tables.items():
+            breakpoints = bucket_table.breakpoints
+            num_breakpoints = len(breakpoints)
+            breakpoints_name = f'_{type_name}_BREAKPOINTS'
+            self._write_lines(
+                '', '',
+                f'# Breakpoints of the properties of type {type_name}',
+                f'{breakpoints_name} = np.array('
+                f'{_format_float_list(breakpoints)})',
+                '', '',
+                NO_INSPECTION,
+                self._get_numba_decorator(
+                    signature=f'int64({self.float_type})'),
+                f'def _{type_name}_bucket(x):',
+                f'    # Binary search for the number j of breakpoints'
+                f' less than x, the bucket is 2 * j',
+                f'    # or 2 * j + 1, if x equals breakpoint j',
+                f'    lo = 0',
+                f'    hi = {num_breakpoints}',
+                f'    while lo < hi:',
+                f'        mid = (lo + hi) // 2',
+                f'        if {breakpoints_name}[mid] < x:',
+                f'            lo = mid + 1',
+                f'        else:',
+                f'            hi = mid',
+                f'    if lo < {num_breakpoints}'
+                f' and {breakpoints_name}[lo] == x:',
+                f'        return 2 * lo + 1',
+                f'    if x != x:',
+                f'        return {bucket_table.num_buckets - 1}',
+                f'    return 2 * lo'
+            )
+            for prop_name, truths in bucket_table.truths.items():
+                prop_value = self.type_defs[type_name][prop_name][0]
+                truths_name = f'_{type_name}_{prop_name}_TRUTHS'
+                self._write_lines(
+                    '', '',
+                    f'# {type_name}.{prop_name}: {prop_value}',
+                    f'{truths_name} = np.array('
+                    f'{_format_float_list(truths)},'
+                    f' dtype=np.{self.float_type})'
+                )
+                if None not in truths:
+                    continue
+                self._write_lines(
+                    '', '',
+                    NO_INSPECTION,
+                    self._get_numba_decorator(
+                        signature=f'{self.float_type}'
+                                  f'({self.float_type}, int64)'),
+                    f'def _{type_name}_{prop_name}_bucketed(x, k):',
+                    f'    # Not constant within the bucket, if NaN',
+                    f'    t = {truths_name}[k]',
+                    f'    if t != t:',
+                    f'        return _{type_name}_{prop_name}(x)',
+                    f'    return t'
+                )
+
+    def _write_lookup_tables(self):
+        lookups = OrderedDict()
+        for var_name, dtype in self.lookup_dtypes.items():
+            lookups[(self.input_defs[var_name], dtype)] = True
+        truth_dtype = 'bool_' if self.crisp else self.float_type
+        for type_name, dtype in lookups.keys():
+            self._write_lines(
+                '', '',
+                f'# Truth values of the properties of type {type_name}'
+                f' for all {dtype} values'
+            )
+            for prop_name in self.type_defs[type_name].keys():
+                func_name = f'_{type_name}_{prop_name}'
+                self._write_lines(
+                    f'{func_name}_{dtype} = np.array('
+                    f'[{func_name}(x) for x in range({LOOKUP_DTYPES[dtype]})],'
+                    f' dtype=np.{truth_dtype})'
+                )
+
+    def _write_bucket_indices(self):
+        target_indent = self._get_target_indent()
+        var_names = OrderedDict()
+        for condition in iter_conditions(self.rules):
+            for membership in iter_memberships(condition):
+                if self.expr_gen.is_bucketed(membership):
+                    var_names[membership.var_name] = True
+        for var_name in var_names.keys():
+            type_name = self.expr_gen.var_defs[var_name]
+            var_ref = self.expr_gen.get_float_var_ref(var_name)
+            self._write_lines(
+                f'{target_indent}# bucket of {var_name}',
+                f'{target_indent}{BUCKET_INDEX_PREFIX}{var_name}'
+                f' = _{type_name}_bucket({var_ref})'
+            )
+
     def _write_names_accessor(self, target: str, var_names):
         tab = '     '
         self._write_lines(
@@ -201,59 +784,608 @@ class CodeGen:
             function_args = ', '.join(['{}'.format(param_name)
                                        for param_name, _ in function_params])
 
+        if self.parallel:
+            if self.use_py_types:
+                function_args += ', num_threads: int = 0'
+            else:
+                function_args += ', num_threads=0'
+
         numba_decorator = self._get_numba_decorator()
         self._write_lines('', '',
                           NO_INSPECTION,
                           numba_decorator,
                           f'def {self.function_name}({function_args}):')
 
-        if self.vectorize == VECTORIZE_FUNC:
-            any_var = list(self.output_defs.keys())[0]
+        if self.parallel:
+            self._write_lines(
+                f'    if num_threads > 0:',
+                f'        set_num_threads(num_threads)'
+            )
+
+        self._write_apply_rules_body()
+
+    def _write_apply_rules_kernel_function(self):
+        input_args = [KERNEL_INPUTS_REF + var_name
+                      for var_name in self.input_defs.keys()]
+        output_args = [KERNEL_OUTPUTS_REF + var_name
+                       for var_name in self._get_public_output_names()]
+        function_args = ', '.join(input_args + output_args)
+        if self.parameterize:
+            function_args += ', params'
+
+        self._write_lines('', '',
+                          NO_INSPECTION,
+                          self._get_numba_decorator(kernel=True),
+                          f'def {self.function_name}_kernel'
+                          f'({function_args}):')
+
+        self.output_assignments = {}
+        self.expr_gen.inputs_ref = KERNEL_INPUTS_REF
+        self.expr_gen.outputs_ref = KERNEL_OUTPUTS_REF
+        try:
+            self._write_apply_rules_body()
+        finally:
+            self.expr_gen.inputs_ref = INPUTS_REF
+            self.expr_gen.outputs_ref = OUTPUTS_REF
+
+    def _write_apply_rules_arrays_function(self):
+        if self.parameterize:
+            function_args = 'inputs, outputs, params'
+        else:
+            function_args = 'inputs, outputs'
+
+        self._write_lines('', '',
+                          NO_INSPECTION,
+                          self._get_numba_decorator(arrays=True),
+                          f'def {self.function_name}_arrays'
+                          f'({function_args}):')
+
+        input_names = list(self.input_defs.keys())
+        output_names = self._get_public_output_names()
+        self._write_lines(
+            f'    if inputs.shape[0] != {len(input_names)}'
+            f' or outputs.shape[0] != {len(output_names)}'
+            f' or inputs.shape[1] != outputs.shape[1]:',
+            f'        raise ValueError("inputs and outputs must have shapes'
+            f' ({len(input_names)}, N) and ({len(output_names)}, N)")'
+        )
+        kernel_args = []
+        for index, var_name in enumerate(input_names):
+            dtype = self.input_dtypes.get(var_name, self.float_type)
+            # Rows of inputs with another dtype are converted
+            conversion = f'.astype(np.{dtype})' \
+                if dtype != self.float_type else ''
+            kernel_args.append(f'inputs[{index}]{conversion}')
+        # Outputs with another dtype are written into temporary rows
+        # and converted afterwards
+        converted_outputs = []
+        for index, var_name in enumerate(output_names):
+            dtype = self.output_dtypes.get(var_name, self.float_type)
+            if dtype != self.float_type:
+                self._write_lines(
+                    f'    {KERNEL_OUTPUTS_REF}{var_name}'
+                    f' = np.empty(outputs.shape[1], dtype=np.{dtype})'
+                )
+                kernel_args.append(KERNEL_OUTPUTS_REF + var_name)
+                converted_outputs.append((index, var_name))
+            else:
+                kernel_args.append(f'outputs[{index}]')
+        if self.parameterize:
+            kernel_args.append('params')
+        self._write_lines(f'    {self.function_name}_kernel(')
+        self._write_lines(*[f'        {kernel_arg},'
+                            for kernel_arg in kernel_args[:-1]])
+        self._write_lines(f'        {kernel_args[-1]})')
+        for index, var_name in converted_outputs:
             self._write_lines(
-                f'    size = outputs.{any_var}.size'
+                f'    outputs[{index}] = {KERNEL_OUTPUTS_REF}{var_name}'
             )
-            for var_name, (type_name, _) in self.derived_defs.items():
-                if var_name.startswith('_'):
+
+    def _write_apply_rules_sweep_function(self):
+        function_args = 'inputs, params, param_matrix, outputs'
+        if self.parallel:
+            function_args += ', num_threads=0'
+
+        self._write_names_accessor('sweep_param', self.sweep_params)
+        self._write_lines('', '',
+                          NO_INSPECTION,
+                          self._get_numba_decorator(sweep=True),
+                          f'def {self.function_name}_sweep'
+                          f'({function_args}):')
+
+        if self.parallel:
+            self._write_lines(
+                f'    if num_threads > 0:',
+                f'        set_num_threads(num_threads)'
+            )
+
+        num_params = len(self.sweep_params)
+        output_names = self._get_public_output_names()
+        num_outputs = len(output_names)
+        self._write_lines(
+            f'    num_sets = param_matrix.shape[0]',
+            f'    size = outputs.shape[2]',
+            f'    if param_matrix.shape[1] != {num_params}'
+            f' or outputs.shape[0] != num_sets'
+            f' or outputs.shape[1] != {num_outputs}:',
+            f'        raise ValueError("param_matrix and outputs must have'
+            f' shapes (K, {num_params}) and (K, {num_outputs}, N)")'
+        )
+
+        loop_range = 'prange' if self.parallel else 'range'
+        self._write_lines(f'    for i in {loop_range}(size):')
+
+        local_var_names = self.expr_gen.local_var_names
+        self.output_assignments = {}
+        self.expr_gen.membership_names = {}
+        # Inputs and outputs are loop-local, swept parameters are
+        # read from the parameter matrix
+        self.expr_gen.local_var_names = OrderedDict()
+        for var_name in self.input_defs.keys():
+            self.expr_gen.local_var_names[var_name] = \
+                LOCAL_INPUT_PREFIX + var_name
+        for var_name in output_names:
+            self.expr_gen.local_var_names[var_name] = \
+                LOCAL_OUTPUT_PREFIX + var_name
+        self.expr_gen.param_refs = self._get_sweep_param_refs()
+        try:
+            self._write_apply_rules_sweep_body(output_names)
+        finally:
+            self.expr_gen.local_var_names = local_var_names
+            self.expr_gen.param_refs = {}
+
+    def _write_apply_rules_sweep_body(self, output_names: List[VarName]):
+        for var_name in self.input_defs.keys():
+            self._write_lines(
+                f'        {LOCAL_INPUT_PREFIX}{var_name}'
+                f' = {self.expr_gen.inputs_ref}{var_name}[i]'
+            )
+
+        for var_name, (derived_def, source_expr) in self.derived_defs.items():
+            self._write_derived_var(var_name, derived_def, source_expr)
+
+        # Memberships that don't depend on the swept parameters
+        # are computed once for all parameter sets
+        memberships = OrderedDict()
+        for condition in iter_conditions(self.rules):
+            for membership in iter_memberships(condition):
+                memberships[(membership.var_name, membership.prop_name)] = True
+        self._write_memberships([key for key in memberships.keys()
+                                 if not self._is_swept_membership(*key)])
+
+        self._write_lines('        for k in range(num_sets):')
+        self.nesting_level += 1
+        try:
+            target_indent = self._get_target_indent()
+            if not self.crisp:
+                self._write_lines(f'{target_indent}t0 = 1.0')
+
+            if self.cse:
+                self._write_memberships([key for key
+                                         in self.common_memberships
+                                         if self._is_swept_membership(*key)])
+
+            if self.crisp:
+                self._write_crisp_rules()
+            else:
+                for rule in self.rules:
+                    self._write_rule_body(rule, 0, 1)
+
+            # Outputs not assigned by any rule are left as they are
+            assigned_names = {assignment.var_name
+                              for assignment in iter_assignments(self.rules)}
+            for index, var_name in enumerate(output_names):
+                if var_name in assigned_names \
+                        or var_name in self.derived_defs:
                     self._write_lines(
-                        f'    {var_name} = np.zeros(size, dtype=np.{self.float_type})'
+                        f'{target_indent}outputs[k, {index}, i]'
+                        f' = {LOCAL_OUTPUT_PREFIX}{var_name}'
                     )
+        finally:
+            self.nesting_level -= 1
+
+    def _get_sweep_param_refs(self) -> Dict[str, str]:
+        # Parameters not swept are read from the params object
+        return {param_name: f'param_matrix[k, {index}]'
+                for index, param_name in enumerate(self.sweep_params)}
+
+    def _is_swept_membership(self, var_name: VarName, prop_name: PropName) \
+            -> bool:
+        type_name, (_, func_params, _) = _get_type_name_and_prop_def(
+            var_name, prop_name, self.type_defs, self.expr_gen.var_defs)
+        return any(_get_qualified_param_name(type_name, prop_name, param_name)
+                   in self.sweep_params
+                   for param_name in func_params.keys())
+
+    def _get_public_output_names(self) -> List[VarName]:
+        var_names = [var_name for var_name in self.output_defs.keys()
+                     if not var_name.startswith('_')
+                     and var_name not in self.class_values
+                     and var_name not in self.bitmask_names]
+        if self.class_output:
+            var_names.append(self.class_output)
+            if self.class_confidence:
+                var_names.append(self.class_confidence)
+        if self.bitmask_output:
+            var_names.append(self.bitmask_output)
+        return var_names
+
+    def _write_apply_rules_body(self):
+        self.expr_gen.membership_names = {}
+
+        outputs_ref = self.expr_gen.outputs_ref
+        if self.vectorize == VECTORIZE_FUNC:
+            any_var = self._get_public_output_names()[0]
+            self._write_lines(
+                f'    size = {outputs_ref}{any_var}.size'
+            )
+            self._write_param_array_checks()
 
+            loop_range = 'prange' if self.parallel else 'range'
             self._write_lines(
-                f'    for i in range(size):'
+                f'    for i in {loop_range}(size):'
             )
+            if not self.crisp:
+                self._write_lines(
+                    f'        t0 = 1.0'
+                )
+        elif self.block_size:
+            any_var = self._get_public_output_names()[0]
+            self._write_lines(f'    size = {outputs_ref}{any_var}.size')
+            self._write_param_array_checks()
             self._write_lines(
+                f'    for start in range(0, size, {self.block_size}):',
+                f'        stop = min(start + {self.block_size}, size)',
                 f'        t0 = 1.0'
             )
         else:
-            self._write_lines('    t0 = 1.0')
+            self._write_param_array_checks()
+            if not self.crisp:
+                self._write_lines('    t0 = 1.0')
 
         for var_name, (derived_def, source_expr) in self.derived_defs.items():
             self._write_derived_var(var_name, derived_def, source_expr)
 
+        if self.bucket_tables:
+            self._write_bucket_indices()
+
+        if self.cse:
+            self._write_common_memberships()
+
+        if self.crisp:
+            self._write_crisp_rules()
+        else:
+            for rule in self.rules:
+                self._write_rule_body(rule, 0, 1)
+
+        if self.quantized_names:
+            self._write_quantized_outputs()
+
+        if self.class_output:
+            self._write_class_output()
+
+        if self.bitmask_output:
+            self._write_bitmask_output()
+
+    def _write_bitmask_output(self):
+        target_indent = self._get_target_indent()
+        # Outputs not assigned by any rule are never true
+        assigned_names = {assignment.var_name
+                          for assignment in iter_assignments(self.rules)}
+        # Bits are of the output's dtype, so that Numba
+        # doesn't mix signed and unsigned integers
+        dtype = self.output_dtypes[self.bitmask_output]
+        self._write_lines(f'{target_indent}# {self.bitmask_output} ='
+                          f' bits of {", ".join(self.bitmask_names)}',
+                          f'{target_indent}bitmask = np.{dtype}(0)')
+        for bit, var_name in enumerate(self.bitmask_names):
+            if var_name in assigned_names:
+                self._write_lines(
+                    f'{target_indent}if {self._get_output_ref(var_name)}:',
+                    f'{target_indent}    bitmask |= np.{dtype}({1 << bit})'
+                )
+        self._write_lines(
+            f'{target_indent}{self._get_output_ref(self.bitmask_output)}'
+            f' = bitmask'
+        )
+
+    def _write_quantized_outputs(self):
+        target_indent = self._get_target_indent()
+        # Outputs not assigned by any rule are left as they are
+        assigned_names = {assignment.var_name
+                          for assignment in iter_assignments(self.rules)}
+        for var_name in self.quantized_names:
+            if var_name in assigned_names:
+                quantized_value = self._get_quantized_value(
+                    self._get_output_ref(var_name))
+                self._write_lines(
+                    f'{target_indent}{self._get_stored_output_ref(var_name)}'
+                    f' = {quantized_value}'
+                )
+
+    def _get_quantized_value(self, truth_value: str) -> str:
+        # Truth values are in the range 0 to 1, so adding 0.5
+        # and truncating rounds them into the range of the dtype
+        return f'np.{self.quantize}({truth_value}' \
+               f' * {self.quantize_scale!r} + 0.5)'
+
+    def _write_class_output(self):
+        target_indent = self._get_target_indent()
+
+        # Outputs not assigned by any rule are never true
+        assigned_names = {assignment.var_name
+                          for assignment in iter_assignments(self.rules)}
+        class_values = [(var_name, class_value)
+                        for var_name, class_value in self.class_values.items()
+                        if var_name in assigned_names]
+
+        self._write_lines(f'{target_indent}# {self.class_output} ='
+                          f' class value of the highest truth value')
+        self._write_lines(f'{target_indent}class_value = 0')
+        if self.crisp:
+            # Outputs are booleans, the first true one wins
+            for index, (var_name, class_value) in enumerate(class_values):
+                keyword = 'if' if index == 0 else 'elif'
+                output_ref = self._get_output_ref(var_name)
+                self._write_lines(
+                    f'{target_indent}{keyword} {output_ref}:',
+                    f'{target_indent}    class_value = {class_value}'
+                )
+            class_truth = '1.0 if class_value != 0 else 0.0'
+        else:
+            # On ties, the first output wins
+            self._write_lines(f'{target_indent}class_truth = 0.0')
+            for var_name, class_value in class_values:
+                output_ref = self._get_output_ref(var_name)
+                self._write_lines(
+                    f'{target_indent}if {output_ref} > class_truth:',
+                    f'{target_indent}    class_value = {class_value}',
+                    f'{target_indent}    class_truth = {output_ref}'
+                )
+            class_truth = 'class_truth'
+
+        self._write_lines(
+            f'{target_indent}{self._get_output_ref(self.class_output)}'
+            f' = class_value'
+        )
+        if self.class_confidence:
+            if self.quantize != QUANTIZE_NONE:
+                class_truth = self._get_quantized_value(class_truth)
+            self._write_lines(
+                f'{target_indent}{self._get_output_ref(self.class_confidence)}'
+                f' = {class_truth}'
+            )
+
+    def _write_param_array_checks(self):
+        # Numba doesn't check array bounds, so check them once here
+        if not self.param_arrays:
+            return
+        if self.region_input:
+            region_ref = self.expr_gen.inputs_ref + self.region_input
+            if self.vectorize == VECTORIZE_NONE:
+                num_regions = f'{region_ref} + 1'
+            else:
+                num_regions = f'{region_ref}.max() + 1' \
+                              f' if {region_ref}.size else 0'
+            self._write_lines(f'    num_regions = {num_regions}')
+            for param_name in self.param_arrays:
+                self._write_lines(
+                    f'    if params.{param_name}.size < num_regions:',
+                    f'        raise ValueError("parameter array'
+                    f' {param_name} must have a value for each region")'
+                )
+        elif self.vectorize == VECTORIZE_FUNC or self.block_size:
+            # Otherwise, array shapes are checked when broadcast
+            for param_name in self.param_arrays:
+                self._write_lines(
+                    f'    if params.{param_name}.size != size:',
+                    f'        raise ValueError("parameter array'
+                    f' {param_name} must have a value for each element")'
+                )
+
+    def _write_crisp_rules(self):
+        target_indent = self._get_target_indent()
+
+        # Assigning a "false()" property makes an output true, if the
+        # assignment's branch is not taken (fuzzy: "not t"). Therefore,
+        # we count the taken branches of such assignments.
+        false_counts = OrderedDict()
+        for assignment in iter_assignments(self.rules):
+            var_name = assignment.var_name
+            if self._get_output_prop_value(var_name, assignment.prop_name) \
+                    == 'false()':
+                false_counts[var_name] = false_counts.get(var_name, 0) + 1
+        self.false_count_names = {var_name: f'c_{var_name}'
+                                  for var_name in false_counts.keys()}
+
+        assigned_names = OrderedDict()
+        for assignment in iter_assignments(self.rules):
+            assigned_names[assignment.var_name] = True
+        for var_name in assigned_names.keys():
+            output_ref = self._get_output_ref(var_name)
+            self._write_lines(f'{target_indent}{output_ref} = False')
+        for count_name in self.false_count_names.values():
+            self._write_lines(f'{target_indent}{count_name} = 0')
+
         for rule in self.rules:
-            self._write_rule_body(rule, 0, 1)
+            self._write_crisp_rule_body(rule, 0)
+
+        for var_name, false_count in false_counts.items():
+            output_ref = self._get_output_ref(var_name)
+            count_name = self.false_count_names[var_name]
+            self._write_lines(
+                f'{target_indent}if {count_name} != {false_count}:',
+                f'{target_indent}    {output_ref} = True'
+            )
 
-    def _get_numba_decorator(self, prop_func=False):
+    def _write_crisp_rule_body(self, body: Body, source_level: int):
+        source_indent = (4 * source_level) * ' '
+        target_indent = self._get_target_indent()
+        if not body:
+            self._write_lines(f'{target_indent}pass')
+        for stmt in body:
+            keyword = stmt.keyword
+            if isinstance(stmt, (If, Elif)):
+                condition = self.expr_gen.gen_expr(stmt.condition)
+                self._write_lines(
+                    f'{target_indent}# {source_indent}{keyword}'
+                    f' {stmt.condition}:',
+                    f'{target_indent}{keyword} {condition}:'
+                )
+            elif isinstance(stmt, Else):
+                self._write_lines(
+                    f'{target_indent}# {source_indent}else:',
+                    f'{target_indent}else:'
+                )
+            else:
+                var_name, var_value = stmt.var_name, stmt.prop_name
+                prop_value = self._get_output_prop_value(var_name, var_value)
+                if prop_value == 'true()':
+                    target_line = f'{self._get_output_ref(var_name)} = True'
+                else:
+                    target_line = f'{self.false_count_names[var_name]} += 1'
+                self._write_lines(
+                    f'{target_indent}# {source_indent}{var_name}'
+                    f' = {var_value}',
+                    f'{target_indent}{target_line}'
+                )
+                continue
+            self.nesting_level += 1
+            self._write_crisp_rule_body(stmt.body, source_level + 1)
+            self.nesting_level -= 1
+
+    def _write_common_memberships(self):
+        self.expr_gen.membership_names = {}
+        self._write_memberships(self.common_memberships)
+
+    def _write_memberships(self, memberships: List[Tuple[VarName, PropName]]):
+        target_indent = self._get_target_indent()
+        for var_name, prop_name in memberships:
+            [(call_expr, _, _)] = self.expr_gen.gen_memberships(
+                Membership(var_name, prop_name))
+            local_name = f'm_{var_name}_{prop_name}'
+            self._write_lines(
+                f'{target_indent}# {var_name} is {prop_name}',
+                f'{target_indent}{local_name} = {call_expr}'
+            )
+            self.expr_gen.membership_names[call_expr] = local_name
+
+    def _get_numba_decorator(self, prop_func=False, num_params=0,
+                             kernel=False, arrays=False, sweep=False,
+                             signature: Optional[str] = None):
+        cache_arg = ', cache=True' if self.jit_cache else ''
+        # Helper functions with a given signature and the arrays function,
+        # which calls the kernel, are never parallel
+        helper_func = signature is not None or arrays
+        if prop_func:
+            signature = self._get_prop_func_signature(num_params)
+        elif kernel:
+            signature = self._get_kernel_signature()
+        elif arrays:
+            signature = self._get_arrays_signature()
+        elif sweep:
+            signature = self._get_sweep_signature()
+        elif not helper_func:
+            signature = self._get_apply_rules_signature()
         if self.vectorize == VECTORIZE_PROP and prop_func:
-            numba_decorator = f'@vectorize([' \
-                              f'{self.float_type}({self.float_type})' \
-                              f'])'
+            numba_decorator = f'@vectorize([{signature}]{cache_arg})'
+        elif self.parallel and not prop_func and not helper_func:
+            numba_decorator = f'@jit({signature},' \
+                              f' nopython=True, parallel=True{cache_arg})'
         else:
-            numba_decorator = '@jit(nopython=True)'
+            numba_decorator = f'@jit({signature}, nopython=True{cache_arg})'
         if self.no_jit:
             numba_decorator = '# ' + numba_decorator
         return numba_decorator
 
+    def _get_prop_func_signature(self, num_params: int) -> str:
+        return_type = 'bool_' if self.crisp else self.float_type
+        arg_types = ', '.join([self.float_type] * (1 + num_params))
+        return f'{return_type}({arg_types})'
+
+    def _get_kernel_signature(self) -> str:
+        arg_types = [f'{self.input_dtypes.get(var_name, self.float_type)}[:]'
+                     for var_name in self.input_defs.keys()]
+        for var_name in self._get_public_output_names():
+            dtype = self.output_dtypes.get(var_name, self.float_type)
+            arg_types.append(f'{dtype}[:]')
+        if self.parameterize:
+            arg_types.append(f'{self.params_name}.class_type.instance_type')
+        return f'void({", ".join(arg_types)})'
+
+    def _get_arrays_signature(self) -> str:
+        arg_types = [f'{self.float_type}[:, ::1]'] * 2
+        if self.parameterize:
+            arg_types.append(f'{self.params_name}.class_type.instance_type')
+        return f'void({", ".join(arg_types)})'
+
+    def _get_sweep_signature(self) -> str:
+        arg_types = f'{self.inputs_name}.class_type.instance_type,' \
+                    f' {self.params_name}.class_type.instance_type,' \
+                    f' {self.float_type}[:, ::1],' \
+                    f' {self.float_type}[:, :, ::1]'
+        if self.parallel:
+            # Second signature allows for omitting "num_threads"
+            return f'[void({arg_types}, int64),' \
+                   f' void({arg_types}, Omitted(0))]'
+        return f'void({arg_types})'
+
+    def _get_apply_rules_signature(self) -> str:
+        class_names = [self.inputs_name, self.outputs_name]
+        if self.parameterize:
+            class_names.append(self.params_name)
+        arg_types = ', '.join(f'{class_name}.class_type.instance_type'
+                              for class_name in class_names)
+        if self.parallel:
+            # Second signature allows for omitting "num_threads"
+            return f'[void({arg_types}, int64),' \
+                   f' void({arg_types}, Omitted(0))]'
+        return f'void({arg_types})'
+
     def _write_inputs_class(self):
-        self._write_io_class(self.inputs_name, self.input_defs)
+        self._write_io_class(self.inputs_name, self.input_defs.keys(),
+                             var_dtypes=self.input_dtypes)
         self._write_names_accessor('input', self.input_defs.keys())
+        self._write_from_arrays_factory('inputs', self.inputs_name,
+                                        self.input_defs.keys())
 
     def _write_outputs_class(self):
-        self._write_io_class(self.outputs_name, self.output_defs)
-        self._write_names_accessor('output', self.output_defs.keys())
+        output_names = self._get_public_output_names()
+        self._write_io_class(self.outputs_name, output_names,
+                             var_dtypes=self.output_dtypes)
+        self._write_names_accessor('output', output_names)
+        if self.bitmask_output:
+            self._write_names_accessor('bitmask', self.bitmask_names)
+        # Unless processed in blocks, vectorize="prop" replaces
+        # the output arrays instead of writing into them
+        if self.vectorize == VECTORIZE_FUNC or self.block_size:
+            self._write_from_arrays_factory('outputs', self.outputs_name,
+                                            output_names)
+
+    def _write_from_arrays_factory(self, target: str, class_name: str,
+                                   var_names):
+        if self.vectorize == VECTORIZE_NONE:
+            return
+        if self.vectorize == VECTORIZE_FUNC or self.block_size:
+            # Arrays of size zero, they are replaced by the given ones
+            size_arg = '0'
+        else:
+            size_arg = ''
+        var_names = [var_name for var_name in var_names
+                     if not var_name.startswith('_')]
+        self._write_lines(
+            '', '',
+            NO_INSPECTION,
+            f'def {target}_from_arrays({", ".join(var_names)}):',
+            f'    # Given arrays are used as-is, they are not copied',
+            f'    {target} = {class_name}({size_arg})'
+        )
+        for var_name in var_names:
+            self._write_lines(f'    {target}.{var_name} = {var_name}')
+        self._write_lines(f'    return {target}')
 
-    def _write_io_class(self, class_name, var_defs):
-        self._write_class(class_name, var_defs.keys())
+    def _write_io_class(self, class_name, var_names, var_dtypes=None):
+        self._write_class(class_name, var_names, var_dtypes=var_dtypes)
 
     def _write_params(self):
         if not self.parameterize:
@@ -271,30 +1403,39 @@ class CodeGen:
                     )
                     param_names.append(qualified_param_name)
                     param_values[qualified_param_name] = param_value
-        self._write_class(self.params_name, param_names, param_values)
+        self._write_class(self.params_name, param_names, param_values,
+                          array_names=set(self.param_arrays))
 
     def _write_class(self,
                      class_name,
                      var_names,
-                     param_values: Optional[Dict[str, Any]] = None):
+                     param_values: Optional[Dict[str, Any]] = None,
+                     var_dtypes: Optional[Dict[str, str]] = None,
+                     array_names: Optional[Set[str]] = None):
 
         tab = '    '
         is_io = param_values is None
+        var_dtypes = var_dtypes or {}
+        array_names = array_names or set()
 
         spec_name = '_{}Spec'.format(class_name)
         spec_lines = ['{} = ['.format(spec_name)]
         for var_name in var_names:
             if var_name.startswith('_'):
                 continue
-            if param_values:
+            dtype = var_dtypes.get(var_name, self.float_type)
+            if param_values and var_name in array_names:
                 spec_lines.append(f'{tab}("{var_name}",'
-                                  f' {self.float_type}),')
+                                  f' {dtype}[:]),')
+            elif param_values:
+                spec_lines.append(f'{tab}("{var_name}",'
+                                  f' {dtype}),')
             elif not self.no_jit and self.vectorize != VECTORIZE_NONE:
                 spec_lines.append(f'{tab}("{var_name}",'
-                                  f' {self.float_type}[:]),')
+                                  f' {dtype}[:]),')
             else:
                 spec_lines.append(f'{tab}("{var_name}",'
-                                  f' {self.float_type}),')
+                                  f' {dtype}),')
         spec_lines.append(']')
 
         if self.no_jit:
@@ -308,7 +1449,7 @@ class CodeGen:
         if self.no_jit:
             numba_line = '# ' + numba_line
 
-        if is_io and self.vectorize == VECTORIZE_FUNC:
+        if is_io and (self.vectorize == VECTORIZE_FUNC or self.block_size):
             if self.use_py_types:
                 init_head = f'{tab}def __init__(self, size: int):'
             else:
@@ -324,73 +1465,78 @@ class CodeGen:
         for var_name in var_names:
             if var_name.startswith('_'):
                 continue
-            if param_values:
+            dtype = var_dtypes.get(var_name, self.float_type)
+            if param_values and var_name in array_names:
+                # Arrays of a single value, they are replaced by the
+                # values for each element or region
+                self._write_lines(
+                    f'{tab}{tab}self.{var_name}'
+                    f' = np.full(1, {param_values[var_name]},'
+                    f' dtype=np.{dtype})'
+                )
+            elif param_values:
                 self._write_lines(
                     f'{tab}{tab}self.{var_name}'
                     f' = {param_values[var_name]}'
                 )
-            elif is_io and self.vectorize == VECTORIZE_FUNC:
+            elif is_io and (self.vectorize == VECTORIZE_FUNC
+                            or self.block_size):
                 self._write_lines(
                     f'{tab}{tab}self.{var_name}'
-                    f' = np.zeros(size, dtype=np.{self.float_type})'
+                    f' = np.zeros(size, dtype=np.{dtype})'
                 )
             elif self.vectorize != VECTORIZE_NONE:
                 self._write_lines(
                     f'{tab}{tab}self.{var_name}'
-                    f' = np.zeros(1, dtype=np.{self.float_type})'
+                    f' = np.zeros(1, dtype=np.{dtype})'
                 )
             else:
                 self._write_lines(
-                    f'{tab}{tab}self.{var_name} = 0.0')
+                    f'{tab}{tab}self.{var_name}'
+                    f' = {_get_scalar_zero(dtype)}')
 
     def _write_rule_body(self,
-                         rule_body: RuleBody,
+                         body: Body,
                          source_level: int,
                          target_level: int):
         sub_target_level = target_level
-        for rule_stmt in rule_body:
-            keyword = rule_stmt[0]
-            if keyword == 'if':
+        for stmt in body:
+            if isinstance(stmt, If):
                 sub_target_level = target_level
-                self._write_rule_if_stmt_part(keyword,
-                                              rule_stmt[1],
-                                              rule_stmt[2],
+                self._write_rule_if_stmt_part(stmt.keyword,
+                                              stmt.condition,
+                                              stmt.body,
                                               source_level,
                                               sub_target_level)
-            elif keyword == 'elif':
+            elif isinstance(stmt, Elif):
                 sub_target_level += 1
-                self._write_rule_if_stmt_part(keyword,
-                                              rule_stmt[1],
-                                              rule_stmt[2],
+                self._write_rule_if_stmt_part(stmt.keyword,
+                                              stmt.condition,
+                                              stmt.body,
                                               source_level,
                                               sub_target_level)
-            elif keyword == 'else':
-                self._write_rule_if_stmt_part(keyword,
+            elif isinstance(stmt, Else):
+                self._write_rule_if_stmt_part(stmt.keyword,
                                               None,
-                                              rule_stmt[1],
+                                              stmt.body,
                                               source_level,
                                               sub_target_level)
-            elif keyword == '=':
-                self._write_rule_assignment(rule_stmt[1],
-                                            rule_stmt[2],
+            else:
+                self._write_rule_assignment(stmt.var_name,
+                                            stmt.prop_name,
                                             source_level,
                                             sub_target_level)
-            else:
-                raise NotImplemented
 
     def _write_rule_if_stmt_part(self,
                                  keyword: str,
-                                 condition_expr: Optional[str],
-                                 rule_body: RuleBody,
+                                 condition_expr: Optional[Condition],
+                                 body: Body,
                                  source_level: int,
                                  target_level: int):
         not_pattern = '1.0 - {x}'  # note, not using self.not_pattern here!
 
         source_indent = (4 * source_level) * ' '
-        if self.vectorize == VECTORIZE_FUNC:
-            target_indent = 8 * ' '
-        else:
-            target_indent = 4 * ' '
+        target_indent = self._get_target_indent()
 
         t0 = 't' + str(target_level - 1)
         t1 = 't' + str(target_level - 0)
@@ -404,7 +1550,7 @@ class CodeGen:
                                                          key=keyword,
                                                          expr=condition_expr)
                 )
-                target_value = self.and_pattern.format(x=t0, y=condition)
+                target_value = self._get_truth_and(t0, condition)
             else:
                 tp = 't' + str(target_level - 2)
                 self._write_lines(
@@ -413,26 +1559,53 @@ class CodeGen:
                                                          key=keyword,
                                                          expr=condition_expr)
                 )
-                target_value = self.and_pattern.format(x=tp,
-                                                       y=not_pattern.format(
-                                                           x=t0))
+                target_value = self._get_truth_and(tp,
+                                                   not_pattern.format(x=t0))
                 self._write_lines(
                     '{tind}{tvar} = {tval}'.format(tind=target_indent,
                                                    tvar=t0,
                                                    tval=target_value))
-                target_value = self.and_pattern.format(x=t0, y=condition)
+                target_value = self._get_truth_and(t0, condition)
         else:
             self._write_lines(
                 '{tind}# {sind}else:'.format(tind=target_indent,
                                              sind=source_indent)
             )
-            target_value = self.and_pattern.format(x=t0,
-                                                   y=not_pattern.format(x=t1))
+            target_value = self._get_truth_and(t0,
+                                               not_pattern.format(x=t1))
+
+        # With short-circuit evaluation, skip the condition and the body
+        # if the incoming truth value is zero. Skipped assignments are
+        # replaced by the constant values they would have produced.
+        guarded = self.short_circuit \
+            and (keyword == 'elif' or keyword == 'if' and target_level > 1)
+        if guarded:
+            self._write_lines(f'{target_indent}if {t0} != 0.0:')
+            self.nesting_level += 1
+            self.skipped_assignments.append([])
+            target_indent = self._get_target_indent()
+
         self._write_lines(
             '{tind}{tvar} = {tval}'.format(tind=target_indent,
                                            tvar=t1,
                                            tval=target_value))
-        self._write_rule_body(rule_body, source_level + 1, target_level + 1)
+        self._write_rule_body(body, source_level + 1, target_level + 1)
+
+        if guarded:
+            skipped_assignments = self.skipped_assignments.pop()
+            self.nesting_level -= 1
+            target_indent = self._get_target_indent()
+            self._write_lines(f'{target_indent}else:',
+                              f'{target_indent}    {t1} = 0.0')
+            self.nesting_level += 1
+            self._write_skipped_assignments(skipped_assignments)
+            self.nesting_level -= 1
+
+    def _get_truth_and(self, truth_var: str, value: str) -> str:
+        # The top-level truth value "t0" is always 1.0
+        if self.simplify and truth_var == 't0':
+            return value
+        return self.and_pattern.format(x=truth_var, y=value)
 
     def _write_rule_assignment(self,
                                var_name: str,
@@ -441,22 +1614,15 @@ class CodeGen:
                                target_level: int):
 
         source_indent = (4 * source_level) * ' '
-        if self.vectorize == VECTORIZE_FUNC:
-            target_indent = 8 * ' '
-        else:
-            target_indent = 4 * ' '
+        target_indent = self._get_target_indent()
 
         t0 = 't' + str(target_level - 1)
 
-        _, prop_def = self._get_output_def(var_name, var_value)
-        prop_value, _, _ = prop_def
+        prop_value = self._get_output_prop_value(var_name, var_value)
         if prop_value == 'true()':
             assignment_value = t0
-        elif prop_value == 'false()':
-            assignment_value = self.not_pattern.format(x=t0)
         else:
-            raise ValueError('Currently you can only assign properties,'
-                             ' whose values are "true()" or "false()')
+            assignment_value = self.not_pattern.format(x=t0)
 
         output_assignments = self.output_assignments.get(var_name)
         if output_assignments is None:
@@ -465,70 +1631,94 @@ class CodeGen:
         else:
             output_assignments.append(assignment_value)
 
-        out_pattern = '{tval}'
-        if len(output_assignments) > 1:
-            if self.vectorize == VECTORIZE_FUNC:
-                out_pattern = self.or_pattern.format(x='outputs.{name}[i]',
-                                                     y=out_pattern)
+        is_first = len(output_assignments) == 1
+        if self.skipped_assignments:
+            if prop_value == 'true()':
+                zero_value = '0.0'
             else:
-                out_pattern = self.or_pattern.format(x='outputs.{name}',
-                                                     y=out_pattern)
-
-        container_ref = ''
-        if not var_name.startswith('_'):
-            container_ref = 'outputs.'
+                zero_value = self.not_pattern.format(x='0.0')
+            for skipped_assignments in self.skipped_assignments:
+                skipped_assignments.append((var_name, zero_value, is_first))
 
-        source_line_pattern = '{tind}# {sind}{name} = {sval}'
-        if self.vectorize == VECTORIZE_FUNC:
-            target_line_pattern = '{tind}{ref}{name}[i] = ' + out_pattern
+        output_ref = self._get_output_ref(var_name)
+        if is_first:
+            output_value = assignment_value
         else:
-            target_line_pattern = '{tind}{ref}{name} = ' + out_pattern
+            output_value = self.or_pattern.format(x=output_ref,
+                                                  y=assignment_value)
 
         self._write_lines(
-            source_line_pattern.format(tind=target_indent,
-                                       sind=source_indent,
-                                       name=var_name,
-                                       sval=var_value),
-            target_line_pattern.format(tind=target_indent,
-                                       ref=container_ref,
-                                       name=var_name,
-                                       tval=assignment_value)
+            f'{target_indent}# {source_indent}{var_name} = {var_value}',
+            f'{target_indent}{output_ref} = {output_value}'
         )
 
+    def _write_skipped_assignments(self, skipped_assignments):
+        target_indent = self._get_target_indent()
+        for var_name, zero_value, is_first in skipped_assignments:
+            output_ref = self._get_output_ref(var_name)
+            if is_first:
+                output_value = zero_value
+            elif zero_value == '0.0':
+                # "x or 0" is "x"
+                continue
+            else:
+                output_value = self.or_pattern.format(x=output_ref,
+                                                      y=zero_value)
+            self._write_lines(f'{target_indent}{output_ref} = {output_value}')
+
+    def _get_output_ref(self, var_name: str) -> str:
+        local_name = self.expr_gen.local_var_names.get(var_name)
+        if local_name is not None:
+            return local_name
+        return self._get_stored_output_ref(var_name)
+
+    def _get_stored_output_ref(self, var_name: str) -> str:
+        container_ref = ''
+        if not var_name.startswith('_'):
+            container_ref = self.expr_gen.outputs_ref
+        subscript = _get_subscript(var_name,
+                                   self.vectorize,
+                                   self.block_size)
+        return f'{container_ref}{var_name}{subscript}'
+
+    def _get_target_indent(self) -> str:
+        if self.vectorize == VECTORIZE_FUNC or self.block_size:
+            level = 2 + self.nesting_level
+        else:
+            level = 1 + self.nesting_level
+        return (4 * level) * ' '
+
     def _write_derived_var(self, var_name, var_type: str, source_expr: str):
 
         decompiler = DerivedExprDecompiler(self.input_defs,
                                            self.output_defs,
                                            self.derived_defs,
-                                           self.vectorize)
+                                           self.vectorize,
+                                           self.block_size,
+                                           self.expr_gen.inputs_ref,
+                                           self.expr_gen.outputs_ref,
+                                           self.input_dtypes,
+                                           self.float_type,
+                                           self.expr_gen.local_var_names)
         target_expr = decompiler.decompile(ast.parse(source_expr))
 
-        if self.vectorize == VECTORIZE_FUNC:
-            target_indent = 8 * ' '
-        else:
-            target_indent = 4 * ' '
-
-        container_ref = ''
-        if not var_name.startswith('_'):
-            container_ref = 'outputs.'
-
-        source_line_pattern = '{tind}# {name} = {expr}: {type}'
-        if self.vectorize == VECTORIZE_FUNC:
-            target_line_pattern = '{tind}{ref}{name}[i] = {expr}'
-        else:
-            target_line_pattern = '{tind}{ref}{name} = {expr}'
+        target_indent = self._get_target_indent()
 
         self._write_lines(
-            source_line_pattern.format(tind=target_indent,
-                                       name=var_name,
-                                       expr=source_expr,
-                                       type=var_type),
-            target_line_pattern.format(tind=target_indent,
-                                       ref=container_ref,
-                                       name=var_name,
-                                       expr=target_expr)
+            f'{target_indent}# {var_name} = {source_expr}: {var_type}',
+            f'{target_indent}{self._get_output_ref(var_name)} = {target_expr}'
         )
 
+    def _get_output_prop_value(self,
+                               var_name: VarName,
+                               prop_name: PropName) -> str:
+        _, prop_def = self._get_output_def(var_name, prop_name)
+        prop_value, _, _ = prop_def
+        if prop_value != 'true()' and prop_value != 'false()':
+            raise ValueError('Currently you can only assign properties,'
+                             ' whose values are "true()" or "false()')
+        return prop_value
+
     def _get_output_def(self,
                         var_name: VarName,
                         prop_name: PropName) -> Tuple[TypeName, PropDef]:
@@ -557,10 +1747,18 @@ class FuzzyExprGen:
                  derived_defs: Optional[DerivedDefs] = None,
                  parameterize: bool = False,
                  vectorize: str = VECTORIZE_NONE,
+                 block_size: int = 0,
                  no_jit: bool = False,
                  not_pattern: str = '1.0 - ({x})',
                  and_pattern: str = 'min({x}, {y})',
-                 or_pattern: str = 'max({x}, {y})'):
+                 or_pattern: str = 'max({x}, {y})',
+                 bucket_tables: Optional[Dict[TypeName, BucketTable]] = None,
+                 input_dtypes: Optional[Dict[VarName, str]] = None,
+                 lookup_dtypes: Optional[Dict[VarName, str]] = None,
+                 float_type: str = 'float64',
+                 param_arrays: Optional[Iterable[str]] = None,
+                 region_input: Optional[VarName] = None,
+                 local_var_names: Optional[Dict[VarName, str]] = None):
 
         assert type_defs is not None
         assert input_defs is not None
@@ -583,111 +1781,173 @@ class FuzzyExprGen:
 
         self.parameterize = parameterize
         self.vectorize = vectorize
+        self.block_size = block_size
         self.no_jit = no_jit
         self.not_pattern = not_pattern
         self.and_pattern = and_pattern
         self.or_pattern = or_pattern
+        # Maps membership function calls to the names of local
+        # variables that hold their precomputed values
+        self.membership_names: Dict[str, str] = {}
+        # Prefixes used to refer to input and output variables
+        self.inputs_ref = INPUTS_REF
+        self.outputs_ref = OUTPUTS_REF
+        # Maps type names to the bucket tables of their properties,
+        # see option "bucketing"
+        self.bucket_tables = bucket_tables or {}
+        # Maps input names to their dtype if declared
+        self.input_dtypes = input_dtypes or {}
+        # Maps input names to their dtype, if their memberships
+        # are looked up in tables
+        self.lookup_dtypes = lookup_dtypes or {}
+        self.float_type = float_type
+        # Names of the parameters given by arrays and the input
+        # that indexes them, see option "param_arrays"
+        self.param_arrays: Set[str] = set(param_arrays or ())
+        self.region_input = region_input
+        # Maps variable names to the names of local variables that hold
+        # their values, see options "class_output", "quantize", "sweep"
+        self.local_var_names = local_var_names or {}
+        # Maps parameter names to the expressions that replace
+        # the members of the params object, see option "sweep"
+        self.param_refs: Dict[str, str] = {}
+
+    def gen_expr(self, rule_condition: Union[str, Condition]) -> str:
+        condition = self._parse_condition(rule_condition)
+        return self._transpile_expression(condition)
+
+    def gen_memberships(self, rule_condition: Union[str, Condition]) \
+            -> List[Tuple[str, VarName, PropName]]:
+        """
+        Get the membership function calls made by the given condition.
+
+        :param rule_condition: The rule condition or its IR
+        :return: A list of tuples of the form
+            (call_expr, var_name, prop_name).
+        """
+        return [(self._transpile_membership(membership),
+                 membership.var_name,
+                 membership.prop_name)
+                for membership in
+                iter_memberships(self._parse_condition(rule_condition))]
+
+    @staticmethod
+    def _parse_condition(rule_condition: Union[str, Condition]) -> Condition:
+        if isinstance(rule_condition, Condition):
+            return rule_condition
+        return parse_condition(rule_condition)
+
+    def get_var_ref(self, var_name: VarName) -> str:
+        local_name = self.local_var_names.get(var_name)
+        if local_name is not None:
+            return local_name
+        if var_name in self.input_defs:
+            container_ref = self.inputs_ref
+        elif var_name in self.var_defs and not var_name.startswith('_'):
+            container_ref = self.outputs_ref
+        else:
+            container_ref = ''
 
-    def gen_expr(self, rule_condition: str) -> str:
-        mod = ast.parse(rule_condition)
-
-        body = mod.body
-        if len(body) != 1 or not isinstance(body[0], ast.Expr):
-            raise ValueError(f'Invalid condition'
-                             f' expression: [{rule_condition}]')
-
-        expr = body[0].value
-        return self._transpile_expression(expr)
+        subscript = _get_subscript(var_name,
+                                   self.vectorize,
+                                   self.block_size)
 
-    def _transpile_expression(self, expr) -> str:
-        if isinstance(expr, ast.Compare):
+        return f'{container_ref}{var_name}{subscript}'
 
-            left = expr.left
-            if not isinstance(left, ast.Name):
-                raise ValueError('Left side of comparison must'
-                                 ' be the name of an input or an output')
+    def get_float_var_ref(self, var_name: VarName) -> str:
+        return _get_converted_ref(self.get_var_ref(var_name),
+                                  self.input_dtypes.get(var_name),
+                                  self.float_type,
+                                  self.vectorize)
 
-            var_name = expr.left.id
-            if var_name in self.input_defs:
-                container_ref = 'inputs.'
-            elif var_name in self.var_defs and not var_name.startswith('_'):
-                container_ref = 'outputs.'
-            else:
-                container_ref = ''
-
-            prop_name = expr.comparators[0].id
-            compare_op = expr.ops[0]
-            if isinstance(compare_op, ast.Eq) \
-                    or isinstance(compare_op, ast.Is):
-                if self.vectorize == VECTORIZE_FUNC:
-                    op_pattern = '_{t}_{r}({c}{l}{p}[i])'
-                else:
-                    op_pattern = '_{t}_{r}({c}{l}{p})'
-            elif isinstance(compare_op, ast.NotEq) \
-                    or isinstance(compare_op, ast.IsNot):
-                if self.vectorize == VECTORIZE_FUNC:
-                    op_pattern = self.not_pattern.format(
-                        x='_{t}_{r}({c}{l}{p}[i])')
-                else:
-                    op_pattern = self.not_pattern.format(
-                        x='_{t}_{r}({c}{l}{p})')
+    def get_param_ref(self,
+                      qualified_param_name: str,
+                      param_name: PropFuncParamName) -> str:
+        subscript = ''
+        if qualified_param_name in self.param_arrays:
+            if self.region_input:
+                subscript = f'[{self.get_var_ref(self.region_input)}]'
             else:
-                raise ValueError('"==", "!=", "is", and "is not"'
-                                 ' are the only supported comparison'
-                                 ' operators')
-            type_name, prop_def = _get_type_name_and_prop_def(
-                var_name, prop_name, self.type_defs, self.var_defs
+                subscript = _get_subscript(qualified_param_name,
+                                           self.vectorize,
+                                           self.block_size)
+        param_ref = self.param_refs.get(qualified_param_name)
+        if param_ref is None:
+            param_ref = f'params.{qualified_param_name}{subscript}'
+        if self.vectorize == VECTORIZE_PROP:
+            # Numba's vectorized functions don't accept keyword arguments,
+            # parameters are passed in the order of their declaration
+            return param_ref
+        return f'{param_name}={param_ref}'
+
+    def is_bucketed(self, membership: Membership) -> bool:
+        if membership.var_name in self.lookup_dtypes:
+            return False
+        bucket_table = self.bucket_tables.get(
+            self.var_defs.get(membership.var_name))
+        return bucket_table is not None \
+            and membership.prop_name in bucket_table.truths
+
+    def _transpile_membership(self, membership: Membership) -> str:
+        var_name = membership.var_name
+
+        prop_name = membership.prop_name
+        type_name, prop_def = _get_type_name_and_prop_def(
+            var_name, prop_name, self.type_defs, self.var_defs
+        )
+        dtype = self.lookup_dtypes.get(var_name)
+        if dtype is not None:
+            return f'_{type_name}_{prop_name}_{dtype}' \
+                   f'[{self.get_var_ref(var_name)}]'
+
+        var_ref = self.get_float_var_ref(var_name)
+        if self.is_bucketed(membership):
+            bucket_index = BUCKET_INDEX_PREFIX + var_name
+            truths = self.bucket_tables[type_name].truths[prop_name]
+            if None in truths:
+                return f'_{type_name}_{prop_name}_bucketed' \
+                       f'({var_ref}, {bucket_index})'
+            return f'_{type_name}_{prop_name}_TRUTHS[{bucket_index}]'
+
+        _, func_params, _ = prop_def
+        if self.parameterize and func_params:
+            params = ', ' + ', '.join(
+                [self.get_param_ref(_get_qualified_param_name(type_name,
+                                                              prop_name,
+                                                              param_name),
+                                    param_name)
+                 for param_name in func_params.keys()]
             )
-            _, func_params, _ = prop_def
-            if self.parameterize and func_params:
-                params = ', ' + ', '.join(
-                    ['{p}=params.{qp}'.format(p=param_name,
-                                              qp=_get_qualified_param_name(
-                                                  type_name,
-                                                  prop_name,
-                                                  param_name)
-                                              )
-                     for param_name in func_params.keys()]
-                )
-            else:
-                params = ''
-            return op_pattern.format(t=type_name,
-                                     r=prop_name,
-                                     l=var_name,
-                                     p=params,
-                                     c=container_ref)
-
-        if isinstance(expr, ast.UnaryOp):
-            op = expr.op
-            if isinstance(op, ast.Not):
-                op_pattern = self.not_pattern
-            else:
-                raise ValueError('"not" is the only supported unary operator')
-            v = expr.operand
-            t = self._transpile_expression(v)
-            return op_pattern.format(x=t)
-
-        if isinstance(expr, ast.BoolOp):
-            op = expr.op
-            if isinstance(op, ast.And):
-                op_pattern = self.and_pattern
-            elif isinstance(op, ast.Or):
-                op_pattern = self.or_pattern
+        else:
+            params = ''
+        return f'_{type_name}_{prop_name}({var_ref}{params})'
+
+    def _transpile_expression(self, condition: Condition) -> str:
+        if isinstance(condition, Membership):
+            call_expr = self._transpile_membership(condition)
+            call_expr = self.membership_names.get(call_expr, call_expr)
+            if condition.negated:
+                return self.not_pattern.format(x=call_expr)
+            return call_expr
+
+        if isinstance(condition, Const):
+            # Constant truth value, e.g. a folded "const(t)" property
+            return repr(condition.value)
+
+        if isinstance(condition, Not):
+            return self.not_pattern.format(
+                x=self._transpile_expression(condition.operand))
+
+        op_pattern = self.and_pattern \
+            if isinstance(condition, And) else self.or_pattern
+        t1 = None
+        for operand in condition.operands:
+            if t1 is None:
+                t1 = self._transpile_expression(operand)
             else:
-                raise ValueError('"and" and "or" are the only'
-                                 ' supported binary operators')
-
-            t1 = None
-            for v in expr.values:
-                if t1 is None:
-                    t1 = self._transpile_expression(v)
-                else:
-                    t2 = self._transpile_expression(v)
-                    t1 = op_pattern.format(x=t1, y=t2)
-
-            return t1
-
-        raise ValueError('Unsupported expression')
+                t2 = self._transpile_expression(operand)
+                t1 = op_pattern.format(x=t1, y=t2)
+        return t1
 
 
 def _get_type_name_and_prop_def(
@@ -710,6 +1970,102 @@ def _get_type_name_and_prop_def(
     return type_name, prop_def
 
 
+def _get_subscript(var_name: VarName,
+                   vectorize: str,
+                   block_size: int = 0) -> str:
+    if vectorize == VECTORIZE_FUNC:
+        # Intermediate derived variables are loop-local scalars,
+        # they are only used within the same pixel iteration
+        if var_name.startswith('_'):
+            return ''
+        return '[i]'
+    if vectorize == VECTORIZE_PROP and block_size \
+            and not var_name.startswith('_'):
+        return '[start:stop]'
+    return ''
+
+
+def _get_array_func_body(func_body: str) -> str:
+    """
+    Convert the body of a membership function given in
+    ``dectree.propfuncs`` into a branch-free body that operates on
+    NumPy arrays. The if-return ladder becomes nested ``np.where()``
+    calls, constant results become ``np.full()`` calls.
+    """
+    decompiler = ExprDecompiler()
+    lines = []
+    cases = []
+    for stmt in ast.parse(func_body).body:
+        if isinstance(stmt, ast.Assign):
+            lines.append(decompiler.decompile(stmt.targets[0])
+                         + ' = ' + decompiler.decompile(stmt.value))
+        elif isinstance(stmt, ast.If) \
+                and not stmt.orelse \
+                and len(stmt.body) == 1 \
+                and isinstance(stmt.body[0], ast.Return):
+            cases.append((stmt.test, stmt.body[0].value))
+        elif isinstance(stmt, ast.Return):
+            value = stmt.value
+            while isinstance(value, ast.IfExp):
+                cases.append((value.test, value.body))
+                value = value.orelse
+            if cases:
+                expr = decompiler.decompile(value)
+                for test, case_value in reversed(cases):
+                    expr = 'np.where({}, {}, {})'.format(
+                        decompiler.decompile(test),
+                        decompiler.decompile(case_value),
+                        expr
+                    )
+            else:
+                expr = 'np.full(np.shape(x), {})'.format(
+                    decompiler.decompile(value)
+                )
+            lines.append('return ' + expr)
+            break
+        else:
+            raise ValueError(f'Cannot vectorize membership'
+                             f' function: {func_body}')
+    return '\n'.join(lines)
+
+
+def _parse_type_spec(var_name: VarName,
+                     type_spec: str) -> Tuple[TypeName, Optional[str]]:
+    match = _TYPE_SPEC_REGEX.match(type_spec)
+    if not match:
+        return type_spec, None
+    type_name, dtype = match.groups()
+    if dtype not in INPUT_DTYPES:
+        raise ValueError(f'Unsupported dtype "{dtype}" of input'
+                         f' "{var_name}", must be one of'
+                         f' {", ".join(INPUT_DTYPES)}')
+    return type_name, dtype
+
+
+def _get_converted_ref(var_ref: str,
+                       dtype: Optional[str],
+                       float_type: str,
+                       vectorize: str) -> str:
+    if dtype is None or dtype == float_type:
+        return var_ref
+    if vectorize == VECTORIZE_PROP:
+        return f'{var_ref}.astype(np.{float_type})'
+    return f'np.{float_type}({var_ref})'
+
+
+def _format_float_list(values: List[Optional[float]]) -> str:
+    return '[' + ', '.join('np.nan' if value is None else repr(value)
+                           for value in values) + ']'
+
+
+def _get_scalar_zero(dtype: str) -> str:
+    if dtype == 'bool_':
+        return 'False'
+    if dtype.startswith('float'):
+        return '0.0'
+    return '0'
+
+
 def _get_qualified_param_name(type_name: TypeName,
                               prop_name: PropName,
                               param_name: PropFuncParamName) -> str:
@@ -728,7 +2084,7 @@ def _get_config_op_pattern(options, op_pattern_name):
 def _get_effective_op_pattern(op_pattern,
                               no_jit=False,
                               vectorize=VECTORIZE_NONE):
-    if not no_jit and vectorize == VECTORIZE_PROP:
+    if vectorize == VECTORIZE_PROP:
         # TODO: improve following naive replacements,
         #  e.g. use regex-based approach
         return op_pattern \
@@ -743,11 +2099,23 @@ class DerivedExprDecompiler(ExprDecompiler):
                  input_defs: VarDefs,
                  output_defs: VarDefs,
                  derived_defs: DerivedDefs,
-                 vectorize: str = None):
+                 vectorize: str = None,
+                 block_size: int = 0,
+                 inputs_ref: str = INPUTS_REF,
+                 outputs_ref: str = OUTPUTS_REF,
+                 input_dtypes: Optional[Dict[VarName, str]] = None,
+                 float_type: str = 'float64',
+                 local_var_names: Optional[Dict[VarName, str]] = None):
         self.input_defs = input_defs
         self.output_defs = output_defs
         self.derived_defs = derived_defs
         self.vectorize = vectorize
+        self.block_size = block_size
+        self.inputs_ref = inputs_ref
+        self.outputs_ref = outputs_ref
+        self.input_dtypes = input_dtypes or {}
+        self.float_type = float_type
+        self.local_var_names = local_var_names or {}
 
     def transform_name(self, name: ast.Name):
 
@@ -755,17 +2123,26 @@ class DerivedExprDecompiler(ExprDecompiler):
 
         container_ref = ''
         if var_name in self.input_defs:
-            container_ref = 'inputs.'
+            container_ref = self.inputs_ref
         elif not var_name.startswith('_') \
                 and (var_name in self.input_defs
                      or var_name in self.derived_defs):
-            container_ref = 'outputs.'
-
-        subscript = ''
-        if self.vectorize == VECTORIZE_FUNC:
-            subscript = '[i]'
-
-        return '{c}{n}{s}'.format(c=container_ref, n=var_name, s=subscript)
+            container_ref = self.outputs_ref
+
+        subscript = _get_subscript(var_name,
+                                   self.vectorize,
+                                   self.block_size)
+
+        var_ref = self.local_var_names.get(var_name)
+        if var_ref is None:
+            var_ref = '{c}{n}{s}'.format(c=container_ref,
+                                         n=var_name,
+                                         s=subscript)
+        # Integer inputs are converted, so that arithmetic cannot overflow
+        return _get_converted_ref(var_ref,
+                                  self.input_dtypes.get(var_name),
+                                  self.float_type,
+                                  self.vectorize)
 
     def transform_function_name(self, func: ast.Name):
         func_name = func.id
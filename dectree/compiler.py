@@ -1,16 +1,28 @@
+import builtins
+import hashlib
+import importlib.util
+import inspect
+import json
+import linecache
 import os
 import os.path
 import sys
 import tempfile
+import types
+import uuid
 from io import StringIO
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 
 from .config import CONFIG_NAME_FUNCTION_NAME, CONFIG_NAME_INPUTS_NAME, CONFIG_NAME_OUTPUTS_NAME, \
-    CONFIG_NAME_PARAMS_NAME, CONFIG_NAME_PARAMETERIZE, get_config_value
+    CONFIG_NAME_PARAMS_NAME, CONFIG_NAME_PARAMETERIZE, CONFIG_NAME_JIT_CACHE, get_config_value
 from .transpiler import transpile
+from .version import version
 
 
-def compile(src_file, **options: Dict[str, Any]) -> Tuple[Any, ...]:
+def compile(src_file,
+            cache_dir: Optional[str] = None,
+            warmup: bool = False,
+            **options: Dict[str, Any]) -> Tuple[Any, ...]:
     """
     Generate a decision tree function by compiling *src_file* using the given *options*.
     Return a tuple:::
@@ -32,38 +44,174 @@ def compile(src_file, **options: Dict[str, Any]) -> Tuple[Any, ...]:
         apply_rules(inputs, outputs, params)
         # get members of outputs members here...
 
+    If *cache_dir* is given, the generated module is stored in that directory. Its name is derived from
+    a hash of the decision tree source, the *options*, and the versions of dectree and Numba.
+    Subsequent calls with the same source and options, also from other processes, import the stored module
+    instead of transpiling again. As the module is generated with option ``jit_cache=True``,
+    Numba also reuses the machine code it compiled and cached before.
+
+    Without *cache_dir*, the generated module lives in memory only. Call :func:`dispose` with any of the
+    returned objects to release it. Numba cannot cache the functions of in-memory modules, so option
+    ``jit_cache`` requires a *cache_dir*, and ``jit_cache`` given in the source is ignored.
+
+    The generated ``apply_rules`` function has explicit Numba signatures and is therefore compiled when the module
+    is loaded. The Numba classes however are compiled lazily, when they are first instantiated and their members
+    are first accessed. Pass ``warmup=True`` to also do this here, so the first call has the same latency as
+    subsequent ones.
+
     :param src_file: A file descriptor or a path-like object to the decision tree definition source file (YAML format)
+    :param cache_dir: optional path to a directory used to cache generated modules
+    :param warmup: whether to force compilation of the returned classes
     :param options: options, refer to `dectree --help`
     :return: A tuple ``(apply_rules, Inputs, Outputs)`` or ``(apply_rules, Inputs, Outputs, Params)``
     """
 
-    text_io = StringIO()
-    transpile(src_file, text_io, **options)
-
-    py_code = text_io.getvalue()
-
-    _, out_path = tempfile.mkstemp(suffix='.py', prefix='dectree_', text=True)
-    with open(out_path, 'w') as out_fp:
-        out_fp.write(py_code)
-
-    dectree_module = _import_module_from_file(out_path)
+    if cache_dir is not None:
+        dectree_module = _load_cached_module(src_file, cache_dir, options)
+    else:
+        if get_config_value(options, CONFIG_NAME_JIT_CACHE):
+            raise ValueError(f'Option "{CONFIG_NAME_JIT_CACHE}" requires a cache_dir,'
+                             f' as Numba cannot cache the functions of in-memory modules')
+        # Also overrides the option if given in the source
+        text_io = StringIO()
+        transpile(src_file, text_io, **dict(options, **{CONFIG_NAME_JIT_CACHE: False}))
+        dectree_module = _load_module_from_code(text_io.getvalue())
 
     names = [CONFIG_NAME_FUNCTION_NAME, CONFIG_NAME_INPUTS_NAME, CONFIG_NAME_OUTPUTS_NAME]
     if get_config_value(options, CONFIG_NAME_PARAMETERIZE):
         names += [CONFIG_NAME_PARAMS_NAME]
     names = [get_config_value(options, name) for name in names]
 
-    return tuple(getattr(dectree_module, name) for name in names)
+    result = tuple(getattr(dectree_module, name) for name in names)
+    if warmup:
+        for cls in result[1:]:
+            _warmup_class(cls)
+    return result
+
+
+def _warmup_class(cls):
+    class_type = getattr(cls, 'class_type', None)
+    if class_type is None:
+        # Not a Numba class, e.g. if option "no_jit" is set
+        return
+    # Whether classes take a size also depends on the options given in the
+    # source, so ask the constructor. Params classes never take a size.
+    init_params = inspect.signature(class_type.jit_methods['__init__'].py_func).parameters
+    obj = cls(1) if 'size' in init_params else cls()
+    for name in class_type.struct.keys():
+        setattr(obj, name, getattr(obj, name))
+
+
+def _load_cached_module(src_file, cache_dir: str, options: Dict[str, Any]):
+    src_code = _read_src_code(src_file)
+
+    options = dict(options)
+    options[CONFIG_NAME_JIT_CACHE] = True
+
+    module_name = 'dectree_' + _get_cache_key(src_code, options)
+    module_path = os.path.join(cache_dir, module_name + '.py')
+
+    if not os.path.exists(module_path):
+        text_io = StringIO()
+        transpile(StringIO(src_code), text_io, **options)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first, so concurrent processes
+        # never import a partially written module
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', prefix=module_name, dir=cache_dir, text=True)
+        with os.fdopen(fd, 'w') as out_fp:
+            out_fp.write(text_io.getvalue())
+        os.replace(tmp_path, module_path)
+
+    module_obj = sys.modules.get(module_name)
+    if module_obj is None:
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module_obj = importlib.util.module_from_spec(spec)
+        # Register the module before executing it, as Numba records the
+        # module of the functions it caches and imports it when loading them
+        sys.modules[module_name] = module_obj
+        try:
+            spec.loader.exec_module(module_obj)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+    return module_obj
+
+
+def _read_src_code(src_file) -> str:
+    try:
+        with open(src_file) as fp:
+            return fp.read()
+    except TypeError:
+        return src_file.read()
 
 
-def _import_module_from_file(full_path_to_module: str):
-    module_dir, module_file = os.path.split(full_path_to_module)
-    module_name, module_ext = os.path.splitext(module_file)
+def _get_cache_key(src_code: str, options: Dict[str, Any]) -> str:
     try:
-        sys.path.append(module_dir)
-        module_obj = __import__(module_name)
-        module_obj.__file__ = full_path_to_module
-        globals()[module_name] = module_obj
-        return module_obj
-    finally:
-        sys.path.remove(module_dir)
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+    key_source = json.dumps(dict(src_code=src_code,
+                                 options=options,
+                                 dectree_version=version,
+                                 numba_version=numba_version),
+                            sort_keys=True,
+                            default=str)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:32]
+
+
+def dispose(*objs: Any) -> None:
+    """
+    Release the in-memory modules that have been generated by :func:`compile` for the given objects.
+
+    The module's namespace and its registered source are cleared. Numba classes keep their module alive,
+    as Numba registers their types for the lifetime of the process, so without clearing it the module's
+    functions and Numba dispatchers are never freed. Once disposed and no longer referenced, they can be
+    garbage collected. Numba however neither frees the machine code it has compiled nor the types of the
+    classes, so each compiled decision tree still leaves some memory behind. Long-running processes that
+    compile many decision trees should therefore rather compile each distinct tree once, e.g. using
+    a *cache_dir*, and dispose the modules they no longer use.
+
+    Usage:::
+
+        apply_rules, Inputs, Outputs = compile(src_file)
+        # use apply_rules here...
+        dispose(apply_rules)
+
+    Objects that don't belong to an in-memory module, e.g. those loaded from a *cache_dir*, are ignored.
+
+    :param objs: Objects returned by :func:`compile`, i.e. the ``apply_rules`` function or any of the classes
+    """
+    for obj in objs:
+        module_dict = _get_module_dict(obj)
+        if module_dict is None:
+            continue
+        file_name = module_dict.get('__file__')
+        if not isinstance(file_name, str) or not file_name.startswith(_IN_MEMORY_FILE_PREFIX):
+            continue
+        linecache.cache.pop(file_name, None)
+        module_dict.clear()
+
+
+def _get_module_dict(obj: Any) -> Optional[Dict[str, Any]]:
+    class_type = getattr(obj, 'class_type', None)
+    if class_type is not None:
+        # Numba class, its methods are functions of the module
+        obj = class_type.jit_methods['__init__']
+    elif isinstance(obj, type):
+        obj = obj.__init__
+    return getattr(getattr(obj, 'py_func', obj), '__globals__', None)
+
+
+_IN_MEMORY_FILE_PREFIX = '<dectree:'
+
+
+def _load_module_from_code(py_code: str):
+    module_name = 'dectree_' + uuid.uuid4().hex
+    file_name = _IN_MEMORY_FILE_PREFIX + module_name + '>'
+    module_obj = types.ModuleType(module_name)
+    module_obj.__file__ = file_name
+    # Register the source so that tracebacks and Numba's error messages can show it
+    linecache.cache[file_name] = (len(py_code), None, py_code.splitlines(keepends=True), file_name)
+    exec(builtins.compile(py_code, file_name, 'exec'), module_obj.__dict__)
+    return module_obj
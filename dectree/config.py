@@ -10,6 +10,26 @@ CONFIG_NAME_TYPES = 'types'
 CONFIG_NAME_NO_JIT = 'no_jit'
 CONFIG_NAME_VECTORIZE = 'vectorize'
 CONFIG_NAME_PARAMETERIZE = 'parameterize'
+CONFIG_NAME_PARALLEL = 'parallel'
+CONFIG_NAME_CSE = 'cse'
+CONFIG_NAME_SHORT_CIRCUIT = 'short_circuit'
+CONFIG_NAME_CRISP = 'crisp'
+CONFIG_NAME_BLOCK_SIZE = 'block_size'
+CONFIG_NAME_JIT_CACHE = 'jit_cache'
+CONFIG_NAME_ARRAY_KERNEL = 'array_kernel'
+CONFIG_NAME_ARRAYS = 'arrays'
+CONFIG_NAME_OUTPUTS = 'outputs'
+CONFIG_NAME_SIMPLIFY = 'simplify'
+CONFIG_NAME_BUCKETING = 'bucketing'
+CONFIG_NAME_CLASS_OUTPUT = 'class_output'
+CONFIG_NAME_CLASS_VALUES = 'class_values'
+CONFIG_NAME_CLASS_CONFIDENCE = 'class_confidence'
+CONFIG_NAME_QUANTIZE = 'quantize'
+CONFIG_NAME_QUANTIZE_SCALE = 'quantize_scale'
+CONFIG_NAME_BITMASK_OUTPUT = 'bitmask_output'
+CONFIG_NAME_PARAM_ARRAYS = 'param_arrays'
+CONFIG_NAME_REGION_INPUT = 'region_input'
+CONFIG_NAME_SWEEP = 'sweep'
 
 VECTORIZE_NONE = 'off'
 VECTORIZE_PROP = 'prop'
@@ -22,6 +42,12 @@ FLOAT64_TYPE = 'float64'
 
 FLOAT_TYPE_CHOICES = [FLOAT32_TYPE, FLOAT64_TYPE]
 
+QUANTIZE_NONE = 'off'
+QUANTIZE_UINT8 = 'uint8'
+QUANTIZE_UINT16 = 'uint16'
+
+QUANTIZE_CHOICES = [QUANTIZE_NONE, QUANTIZE_UINT8, QUANTIZE_UINT16]
+
 CONFIG_DEFAULTS = {
     CONFIG_NAME_OR_PATTERN:
         ['max({x}, {y})',
@@ -84,11 +110,178 @@ CONFIG_DEFAULTS = {
         [VECTORIZE_NONE,
          'whether to generated vectorized functions for Numpy arrays; "'
          + VECTORIZE_PROP
-         + '" vectorizes membership functions (requires Numba), "'
+         + '" vectorizes membership functions (using Numba or,'
+           ' if JIT is disabled, NumPy), "'
          + VECTORIZE_FUNC
          + '" vectorizes the decision tree function; '
            'default is "{default}"',
          VECTORIZE_CHOICES],
+    CONFIG_NAME_PARALLEL:
+        [False,
+         'whether to distribute the pixel loop over multiple CPU cores'
+         ' using Numba\'s "prange"; requires JIT and --vectorize "'
+         + VECTORIZE_FUNC
+         + '"; off by default',
+         None],
+    CONFIG_NAME_CSE:
+        [False,
+         'whether to evaluate membership functions that occur'
+         ' multiple times in the rules only once'
+         ' (common subexpression elimination);'
+         ' off by default',
+         None],
+    CONFIG_NAME_SHORT_CIRCUIT:
+        [False,
+         'whether to skip the evaluation of nested and "else if" rules'
+         ' whose incoming truth value is zero;'
+         ' cannot be used with --vectorize "'
+         + VECTORIZE_PROP
+         + '"; off by default',
+         None],
+    CONFIG_NAME_CRISP:
+        [False,
+         'whether to generate boolean code using real if/else branches;'
+         ' requires all properties to be crisp, e.g. "lt(0.5)" with dx=0,'
+         ' outputs are stored as booleans;'
+         ' cannot be used with --vectorize "'
+         + VECTORIZE_PROP
+         + '"; off by default',
+         None],
+    CONFIG_NAME_BLOCK_SIZE:
+        [0,
+         'number of array elements processed at a time, so that'
+         ' temporary arrays are bounded by the block size'
+         ' instead of the array size; requires --vectorize "'
+         + VECTORIZE_PROP
+         + '"; 0 (the default) processes all elements at once',
+         None],
+    CONFIG_NAME_JIT_CACHE:
+        [False,
+         'whether Numba shall cache the compiled functions on disk'
+         ' next to the generated module;'
+         ' off by default',
+         None],
+    CONFIG_NAME_ARRAY_KERNEL:
+        [False,
+         'whether to also generate a function "<func_name>_kernel" that'
+         ' takes one array per input and output variable instead of'
+         ' the inputs and outputs objects, followed by the params object'
+         ' if --parameterize is given; requires JIT and --vectorize "'
+         + VECTORIZE_FUNC
+         + '"; off by default',
+         None],
+    CONFIG_NAME_ARRAYS:
+        [False,
+         'whether to also generate a function "<func_name>_arrays" that'
+         ' takes a contiguous 2-D input array of shape (number of inputs, N)'
+         ' and writes into a 2-D output array of shape'
+         ' (number of outputs, N), with rows ordered as returned by'
+         ' get_input_names() and get_output_names();'
+         ' it passes the rows to "<func_name>_kernel", which is generated'
+         ' as well; requires JIT and --vectorize "'
+         + VECTORIZE_FUNC
+         + '"; off by default',
+         None],
+    CONFIG_NAME_OUTPUTS:
+        ['',
+         'comma-separated names of the outputs to be computed;'
+         ' rules, assignments, and derived variables that don\'t'
+         ' contribute to these outputs are omitted;'
+         ' all outputs by default',
+         None],
+    CONFIG_NAME_SIMPLIFY:
+        [False,
+         'whether to simplify rule conditions before generating code:'
+         ' fold the constant properties true(), false(), and const(t),'
+         ' remove double negations, and drop neutral "and"/"or" operands;'
+         ' off by default',
+         None],
+    CONFIG_NAME_BUCKETING:
+        [False,
+         'whether to gather the breakpoints of all properties of a type'
+         ' into one sorted table, locate the bucket of each variable'
+         ' value once by binary search, and look up the truth values'
+         ' of its properties; cannot be used with --vectorize "'
+         + VECTORIZE_PROP
+         + '", --parameterize, or --crisp; off by default',
+         None],
+    CONFIG_NAME_CLASS_OUTPUT:
+        ['',
+         'name of an output that receives the class value of the output'
+         ' with the highest truth value (winner-take-all), 0 if all are zero;'
+         ' the class outputs are then only computed per element and'
+         ' not stored; cannot be used with --vectorize "'
+         + VECTORIZE_PROP
+         + '"; not generated by default',
+         None],
+    CONFIG_NAME_CLASS_VALUES:
+        ['',
+         'comma-separated "<output>=<value>" pairs giving the class values'
+         ' in the range 1 to 65535 of the outputs combined by'
+         ' --class_output, e.g. as found in ENVI decision trees;'
+         ' class values are stored as uint8 if they are less than 256'
+         ' and as uint16 otherwise; by default, all outputs are'
+         ' combined and numbered from 1',
+         None],
+    CONFIG_NAME_CLASS_CONFIDENCE:
+        ['',
+         'name of an output that receives the truth value of the class'
+         ' selected by --class_output; not generated by default',
+         None],
+    CONFIG_NAME_QUANTIZE:
+        [QUANTIZE_NONE,
+         'integer dtype used to store the truth values of the outputs'
+         ' and of --class_confidence, rounded after multiplying them'
+         ' with --quantize_scale; derived outputs are not quantized;'
+         ' cannot be used with --vectorize "'
+         + VECTORIZE_PROP
+         + '" or --crisp; default is "{default}"',
+         QUANTIZE_CHOICES],
+    CONFIG_NAME_QUANTIZE_SCALE:
+        [0.0,
+         'the quantized value of the truth value 1 used with --quantize;'
+         ' 0 (the default) uses the largest value of the dtype,'
+         ' i.e. 255 for "'
+         + QUANTIZE_UINT8
+         + '" and 65535 for "'
+         + QUANTIZE_UINT16
+         + '"',
+         None],
+    CONFIG_NAME_BITMASK_OUTPUT:
+        ['',
+         'name of an output that packs the boolean outputs of each element'
+         ' into the bits of one unsigned integer, bit 0 being the first'
+         ' name returned by get_bitmask_names(); the packed outputs are'
+         ' not stored otherwise; the integer is the smallest of uint8,'
+         ' uint16, uint32, and uint64 that has enough bits;'
+         ' requires --crisp; not generated by default',
+         None],
+    CONFIG_NAME_PARAM_ARRAYS:
+        ['',
+         'comma-separated names of parameters, e.g. "Radiance_HIGH_x1",'
+         ' or "*" for all parameters, whose values are given by 1-D arrays'
+         ' holding a value for each element, or for each region if'
+         ' --region_input is given; requires --parameterize and, without'
+         ' --region_input, --vectorize; none by default',
+         None],
+    CONFIG_NAME_REGION_INPUT:
+        ['',
+         'name of an input declared with an unsigned integer dtype,'
+         ' e.g. "region: int[uint16]", holding the region of each element'
+         ' by which the arrays of --param_arrays are indexed;'
+         ' not used by default',
+         None],
+    CONFIG_NAME_SWEEP:
+        ['',
+         'comma-separated names of parameters, or "*" for all parameters,'
+         ' that are swept by an additional function apply_rules_sweep()'
+         ' evaluating the rules for each row of a parameter matrix;'
+         ' the other parameters are taken from the params object passed'
+         ' to it; requires --parameterize'
+         ' and --vectorize "'
+         + VECTORIZE_FUNC
+         + '"; not generated by default',
+         None],
 }
 
 
@@ -86,6 +86,15 @@ def write_yaml_dectree(variables: List[Node],
             text = "\n".join(lines)
             rules.append(text)
 
+    class_values = get_class_values(nodes)
+    if class_values:
+        # Used by the "class_output" option to compute class labels
+        write_line("options:")
+        write_line("  class_values:")
+        for var_id, class_value in class_values.items():
+            write_line(f'    {var_id}: {class_value}')
+        write_line("")
+
     write_line("types:")
     for type_id, type_def in rule_builder.type_id_to_type_defs.items():
         write_line(f'  {type_id}:')
@@ -137,6 +146,14 @@ def write_yaml_dectree(variables: List[Node],
         write_line(rule)
 
 
+def get_class_values(nodes: List[Node]) -> Dict[str, int]:
+    class_values = {}
+    for node in nodes:
+        if node["type"] == "Result" and "class value" in node:
+            class_values[_name_to_id(node["name"])] = int(node["class value"])
+    return class_values
+
+
 def _name_to_id(name: str):
     if name.isidentifier():
         return name
@@ -0,0 +1,443 @@
+"""
+Reading and writing of ENVI raster files.
+
+An ENVI raster is a pair of a binary image file (``.img``) and a text header
+(``.hdr``) that gives the image's size, data type, byte order, and interleave,
+i.e. whether the bands are stored one after the other (``bsq``), line by line
+(``bil``), or pixel by pixel (``bip``). Image files are memory-mapped, so that
+decision tree functions are applied window by window without loading whole
+bands into memory.
+"""
+
+import os.path
+import re
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .types import VarName
+
+# Maps ENVI "data type" codes to dtypes, complex types are not supported
+ENVI_DTYPES = OrderedDict([
+    (1, 'uint8'),
+    (2, 'int16'),
+    (3, 'int32'),
+    (4, 'float32'),
+    (5, 'float64'),
+    (12, 'uint16'),
+    (13, 'uint32'),
+    (14, 'int64'),
+    (15, 'uint64'),
+])
+
+INTERLEAVE_BSQ = 'bsq'
+INTERLEAVE_BIL = 'bil'
+INTERLEAVE_BIP = 'bip'
+
+INTERLEAVE_CHOICES = [INTERLEAVE_BSQ, INTERLEAVE_BIL, INTERLEAVE_BIP]
+
+# Number of image lines passed to a decision tree function at once
+DEFAULT_NUM_LINES = 256
+
+_INT_KEYS = ('samples', 'lines', 'bands', 'header offset', 'data type',
+             'byte order', 'x start', 'y start', 'classes')
+_INT_LIST_KEYS = ('class lookup',)
+# Brace values of these keys are text, not lists
+_TEXT_KEYS = ('description',)
+
+_FIRST_KEYS = ('description', 'samples', 'lines', 'bands', 'header offset',
+               'file type', 'data type', 'interleave', 'byte order')
+
+# A raster band, given by the raster and the zero-based index of the band
+RasterBand = Tuple['EnviRaster', int]
+
+# An RGB color of a class
+ClassColor = Tuple[int, int, int]
+
+
+class EnviRaster:
+    """
+    A memory-mapped ENVI raster.
+
+    :param header: The header entries, see :func:`read_envi_header`
+    :param data: The memory-mapped image, its shape is
+        (bands, lines, samples) for "bsq", (lines, bands, samples) for "bil",
+        and (lines, samples, bands) for "bip"
+    :param img_path: The path of the image file
+    """
+    __slots__ = ('header', 'data', 'img_path')
+
+    def __init__(self,
+                 header: Dict[str, Any],
+                 data: np.memmap,
+                 img_path: str):
+        self.header = header
+        self.data = data
+        self.img_path = img_path
+
+    @property
+    def samples(self) -> int:
+        return self.header['samples']
+
+    @property
+    def lines(self) -> int:
+        return self.header['lines']
+
+    @property
+    def bands(self) -> int:
+        return self.header['bands']
+
+    @property
+    def interleave(self) -> str:
+        return self.header['interleave']
+
+    @property
+    def band_names(self) -> List[str]:
+        return list(self.header.get('band names', []))
+
+    def get_band(self, band: int) -> np.ndarray:
+        """
+        Get a band as an array of shape (lines, samples). The array is a view
+        of the memory-mapped image, it is only contiguous if the interleave
+        is "bsq".
+
+        :param band: The zero-based band index
+        :return: The band
+        """
+        if not 0 <= band < self.bands:
+            raise ValueError(f'Band index {band} out of range'
+                             f' for raster {self.img_path}'
+                             f' with {self.bands} band(s)')
+        if self.interleave == INTERLEAVE_BSQ:
+            return self.data[band]
+        if self.interleave == INTERLEAVE_BIL:
+            return self.data[:, band, :]
+        return self.data[:, :, band]
+
+    def flush(self):
+        """Write changes of the memory-mapped image to its file."""
+        self.data.flush()
+
+
+def read_envi_header(hdr_path: str) -> Dict[str, Any]:
+    """
+    Read an ENVI header file.
+
+    Keys are lower case. The values of keys such as "samples" or "data type"
+    are integers, values given in braces, such as "band names", are lists of
+    strings, and all other values are strings.
+
+    :param hdr_path: The path of the header file
+    :return: The header entries
+    """
+    with open(hdr_path) as fp:
+        text = fp.read()
+    if not text.startswith('ENVI'):
+        raise ValueError(f'Not an ENVI header file: {hdr_path}')
+
+    header = OrderedDict()
+    # Values in braces may span multiple lines
+    for match in re.finditer(r'^\s*([^=\n]+?)\s*=\s*(\{[^}]*\}|[^\n]*)',
+                             text[4:], re.MULTILINE):
+        key, value = match.group(1).lower(), match.group(2).strip()
+        if value.startswith('{'):
+            value = value[1:-1].strip()
+            if key not in _TEXT_KEYS:
+                value = [item.strip() for item in value.split(',')] \
+                    if value else []
+        header[key] = value
+
+    for key in _INT_KEYS:
+        if key in header:
+            header[key] = int(header[key])
+    for key in _INT_LIST_KEYS:
+        if key in header:
+            header[key] = [int(item) for item in header[key]]
+    header['interleave'] = header.get('interleave', INTERLEAVE_BSQ).lower()
+    return header
+
+
+def write_envi_header(hdr_path: str, header: Dict[str, Any]):
+    """
+    Write an ENVI header file.
+
+    :param hdr_path: The path of the header file
+    :param header: The header entries, as returned by :func:`read_envi_header`
+    """
+    keys = [key for key in _FIRST_KEYS if key in header]
+    keys += [key for key in header.keys() if key not in _FIRST_KEYS]
+    with open(hdr_path, 'w') as fp:
+        fp.write('ENVI\n')
+        for key in keys:
+            value = header[key]
+            if isinstance(value, (list, tuple)):
+                value = '{' + ', '.join(str(item) for item in value) + '}'
+            elif key in _TEXT_KEYS:
+                value = '{' + value + '}'
+            fp.write(f'{key} = {value}\n')
+
+
+def open_envi_raster(path: str, mode: str = 'r') -> EnviRaster:
+    """
+    Open an ENVI raster and memory-map its image.
+
+    :param path: The path of the image file or of the header file
+    :param mode: The mode of the memory map, "r" for reading and "r+" for
+        reading and writing
+    :return: The raster
+    """
+    base_path, ext = os.path.splitext(path)
+    if ext.lower() == '.hdr':
+        hdr_path = path
+        img_path = next((img_path for img_path
+                         in (base_path + '.img', base_path)
+                         if os.path.isfile(img_path)), base_path + '.img')
+    else:
+        img_path = path
+        hdr_path = next((hdr_path for hdr_path
+                         in (base_path + '.hdr', path + '.hdr')
+                         if os.path.isfile(hdr_path)), base_path + '.hdr')
+
+    header = read_envi_header(hdr_path)
+    data_type = header.get('data type')
+    if data_type not in ENVI_DTYPES:
+        raise ValueError(f'Unsupported ENVI data type {data_type}'
+                         f' of raster {hdr_path}')
+    interleave = header['interleave']
+    if interleave not in INTERLEAVE_CHOICES:
+        raise ValueError(f'Unsupported ENVI interleave "{interleave}"'
+                         f' of raster {hdr_path}')
+    byte_order = '>' if header.get('byte order', 0) == 1 else '<'
+    dtype = np.dtype(ENVI_DTYPES[data_type]).newbyteorder(byte_order)
+    data = np.memmap(img_path,
+                     dtype=dtype,
+                     mode=mode,
+                     offset=header.get('header offset', 0),
+                     shape=_get_shape(header['samples'],
+                                      header['lines'],
+                                      header['bands'],
+                                      interleave))
+    return EnviRaster(header, data, img_path)
+
+
+def create_envi_raster(img_path: str,
+                       samples: int,
+                       lines: int,
+                       dtype: str,
+                       bands: int = 1,
+                       interleave: str = INTERLEAVE_BSQ,
+                       header: Optional[Dict[str, Any]] = None) -> EnviRaster:
+    """
+    Create an ENVI raster whose image is filled with zeros. The header file
+    is written next to the image file, its name is the one of the image file
+    with extension ".hdr".
+
+    :param img_path: The path of the image file
+    :param samples: The number of samples of each line
+    :param lines: The number of lines
+    :param dtype: The dtype of the image, one of the values of ``ENVI_DTYPES``
+    :param bands: The number of bands
+    :param interleave: The interleave, one of ``INTERLEAVE_CHOICES``
+    :param header: Additional header entries, e.g. "band names" or "map info",
+        see also :func:`get_class_header`
+    :return: The raster, opened for reading and writing
+    """
+    data_type = next((data_type for data_type, envi_dtype
+                      in ENVI_DTYPES.items()
+                      if envi_dtype == dtype), None)
+    if data_type is None:
+        raise ValueError(f'Unsupported dtype "{dtype}" of raster {img_path}')
+    if interleave not in INTERLEAVE_CHOICES:
+        raise ValueError(f'Unsupported ENVI interleave "{interleave}"'
+                         f' of raster {img_path}')
+
+    byte_order = 1 if sys.byteorder == 'big' else 0
+    full_header = OrderedDict([('samples', samples),
+                               ('lines', lines),
+                               ('bands', bands),
+                               ('header offset', 0),
+                               ('file type', 'ENVI Standard'),
+                               ('data type', data_type),
+                               ('interleave', interleave),
+                               ('byte order', byte_order)])
+    full_header.update(header or {})
+    write_envi_header(os.path.splitext(img_path)[0] + '.hdr', full_header)
+
+    data = np.memmap(img_path,
+                     dtype=np.dtype(dtype),
+                     mode='w+',
+                     shape=_get_shape(samples, lines, bands, interleave))
+    return EnviRaster(full_header, data, img_path)
+
+
+def get_class_header(class_values: Dict[str, int],
+                     class_colors: Optional[Dict[str, ClassColor]] = None) \
+        -> Dict[str, Any]:
+    """
+    Get the header entries of an ENVI classification image whose values are
+    the given class values, e.g. those of a decision tree's "class_values"
+    option.
+
+    :param class_values: Maps class names to class values in the range
+        1 to 65535, 0 is "Unclassified"
+    :param class_colors: Optionally maps class names to RGB colors
+    :return: Header entries to be passed to :func:`create_envi_raster`
+    """
+    num_classes = max(class_values.values(), default=0) + 1
+    class_names = ['Unclassified'] + [f'Class {class_value}'
+                                      for class_value in range(1, num_classes)]
+    for class_name, class_value in class_values.items():
+        class_names[class_value] = class_name
+    header = OrderedDict([('file type', 'ENVI Classification'),
+                          ('classes', num_classes),
+                          ('class names', class_names)])
+    if class_colors:
+        # Classes without a color are black
+        class_lookup = [(0, 0, 0)] * num_classes
+        for class_name, class_color in class_colors.items():
+            class_lookup[class_values[class_name]] = tuple(class_color)
+        header['class lookup'] = [component for color in class_lookup
+                                  for component in color]
+    return header
+
+
+def open_envi_bands(band_files: Dict[VarName, Tuple[str, int]],
+                    data_dir: Optional[str] = None) \
+        -> Dict[VarName, RasterBand]:
+    """
+    Open the raster bands of decision tree inputs given as in ENVI decision
+    tree files, i.e. by a "file name" and a one-based "file pos".
+
+    :param band_files: Maps input names to a file name and a one-based band
+        index
+    :param data_dir: If given, the files are looked up in this directory by
+        their base names, which allows for using decision trees whose file
+        names are paths on another machine
+    :return: Maps input names to a raster and a zero-based band index
+    """
+    rasters = {}
+    raster_bands = OrderedDict()
+    for var_name, (file_name, file_pos) in band_files.items():
+        if data_dir is not None:
+            # Base name of Windows and POSIX paths
+            file_name = os.path.join(data_dir,
+                                     re.split(r'[\\/]', file_name)[-1])
+        raster = rasters.get(file_name)
+        if raster is None:
+            raster = open_envi_raster(file_name)
+            rasters[file_name] = raster
+        raster_bands[var_name] = raster, file_pos - 1
+    return raster_bands
+
+
+def apply_rules_to_envi(apply_rules: Callable,
+                        Inputs: type,
+                        Outputs: type,
+                        input_bands: Dict[VarName, RasterBand],
+                        output_bands: Dict[VarName, RasterBand],
+                        params: Any = None,
+                        num_lines: int = DEFAULT_NUM_LINES):
+    """
+    Apply a decision tree function to ENVI raster bands, *num_lines* image
+    lines at a time.
+
+    The function must have been compiled with option ``vectorize="func"``.
+    Windows of bands stored with interleave "bsq" and the dtype of the
+    respective input or output are passed to the function as-is, other
+    windows are converted into temporary arrays.
+
+    :param apply_rules: The decision tree function, see :func:`dectree.compile`
+    :param Inputs: The inputs class of the decision tree function
+    :param Outputs: The outputs class of the decision tree function
+    :param input_bands: Maps all input names to a raster and a zero-based
+        band index
+    :param output_bands: Maps output names to a raster and a zero-based band
+        index, other outputs are discarded
+    :param params: The parameters, if the function was compiled with option
+        ``parameterize=True``
+    :param num_lines: The number of lines of each window
+    """
+    module_dict = getattr(apply_rules, 'py_func', apply_rules).__globals__
+    if 'outputs_from_arrays' not in module_dict:
+        raise ValueError('apply_rules must be compiled with vectorize="func"')
+    input_names = module_dict['get_input_names']()
+    output_names = module_dict['get_output_names']()
+    for var_name in input_names:
+        if var_name not in input_bands:
+            raise ValueError(f'Missing band for input "{var_name}"')
+    for var_name in output_bands.keys():
+        if var_name not in output_names:
+            raise ValueError(f'Unknown output "{var_name}"')
+
+    rasters = [raster for raster, _
+               in list(input_bands.values()) + list(output_bands.values())]
+    samples, lines = rasters[0].samples, rasters[0].lines
+    for raster in rasters:
+        if raster.samples != samples or raster.lines != lines:
+            raise ValueError(f'Raster {raster.img_path} has'
+                             f' {raster.samples} x {raster.lines} pixels,'
+                             f' expected {samples} x {lines}')
+
+    # The dtypes the function expects
+    inputs, outputs = Inputs(0), Outputs(0)
+    input_dtypes = {var_name: getattr(inputs, var_name).dtype
+                    for var_name in input_names}
+    output_dtypes = {var_name: getattr(outputs, var_name).dtype
+                     for var_name in output_names}
+
+    output_rasters = [raster for raster, _ in output_bands.values()]
+    input_bands = {var_name: raster.get_band(band)
+                   for var_name, (raster, band) in input_bands.items()}
+    output_bands = {var_name: raster.get_band(band)
+                    for var_name, (raster, band) in output_bands.items()}
+
+    for start in range(0, lines, num_lines):
+        stop = min(start + num_lines, lines)
+        size = (stop - start) * samples
+
+        input_arrays = []
+        for var_name in input_names:
+            window = input_bands[var_name][start:stop]
+            input_arrays.append(np.ascontiguousarray(
+                window, dtype=input_dtypes[var_name]).reshape(size))
+
+        output_arrays = []
+        copied_outputs = []
+        for var_name in output_names:
+            window = output_bands[var_name][start:stop] \
+                if var_name in output_bands else None
+            dtype = output_dtypes[var_name]
+            if window is not None and window.flags.c_contiguous \
+                    and window.dtype == dtype:
+                output_array = np.asarray(window).reshape(size)
+            else:
+                output_array = np.zeros(size, dtype=dtype)
+                if window is not None:
+                    copied_outputs.append((window, output_array))
+            output_arrays.append(output_array)
+
+        inputs = module_dict['inputs_from_arrays'](*input_arrays)
+        outputs = module_dict['outputs_from_arrays'](*output_arrays)
+        if params is None:
+            apply_rules(inputs, outputs)
+        else:
+            apply_rules(inputs, outputs, params)
+
+        for window, output_array in copied_outputs:
+            window[...] = output_array.reshape(window.shape)
+
+    for raster in output_rasters:
+        raster.flush()
+
+
+def _get_shape(samples: int,
+               lines: int,
+               bands: int,
+               interleave: str) -> Tuple[int, int, int]:
+    if interleave == INTERLEAVE_BSQ:
+        return bands, lines, samples
+    if interleave == INTERLEAVE_BIL:
+        return lines, bands, samples
+    return lines, samples, bands
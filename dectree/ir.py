@@ -0,0 +1,322 @@
+"""
+Intermediate representation (IR) of decision tree rules.
+
+Rule conditions are parsed once into trees of :class:`Condition` nodes,
+rule statements become :class:`If`, :class:`Elif`, :class:`Else`,
+and :class:`Assign` nodes. All nodes use ``__slots__`` to keep very large
+rule sets compact. Optimization passes operating on the IR are found in
+``dectree.optimizer``.
+"""
+
+import ast
+from typing import List, Tuple, Iterator
+
+from .types import PropName
+from .types import RuleBody
+from .types import Rules
+from .types import VarName
+
+_COMPARE_OPS = {
+    ast.Eq: '==',
+    ast.NotEq: '!=',
+    ast.Is: 'is',
+    ast.IsNot: 'is not',
+}
+
+_NEGATED_COMPARE_OPS = {'!=', 'is not'}
+
+
+class Node:
+    __slots__ = ()
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        args = ', '.join(repr(value) for value in self._values())
+        return f'{type(self).__name__}({args})'
+
+
+class Condition(Node):
+    """Base class of rule conditions. Conditions are immutable and hashable."""
+    __slots__ = ()
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + self._values())
+
+    def __str__(self):
+        return format_condition(self)
+
+
+class Const(Condition):
+    """A constant truth value, e.g. of a folded ``const(t)`` property."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: float):
+        self.value = float(value)
+
+
+class Membership(Condition):
+    """
+    The membership lookup ``var_name op prop_name``, where *op* is one of
+    ``==``, ``!=``, ``is``, ``is not``.
+    """
+    __slots__ = ('var_name', 'prop_name', 'op')
+
+    def __init__(self, var_name: VarName, prop_name: PropName, op: str = '=='):
+        self.var_name = var_name
+        self.prop_name = prop_name
+        self.op = op
+
+    @property
+    def negated(self) -> bool:
+        return self.op in _NEGATED_COMPARE_OPS
+
+
+class Not(Condition):
+    __slots__ = ('operand',)
+
+    def __init__(self, operand: Condition):
+        self.operand = operand
+
+
+class And(Condition):
+    __slots__ = ('operands',)
+
+    def __init__(self, operands: Tuple[Condition, ...]):
+        self.operands = tuple(operands)
+
+
+class Or(Condition):
+    __slots__ = ('operands',)
+
+    def __init__(self, operands: Tuple[Condition, ...]):
+        self.operands = tuple(operands)
+
+
+class Stmt(Node):
+    """Base class of rule statements."""
+    __slots__ = ()
+    keyword = None
+
+
+class If(Stmt):
+    __slots__ = ('condition', 'body')
+    keyword = 'if'
+
+    def __init__(self, condition: Condition, body: List[Stmt]):
+        self.condition = condition
+        self.body = body
+
+
+class Elif(Stmt):
+    __slots__ = ('condition', 'body')
+    keyword = 'elif'
+
+    def __init__(self, condition: Condition, body: List[Stmt]):
+        self.condition = condition
+        self.body = body
+
+
+class Else(Stmt):
+    __slots__ = ('body',)
+    keyword = 'else'
+
+    def __init__(self, body: List[Stmt]):
+        self.body = body
+
+
+class Assign(Stmt):
+    """The assignment of the property *prop_name* to the output *var_name*."""
+    __slots__ = ('var_name', 'prop_name')
+    keyword = '='
+
+    def __init__(self, var_name: VarName, prop_name: PropName):
+        self.var_name = var_name
+        self.prop_name = prop_name
+
+
+Body = List[Stmt]
+IrRules = List[Body]
+
+
+def parse_condition(rule_condition: str) -> Condition:
+    """
+    Parse the given rule condition.
+
+    :param rule_condition: The rule condition,
+        e.g. ``"x == HI and not y == LO"``
+    :return: The condition node
+    """
+    mod = ast.parse(rule_condition)
+
+    body = mod.body
+    if len(body) != 1 or not isinstance(body[0], ast.Expr):
+        raise ValueError(f'Invalid condition'
+                         f' expression: [{rule_condition}]')
+
+    return _convert_expr(body[0].value)
+
+
+def _convert_expr(expr) -> Condition:
+    if isinstance(expr, ast.Compare):
+        if not isinstance(expr.left, ast.Name):
+            raise ValueError('Left side of comparison must'
+                             ' be the name of an input or an output')
+        op = _COMPARE_OPS.get(type(expr.ops[0]))
+        if op is None:
+            raise ValueError('"==", "!=", "is", and "is not"'
+                             ' are the only supported comparison'
+                             ' operators')
+        if not isinstance(expr.comparators[0], ast.Name):
+            raise ValueError('Right side of comparison must'
+                             ' be the name of a property')
+        return Membership(expr.left.id, expr.comparators[0].id, op)
+
+    if isinstance(expr, ast.Constant) \
+            and isinstance(expr.value, (int, float)) \
+            and not isinstance(expr.value, bool):
+        return Const(expr.value)
+
+    if isinstance(expr, ast.UnaryOp):
+        if not isinstance(expr.op, ast.Not):
+            raise ValueError('"not" is the only supported unary operator')
+        return Not(_convert_expr(expr.operand))
+
+    if isinstance(expr, ast.BoolOp):
+        operands = tuple(_convert_expr(value) for value in expr.values)
+        if isinstance(expr.op, ast.And):
+            return And(operands)
+        return Or(operands)
+
+    raise ValueError('Unsupported expression')
+
+
+def format_condition(condition: Condition) -> str:
+    """
+    Format the given condition using the rule condition syntax.
+
+    :param condition: The condition node
+    :return: The rule condition
+    """
+    if isinstance(condition, Membership):
+        return f'{condition.var_name} {condition.op} {condition.prop_name}'
+    if isinstance(condition, Const):
+        return repr(condition.value)
+    if isinstance(condition, Not):
+        return f'not {_format_operand(condition.operand)}'
+    if isinstance(condition, (And, Or)):
+        op = ' and ' if isinstance(condition, And) else ' or '
+        return op.join(_format_operand(operand)
+                       for operand in condition.operands)
+    raise ValueError(f'Unsupported condition: {condition!r}')
+
+
+def _format_operand(condition: Condition) -> str:
+    if isinstance(condition, (And, Or)):
+        return f'({format_condition(condition)})'
+    return format_condition(condition)
+
+
+def rules_to_ir(rules: Rules) -> IrRules:
+    """
+    Convert normalized rules into their IR.
+
+    :param rules: The normalized rules, i.e. nested tuples
+    :return: The rules' IR
+    """
+    return [_body_to_ir(rule_body) for rule_body in rules]
+
+
+def _body_to_ir(rule_body: RuleBody) -> Body:
+    body = []
+    for rule_stmt in rule_body:
+        keyword = rule_stmt[0]
+        if keyword == 'if':
+            body.append(If(parse_condition(rule_stmt[1]),
+                           _body_to_ir(rule_stmt[2])))
+        elif keyword == 'elif':
+            body.append(Elif(parse_condition(rule_stmt[1]),
+                             _body_to_ir(rule_stmt[2])))
+        elif keyword == 'else':
+            body.append(Else(_body_to_ir(rule_stmt[1])))
+        elif keyword == '=':
+            body.append(Assign(rule_stmt[1], rule_stmt[2]))
+        else:
+            raise ValueError(f'Illegal rule statement: {rule_stmt!r}')
+    return body
+
+
+def ir_to_rules(ir_rules: IrRules) -> Rules:
+    """
+    Convert the IR of rules back into normalized rules.
+
+    :param ir_rules: The rules' IR
+    :return: The normalized rules, i.e. nested tuples
+    """
+    return [_body_to_rules(body) for body in ir_rules]
+
+
+def _body_to_rules(body: Body) -> RuleBody:
+    rule_body = []
+    for stmt in body:
+        if isinstance(stmt, (If, Elif)):
+            rule_body.append((stmt.keyword,
+                              format_condition(stmt.condition),
+                              _body_to_rules(stmt.body)))
+        elif isinstance(stmt, Else):
+            rule_body.append((stmt.keyword, _body_to_rules(stmt.body)))
+        else:
+            rule_body.append((stmt.keyword, stmt.var_name, stmt.prop_name))
+    return rule_body
+
+
+def iter_conditions(ir_rules: IrRules) -> Iterator[Condition]:
+    """
+    Iterate over the conditions of all if and elif statements in source order.
+    """
+    for body in ir_rules:
+        yield from _iter_body_conditions(body)
+
+
+def _iter_body_conditions(body: Body) -> Iterator[Condition]:
+    for stmt in body:
+        if isinstance(stmt, (If, Elif)):
+            yield stmt.condition
+        if not isinstance(stmt, Assign):
+            yield from _iter_body_conditions(stmt.body)
+
+
+def iter_assignments(ir_rules: IrRules) -> Iterator[Assign]:
+    """Iterate over all assignments in source order."""
+    for body in ir_rules:
+        yield from _iter_body_assignments(body)
+
+
+def _iter_body_assignments(body: Body) -> Iterator[Assign]:
+    for stmt in body:
+        if isinstance(stmt, Assign):
+            yield stmt
+        else:
+            yield from _iter_body_assignments(stmt.body)
+
+
+def iter_memberships(condition: Condition) -> Iterator[Membership]:
+    """
+    Iterate over the membership lookups of the given condition from left to
+    right.
+    """
+    if isinstance(condition, Membership):
+        yield condition
+    elif isinstance(condition, Not):
+        yield from iter_memberships(condition.operand)
+    elif isinstance(condition, (And, Or)):
+        for operand in condition.operands:
+            yield from iter_memberships(operand)
+
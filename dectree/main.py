@@ -2,7 +2,8 @@ import argparse
 import os.path
 import sys
 
-from dectree.config import CONFIG_DEFAULTS, VECTORIZE_PROP
+from dectree.config import CONFIG_DEFAULTS
+from dectree.builder import build
 from dectree.transpiler import transpile
 
 
@@ -10,12 +11,17 @@ def main(args=None):
     if args is None:
         args = sys.argv[1:]
 
+    if args and args[0] == 'build':
+        return build_main(args[1:])
+
     parser = argparse.ArgumentParser(
         prog=__package__,
         description="Generates a Python module in directory OUTPUT_DIR"
                     " from each decision tree given in SOURCE_FILE."
                     " If OUTPUT_DIR is not given, Python modules are"
                     " created next to their SOURCE_FILE."
+                    " Use \"%(prog)s build\" to build ahead-of-time"
+                    " compiled extension modules instead."
     )
     parser.add_argument(
         "src",
@@ -28,7 +34,63 @@ def main(args=None):
         metavar='OUTPUT_DIR',
         help="target directory for generated Python files"
     )
+    _add_config_arguments(parser)
+
+    args = parser.parse_args(args=args)
+    options = _get_config_options(args)
+
+    out_dir = args.out
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    for src_file in args.src:
+        out_file = None
+        if out_dir is not None:
+            basename = os.path.splitext(os.path.basename(src_file))[0] + '.py'
+            out_file = os.path.join(out_dir, basename)
+        try:
+            out_file = transpile(src_file, out_file=out_file, **options)
+        except ValueError as e:
+            print(f'error: {e}')
+            exit(1)
+        print('generated', out_file)
+
+
+def build_main(args):
+    parser = argparse.ArgumentParser(
+        prog=f'{__package__} build',
+        description="Builds an ahead-of-time compiled extension module"
+                    " in directory OUTPUT_DIR from each decision tree"
+                    " given in SOURCE_FILE. If OUTPUT_DIR is not given,"
+                    " extension modules are created next to their"
+                    " SOURCE_FILE."
+    )
+    parser.add_argument(
+        "src",
+        metavar='SOURCE_FILE',
+        nargs='+',
+        help="source file containing a decision tree (YAML format)"
+    )
+    parser.add_argument(
+        "-o", "--out",
+        metavar='OUTPUT_DIR',
+        help="target directory for extension modules"
+    )
+    _add_config_arguments(parser)
+
+    args = parser.parse_args(args=args)
+    options = _get_config_options(args)
+
+    for src_file in args.src:
+        try:
+            out_file = build(src_file, out_dir=args.out, **options)
+        except (ValueError, ImportError) as e:
+            print(f'error: {e}')
+            exit(1)
+        print('built', out_file)
 
+
+def _add_config_arguments(parser):
     for option_name, option_def in CONFIG_DEFAULTS.items():
         default, help_pattern, choices = option_def
         if choices:
@@ -38,35 +100,26 @@ def main(args=None):
                 help=help_pattern.format(default=default),
                 choices=choices
             )
+        elif isinstance(default, bool):
+            parser.add_argument(
+                '--' + option_name,
+                default=default,
+                action='store_true',
+                help=help_pattern.format(default=default)
+            )
         else:
             parser.add_argument(
                 '--' + option_name,
                 default=default,
-                action='store_true' if isinstance(default, bool) else None,
+                type=type(default),
                 help=help_pattern.format(default=default)
             )
 
-    args = parser.parse_args(args=args)
-    options = {k: v
-               for k, v in vars(args).items()
-               if k in CONFIG_DEFAULTS and v != CONFIG_DEFAULTS[k][0]}
-
-    if args.no_jit and args.vectorize == VECTORIZE_PROP:
-        print(f'error: --no_jit is illegal because --vectorize'
-              f' "{VECTORIZE_PROP}" requires JIT')
-        exit(1)
-
-    out_dir = args.out
-    if out_dir is not None:
-        os.makedirs(out_dir, exist_ok=True)
 
-    for src_file in args.src:
-        out_file = None
-        if out_dir is not None:
-            basename = os.path.splitext(os.path.basename(src_file))[0] + '.py'
-            out_file = os.path.join(out_dir, basename)
-        out_file = transpile(src_file, out_file=out_file, **options)
-        print('generated', out_file)
+def _get_config_options(args):
+    return {k: v
+            for k, v in vars(args).items()
+            if k in CONFIG_DEFAULTS and v != CONFIG_DEFAULTS[k][0]}
 
 
 if __name__ == '__main__':
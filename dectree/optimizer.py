@@ -0,0 +1,347 @@
+import ast
+import re
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+from .config import CONFIG_NAME_CSE
+from .config import CONFIG_NAME_OUTPUTS
+from .config import CONFIG_NAME_PARAMETERIZE
+from .config import CONFIG_NAME_SIMPLIFY
+from .config import get_config_value
+from .ir import And
+from .ir import Assign
+from .ir import Body
+from .ir import Condition
+from .ir import Const
+from .ir import Else
+from .ir import If
+from .ir import IrRules
+from .ir import Membership
+from .ir import Not
+from .ir import Or
+from .ir import iter_conditions
+from .ir import iter_memberships
+from .types import DerivedDefs
+from .types import PropDef
+from .types import PropName
+from .types import TypeDefs
+from .types import VarDefs
+from .types import VarName
+
+_CONST_FUNC_BODY_REGEX = re.compile(r'^return (\S+)$')
+
+
+class Program:
+    """
+    A decision tree whose rules are given as IR, see ``dectree.ir``.
+    Optimization passes modify programs in place.
+
+    :param type_defs: The type definitions
+    :param input_defs: The input variable definitions
+    :param output_defs: The output variable definitions, including those
+        of the public derived variables
+    :param derived_defs: The derived variable definitions in order of their
+        dependencies
+    :param rules: The rules' IR
+    """
+    __slots__ = ('type_defs', 'input_defs', 'output_defs', 'derived_defs',
+                 'rules', 'common_memberships')
+
+    def __init__(self,
+                 type_defs: TypeDefs,
+                 input_defs: VarDefs,
+                 output_defs: VarDefs,
+                 derived_defs: DerivedDefs,
+                 rules: IrRules):
+        self.type_defs = type_defs
+        self.input_defs = OrderedDict(input_defs)
+        self.output_defs = OrderedDict(output_defs)
+        self.derived_defs = OrderedDict(derived_defs)
+        self.rules = rules
+        # (var_name, prop_name) of the memberships computed once before
+        # evaluating the rules
+        self.common_memberships: List[Tuple[VarName, PropName]] = []
+
+    @property
+    def var_defs(self) -> VarDefs:
+        var_defs = dict(self.input_defs)
+        var_defs.update(self.output_defs)
+        var_defs.update({var_name: type_name
+                         for var_name, (type_name, _)
+                         in self.derived_defs.items()})
+        return var_defs
+
+
+class Pass:
+    """A stage of the :class:`PassManager`."""
+    name = None
+
+    def run(self, program: Program) -> None:
+        raise NotImplementedError()
+
+
+class PassManager:
+    """
+    Run a sequence of passes on a program.
+
+    :param passes: The passes in the order they are run
+    """
+
+    def __init__(self, passes: List[Pass]):
+        self.passes = list(passes)
+
+    @property
+    def pass_names(self) -> List[str]:
+        return [p.name for p in self.passes]
+
+    def run(self, program: Program) -> Program:
+        for p in self.passes:
+            p.run(program)
+        return program
+
+
+def get_passes(options: Dict[str, Any]) -> List[Pass]:
+    """
+    Get the passes to be run for the given *options*.
+
+    :param options: options, refer to `dectree --help`
+    :return: The passes in the order they must be run
+    """
+    passes = []
+    if get_config_value(options, CONFIG_NAME_SIMPLIFY):
+        parameterize = get_config_value(options, CONFIG_NAME_PARAMETERIZE)
+        passes.append(FoldConstantsPass(parameterize=parameterize))
+    requested_outputs = get_config_value(options, CONFIG_NAME_OUTPUTS)
+    if isinstance(requested_outputs, str):
+        requested_outputs = [name.strip()
+                             for name in requested_outputs.split(',')
+                             if name.strip()]
+    if requested_outputs:
+        passes.append(SliceOutputsPass(requested_outputs))
+    if get_config_value(options, CONFIG_NAME_CSE):
+        passes.append(CommonMembershipsPass())
+    return passes
+
+
+class FoldConstantsPass(Pass):
+    """
+    Simplify the conditions of the rules.
+
+    Memberships of properties with constant truth values, i.e. ``true()``,
+    ``false()``, and ``const(t)``, are replaced by their values. Double
+    negations are removed. Operands of "and" that are 1 and operands of "or"
+    that are 0 are removed, an "and" with an operand 0 becomes 0 and an "or"
+    with an operand 1 becomes 1. These identities hold for any fuzzy
+    and/or/not operator patterns that form a t-norm, a t-conorm, and an
+    involutive negation.
+
+    Conditions that simplify to a constant are kept as they are, so that
+    truth values keep the shape of the input variables.
+
+    :param parameterize: Whether property function parameters are passed at
+        runtime, in which case ``const(t)`` is not constant
+    """
+    name = 'fold_constants'
+
+    def __init__(self, parameterize: bool = False):
+        self.parameterize = parameterize
+
+    def run(self, program: Program) -> None:
+        simplifier = _ConditionSimplifier(program.type_defs,
+                                          program.var_defs,
+                                          self.parameterize)
+        program.rules = [_simplify_body(body, simplifier)
+                         for body in program.rules]
+
+
+class SliceOutputsPass(Pass):
+    """
+    Dead-code elimination: keep only the assignments of the given outputs
+    and the derived variables they depend on. Conditional chains that no
+    longer assign anything are removed.
+
+    :param outputs: The names of the requested outputs
+    """
+    name = 'slice_outputs'
+
+    def __init__(self, outputs: List[VarName]):
+        self.outputs = list(outputs)
+
+    def run(self, program: Program) -> None:
+        for var_name in self.outputs:
+            if var_name not in program.output_defs \
+                    or var_name.startswith('_'):
+                raise ValueError(f'Option "{CONFIG_NAME_OUTPUTS}" refers'
+                                 f' to unknown output "{var_name}"')
+
+        requested_outputs = set(self.outputs)
+        program.rules = [body for body in
+                         (_slice_body(body, requested_outputs)
+                          for body in program.rules)
+                         if body]
+
+        # Derived variables are defined in order of their dependencies,
+        # so walking them backwards collects all variables they depend on
+        used_names = set(requested_outputs)
+        for condition in iter_conditions(program.rules):
+            used_names.update(membership.var_name for membership
+                              in iter_memberships(condition))
+        derived_defs = OrderedDict()
+        for var_name, derived_def in reversed(program.derived_defs.items()):
+            if var_name in used_names:
+                derived_defs[var_name] = derived_def
+                used_names.update(_get_expr_names(derived_def[1]))
+        program.derived_defs = OrderedDict(reversed(derived_defs.items()))
+
+        program.output_defs = OrderedDict(
+            (var_name, type_name)
+            for var_name, type_name in program.output_defs.items()
+            if var_name in requested_outputs
+            or var_name in program.derived_defs
+        )
+
+
+class CommonMembershipsPass(Pass):
+    """
+    Common subexpression elimination: find the memberships used more than
+    once by the conditions, so they are computed only once.
+    """
+    name = 'common_memberships'
+
+    def run(self, program: Program) -> None:
+        counts = OrderedDict()
+        for condition in iter_conditions(program.rules):
+            for membership in iter_memberships(condition):
+                key = membership.var_name, membership.prop_name
+                counts[key] = counts.get(key, 0) + 1
+        program.common_memberships = [key for key, count in counts.items()
+                                      if count >= 2]
+
+
+def _simplify_body(body: Body, simplifier: '_ConditionSimplifier') -> Body:
+    simplified_body = []
+    for stmt in body:
+        if isinstance(stmt, Assign):
+            simplified_body.append(stmt)
+        elif isinstance(stmt, Else):
+            simplified_body.append(Else(_simplify_body(stmt.body, simplifier)))
+        else:
+            simplified_body.append(
+                type(stmt)(simplifier.simplify(stmt.condition),
+                           _simplify_body(stmt.body, simplifier)))
+    return simplified_body
+
+
+def _slice_body(body: Body, var_names: Set[VarName]) -> Body:
+    sliced_body = []
+    # The if/elif/else statements of the current conditional chain
+    chain = []
+
+    def flush_chain():
+        # Empty parts can only be omitted from the end of a chain,
+        # as earlier conditions determine the truth of later parts
+        while chain and not chain[-1].body:
+            chain.pop()
+        sliced_body.extend(chain)
+        chain.clear()
+
+    for stmt in body:
+        if isinstance(stmt, Assign):
+            flush_chain()
+            if stmt.var_name in var_names:
+                sliced_body.append(stmt)
+        elif isinstance(stmt, Else):
+            chain.append(Else(_slice_body(stmt.body, var_names)))
+        else:
+            if isinstance(stmt, If):
+                flush_chain()
+            chain.append(type(stmt)(stmt.condition,
+                                    _slice_body(stmt.body, var_names)))
+    flush_chain()
+    return sliced_body
+
+
+def _get_expr_names(expr: str) -> Set[str]:
+    return {node.id for node in ast.walk(ast.parse(expr))
+            if isinstance(node, ast.Name)}
+
+
+class _ConditionSimplifier:
+    def __init__(self,
+                 type_defs: TypeDefs,
+                 var_defs: VarDefs,
+                 parameterize: bool):
+        self.type_defs = type_defs
+        self.var_defs = var_defs
+        self.parameterize = parameterize
+
+    def simplify(self, condition: Condition) -> Condition:
+        simplified = self._simplify(condition)
+        if isinstance(simplified, Const):
+            return condition
+        return simplified
+
+    def _simplify(self, condition: Condition) -> Condition:
+        if isinstance(condition, Membership):
+            truth = self._get_const_truth(condition)
+            if truth is None:
+                return condition
+            if condition.negated:
+                return _negate(Const(truth))
+            return Const(truth)
+
+        if isinstance(condition, Not):
+            return _negate(self._simplify(condition.operand))
+
+        if isinstance(condition, (And, Or)):
+            is_and = isinstance(condition, And)
+            neutral, absorbing = (1.0, 0.0) if is_and else (0.0, 1.0)
+            operands = []
+            for operand in condition.operands:
+                operand = self._simplify(operand)
+                if isinstance(operand, Const):
+                    if operand.value == absorbing:
+                        return Const(absorbing)
+                    if operand.value == neutral:
+                        continue
+                operands.append(operand)
+            if not operands:
+                return Const(neutral)
+            if len(operands) == 1:
+                return operands[0]
+            return type(condition)(operands)
+
+        return condition
+
+    def _get_const_truth(self, membership: Membership) -> Optional[float]:
+        type_name = self.var_defs.get(membership.var_name)
+        type_def = self.type_defs.get(type_name)
+        if type_def is None:
+            return None
+        prop_def = type_def.get(membership.prop_name)
+        if prop_def is None:
+            return None
+        return _get_const_prop_truth(prop_def, self.parameterize)
+
+
+def _get_const_prop_truth(prop_def: PropDef,
+                          parameterize: bool) -> Optional[float]:
+    _, func_params, func_body_pattern = prop_def
+    if parameterize and func_params:
+        return None
+    func_body = func_body_pattern.format(**func_params).strip()
+    match = _CONST_FUNC_BODY_REGEX.match(func_body)
+    if not match:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
+
+
+def _negate(condition: Condition) -> Condition:
+    if isinstance(condition, Not):
+        return condition.operand
+    if isinstance(condition, Const) and condition.value in (0.0, 1.0):
+        return Const(1.0 - condition.value)
+    return Not(condition)
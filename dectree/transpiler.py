@@ -1,9 +1,6 @@
 import os
 import os.path
-import sys
-import tempfile
 from collections import OrderedDict
-from io import StringIO
 from typing import List, Dict, Any, Tuple, Union
 
 # noinspection PyPackageRequirements
@@ -11,12 +8,6 @@ import yaml  # from pyyaml
 
 import dectree.propfuncs as propfuncs
 from .codegen import gen_code
-from .config import CONFIG_NAME_FUNCTION_NAME
-from .config import CONFIG_NAME_INPUTS_NAME
-from .config import CONFIG_NAME_OUTPUTS_NAME
-from .config import CONFIG_NAME_PARAMETERIZE
-from .config import CONFIG_NAME_PARAMS_NAME
-from .config import get_config_value
 from .omap import to_omap
 from .types import DerivedDefs
 from .types import TypeDefs
@@ -49,25 +40,9 @@ def compile(src_file, **options) -> Tuple[Any, ...]:
     :return: A tuple containing the compiler function and the
         classes used to generate the functions's arguments.
     """
-    text_io = StringIO()
-    transpile(src_file, out_file=text_io, **options)
-
-    py_code = text_io.getvalue()
-
-    _, out_path = tempfile.mkstemp(suffix='.py', prefix='dectree_', text=True)
-    with open(out_path, 'w') as out_fp:
-        out_fp.write(py_code)
-
-    dectree_module = _import_module_from_file(out_path)
-
-    names = [CONFIG_NAME_FUNCTION_NAME,
-             CONFIG_NAME_INPUTS_NAME,
-             CONFIG_NAME_OUTPUTS_NAME]
-    if get_config_value(options, CONFIG_NAME_PARAMETERIZE):
-        names += [CONFIG_NAME_PARAMS_NAME]
-    names = [get_config_value(options, name) for name in names]
-
-    return tuple(getattr(dectree_module, name) for name in names)
+    # Imported here to avoid a circular import
+    from .compiler import compile as compile_
+    return compile_(src_file, **options)
 
 
 def transpile(src_file, out_file=None, **options) -> str:
@@ -299,16 +274,3 @@ def _count_leading_spaces(s: str):
         if not s[i].isspace():
             return i
     return i
-
-
-def _import_module_from_file(full_path_to_module: str):
-    module_dir, module_file = os.path.split(full_path_to_module)
-    module_name, module_ext = os.path.splitext(module_file)
-    try:
-        sys.path.append(module_dir)
-        module_obj = __import__(module_name)
-        module_obj.__file__ = full_path_to_module
-        globals()[module_name] = module_obj
-        return module_obj
-    finally:
-        sys.path.remove(module_dir)
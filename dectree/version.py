@@ -0,0 +1 @@
+version = '0.0.1'
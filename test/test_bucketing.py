@@ -0,0 +1,41 @@
+import math
+import unittest
+
+import dectree.propfuncs as propfuncs
+from dectree.bucketing import get_bucket_table
+
+
+def prop_def(func_name, *args, **kwargs):
+    func_params, func_body = getattr(propfuncs, func_name)(*args, **kwargs)
+    return f'{func_name}()', func_params, func_body
+
+
+class BucketTableTest(unittest.TestCase):
+    def test_crisp(self):
+        bucket_table = get_bucket_table(dict(GT_0=prop_def('gt', 0.0),
+                                             LE_05=prop_def('le', 0.5),
+                                             TRUE=prop_def('true')))
+        self.assertEqual(bucket_table.breakpoints, [0.0, 0.5])
+        self.assertEqual(bucket_table.num_buckets, 6)
+        self.assertEqual(bucket_table.truths,
+                         dict(GT_0=[0.0, 0.0, 1.0, 1.0, 1.0, 0.0],
+                              LE_05=[1.0, 1.0, 1.0, 1.0, 0.0, 0.0]))
+
+    def test_get_bucket(self):
+        bucket_table = get_bucket_table(dict(GT_0=prop_def('gt', 0.0),
+                                             LE_05=prop_def('le', 0.5)))
+        self.assertEqual([bucket_table.get_bucket(x) for x in (-1.0, 0.0, 0.25, 0.5, 0.75, math.nan)],
+                         [0, 1, 2, 3, 4, 5])
+
+    def test_fuzzy(self):
+        bucket_table = get_bucket_table(dict(HI=prop_def('ramp', 0.5, 1.0),
+                                             LO=prop_def('inv_ramp', 0.0, 0.5)))
+        self.assertEqual(bucket_table.breakpoints, [0.0, 0.5, 1.0])
+        self.assertEqual(bucket_table.truths,
+                         dict(HI=[0.0, 0.0, 0.0, 0.0, None, 1.0, 1.0, 1.0],
+                              LO=[1.0, 1.0, None, 0.0, 0.0, 0.0, 0.0, 0.0]))
+
+    def test_too_few_properties(self):
+        self.assertIsNone(get_bucket_table(dict(NODATA=prop_def('eq', 0.0),
+                                                TRUE=prop_def('true'),
+                                                HALF=prop_def('const', 0.5))))
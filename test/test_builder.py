@@ -0,0 +1,53 @@
+import importlib.util
+import os.path
+import tempfile
+import unittest
+
+import numpy as np
+
+from dectree.builder import build
+
+
+class BuildTest(unittest.TestCase):
+    def test_build(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        with tempfile.TemporaryDirectory() as out_dir:
+            ext_file = build(src_file, out_dir=out_dir)
+            self.assertTrue(os.path.exists(ext_file))
+            self.assertEqual(os.path.dirname(ext_file), out_dir)
+
+            spec = importlib.util.spec_from_file_location('dectree_test',
+                                                          ext_file)
+            ext_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(ext_module)
+
+        for float_type in ('float32', 'float64'):
+            apply_rules = getattr(ext_module, 'apply_rules_' + float_type)
+            glint = np.array([0.2, 0.3], dtype=float_type)
+            radiance = np.array([60.0, 10.0], dtype=float_type)
+            cloudy = np.zeros(2, dtype=float_type)
+            certain = np.zeros(2, dtype=float_type)
+            radiance_mod = np.zeros(2, dtype=float_type)
+            apply_rules(glint, radiance, cloudy, certain, radiance_mod)
+            np.testing.assert_almost_equal(cloudy, np.array([0.6, 0.0]),
+                                           decimal=6)
+            np.testing.assert_almost_equal(certain, np.array([1.0, 1.0]),
+                                           decimal=6)
+
+            apply_rules_arrays = getattr(ext_module,
+                                         'apply_rules_arrays_' + float_type)
+            outputs = np.zeros((3, 2), dtype=float_type)
+            apply_rules_arrays(np.stack([glint, radiance]), outputs)
+            np.testing.assert_almost_equal(outputs,
+                                           np.stack([cloudy, certain,
+                                                     radiance_mod]))
+
+    def test_build_failures(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        with self.assertRaises(ValueError) as cm:
+            build(src_file, parameterize=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "parameterize" cannot be used for'
+                         ' ahead-of-time compilation')
@@ -50,9 +50,28 @@ class ExprGenTest(unittest.TestCase):
 
         transpiler = FuzzyExprGen(type_defs, input_defs, output_defs, vectorize=VECTORIZE_PROP, parameterize=True, **op_patters)
         self.assertEqual(transpiler.gen_expr('x == HI and not (y == FAST or x == LO)'),
-                         'np.minimum(_XType_HI(inputs.x, x1=params.XType_HI_x1, x2=params.XType_HI_x2), '
+                         'np.minimum(_XType_HI(inputs.x, params.XType_HI_x1, params.XType_HI_x2), '
                          '1.0 - (np.maximum(_YType_FAST(inputs.y), '
-                         '_XType_LO(inputs.x, x1=params.XType_LO_x1, x2=params.XType_LO_x2))))')
+                         '_XType_LO(inputs.x, params.XType_LO_x1, params.XType_LO_x2))))')
+
+    def test_memberships(self):
+        type_defs = dict(
+            XType=dict(HI=('ramp()', dict(x1=0.5, x2=1.0), ''),
+                       LO=('inv_ramp()', dict(x1=0.0, x2=0.5), '')),
+            YType=dict(FAST=('true()', {}, ''),
+                       SLOW=('false()', {}, ''))
+        )
+        input_defs = dict(x='XType', y='YType')
+        output_defs = dict()
+        expr_gen = FuzzyExprGen(type_defs, input_defs, output_defs)
+        self.assertEqual(expr_gen.gen_memberships('x == HI and not (y == FAST or x != HI)'),
+                         [('_XType_HI(inputs.x)', 'x', 'HI'),
+                          ('_YType_FAST(inputs.y)', 'y', 'FAST'),
+                          ('_XType_HI(inputs.x)', 'x', 'HI')])
+
+        expr_gen.membership_names = {'_XType_HI(inputs.x)': 'm_x_HI'}
+        self.assertEqual(expr_gen.gen_expr('x == HI and not (y == FAST or x != HI)'),
+                         'min(m_x_HI, 1.0 - (max(_YType_FAST(inputs.y), 1.0 - (m_x_HI))))')
 
     def test_failure(self):
         type_defs = dict(
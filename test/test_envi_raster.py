@@ -0,0 +1,168 @@
+import os.path
+import tempfile
+import unittest
+
+import numpy as np
+
+from dectree.compiler import compile
+from dectree.envi_raster import apply_rules_to_envi
+from dectree.envi_raster import create_envi_raster
+from dectree.envi_raster import get_class_header
+from dectree.envi_raster import open_envi_bands
+from dectree.envi_raster import open_envi_raster
+from dectree.envi_raster import read_envi_header
+from dectree.envi_raster import write_envi_header
+
+TEST_SRC_FILE = os.path.join(os.path.dirname(__file__), 'dectree_test.yml')
+SAMPLES = 5
+LINES = 7
+
+
+def write_raster(img_path, data, interleave, byte_order=0, data_type=4):
+    # data has shape (bands, lines, samples)
+    num_bands = data.shape[0]
+    if interleave == 'bil':
+        data = data.transpose(1, 0, 2)
+    elif interleave == 'bip':
+        data = data.transpose(1, 2, 0)
+    dtype = data.dtype.newbyteorder('>' if byte_order == 1 else '<')
+    data.astype(dtype).tofile(img_path)
+    with open(os.path.splitext(img_path)[0] + '.hdr', 'w') as fp:
+        fp.write('ENVI\n'
+                 'description = {\n'
+                 '  Test raster}\n'
+                 f'samples = {SAMPLES}\n'
+                 f'lines = {LINES}\n'
+                 f'bands = {num_bands}\n'
+                 'header offset = 0\n'
+                 'file type = ENVI Standard\n'
+                 f'data type = {data_type}\n'
+                 f'interleave = {interleave}\n'
+                 f'byte order = {byte_order}\n'
+                 'band names = {\n'
+                 ' first,\n'
+                 ' second}\n')
+
+
+class EnviRasterTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        self.glint = rng.uniform(0.0, 1.0, (LINES, SAMPLES)).astype(np.float32)
+        self.radiance = rng.integers(0, 150, (LINES, SAMPLES)).astype(np.uint16)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_header(self):
+        hdr_path = self.get_path('test.hdr')
+        header = dict([('description', 'Test raster'),
+                       ('samples', 5),
+                       ('lines', 7),
+                       ('bands', 1),
+                       ('data type', 1),
+                       ('interleave', 'bsq'),
+                       ('band names', ['label']),
+                       ('map info', ['UTM', '1.0', '1.0', '500000.0', '6000000.0', '30.0', '30.0', '32', 'North'])])
+        header.update(get_class_header({'Wasser': 2, 'Schill': 4},
+                                       class_colors={'Wasser': (0, 0, 255)}))
+        write_envi_header(hdr_path, header)
+        self.assertEqual(read_envi_header(hdr_path), header)
+        self.assertEqual(header['classes'], 5)
+        self.assertEqual(header['class names'],
+                         ['Unclassified', 'Class 1', 'Wasser', 'Class 3', 'Schill'])
+        self.assertEqual(header['class lookup'],
+                         [0, 0, 0, 0, 0, 0, 0, 0, 255, 0, 0, 0, 0, 0, 0])
+
+        with open(hdr_path, 'w') as fp:
+            fp.write('samples = 5\n')
+        with self.assertRaises(ValueError) as cm:
+            read_envi_header(hdr_path)
+        self.assertEqual(str(cm.exception), f'Not an ENVI header file: {hdr_path}')
+
+    def test_open_raster(self):
+        data = np.stack([self.glint, 2.0 * self.glint])
+        for interleave in ('bsq', 'bil', 'bip'):
+            for byte_order in (0, 1):
+                img_path = self.get_path(f'{interleave}_{byte_order}.img')
+                write_raster(img_path, data, interleave, byte_order=byte_order)
+                for path in (img_path, os.path.splitext(img_path)[0] + '.hdr'):
+                    raster = open_envi_raster(path)
+                    self.assertEqual((raster.samples, raster.lines, raster.bands), (SAMPLES, LINES, 2))
+                    self.assertEqual(raster.interleave, interleave)
+                    self.assertEqual(raster.band_names, ['first', 'second'])
+                    self.assertEqual(raster.header['description'], 'Test raster')
+                    np.testing.assert_equal(raster.get_band(0), data[0])
+                    np.testing.assert_equal(raster.get_band(1), data[1])
+                    with self.assertRaises(ValueError):
+                        raster.get_band(2)
+
+    def test_apply_rules(self):
+        with open(TEST_SRC_FILE) as fp:
+            src_code = fp.read().replace('  radiance: Radiance\n', '  radiance: Radiance[uint16]\n')
+        src_path = self.get_path('dectree_test.yml')
+        with open(src_path, 'w') as fp:
+            fp.write(src_code)
+
+        # glint is band 2 of a BIL raster, radiance band 1 of a big-endian BIP raster
+        write_raster(self.get_path('glint.img'), np.stack([self.glint, self.glint]), 'bil')
+        write_raster(self.get_path('radiance.img'), np.stack([self.radiance, self.radiance]), 'bip',
+                     byte_order=1, data_type=12)
+        input_bands = open_envi_bands({'glint': ('C:\\data\\glint.img', 2),
+                                       'radiance': ('/data/radiance.img', 1)},
+                                      data_dir=self.temp_dir.name)
+
+        apply_rules, Inputs, Outputs = compile(src_path, vectorize='func')
+        inputs = Inputs(SAMPLES * LINES)
+        outputs = Outputs(SAMPLES * LINES)
+        inputs.glint = self.glint.astype(np.float64).reshape(-1)
+        inputs.radiance = self.radiance.reshape(-1)
+        apply_rules(inputs, outputs)
+
+        # "cloudy" is converted, "certain" is written into the memory map as-is
+        cloudy_raster = create_envi_raster(self.get_path('cloudy.img'), SAMPLES, LINES, 'float32')
+        certain_raster = create_envi_raster(self.get_path('certain.img'), SAMPLES, LINES, 'float64')
+        apply_rules_to_envi(apply_rules, Inputs, Outputs, input_bands,
+                            {'cloudy': (cloudy_raster, 0), 'certain': (certain_raster, 0)},
+                            num_lines=3)
+        np.testing.assert_almost_equal(open_envi_raster(self.get_path('cloudy.img')).get_band(0),
+                                       outputs.cloudy.reshape(LINES, SAMPLES), decimal=6)
+        np.testing.assert_almost_equal(open_envi_raster(self.get_path('certain.hdr')).get_band(0),
+                                       outputs.certain.reshape(LINES, SAMPLES))
+
+        with self.assertRaises(ValueError) as cm:
+            apply_rules_to_envi(apply_rules, Inputs, Outputs, {'glint': input_bands['glint']}, {})
+        self.assertEqual(str(cm.exception), 'Missing band for input "radiance"')
+
+        small_raster = create_envi_raster(self.get_path('small.img'), SAMPLES, 1, 'float32')
+        with self.assertRaises(ValueError) as cm:
+            apply_rules_to_envi(apply_rules, Inputs, Outputs, input_bands, {'cloudy': (small_raster, 0)})
+        self.assertEqual(str(cm.exception),
+                         f'Raster {small_raster.img_path} has 5 x 1 pixels, expected 5 x 7')
+
+    def test_apply_rules_class_output(self):
+        write_raster(self.get_path('inputs.img'), np.stack([self.glint, 150.0 * self.glint]), 'bsq')
+        inputs_raster = open_envi_raster(self.get_path('inputs.img'))
+
+        class_values = {'cloudy': 3, 'certain': 5}
+        apply_rules, Inputs, Outputs = compile(TEST_SRC_FILE, vectorize='func', class_output='label',
+                                               class_values=class_values)
+        label_raster = create_envi_raster(self.get_path('label.img'), SAMPLES, LINES, 'uint8',
+                                          header=get_class_header(class_values))
+        apply_rules_to_envi(apply_rules, Inputs, Outputs,
+                            {'glint': (inputs_raster, 0), 'radiance': (inputs_raster, 1)},
+                            {'label': (label_raster, 0)})
+
+        inputs = Inputs(SAMPLES * LINES)
+        outputs = Outputs(SAMPLES * LINES)
+        inputs.glint = self.glint.astype(np.float64).reshape(-1)
+        inputs.radiance = 150.0 * self.glint.astype(np.float64).reshape(-1)
+        apply_rules(inputs, outputs)
+
+        label_raster = open_envi_raster(self.get_path('label.img'))
+        self.assertEqual(label_raster.header['file type'], 'ENVI Classification')
+        self.assertEqual(label_raster.header['class names'][3], 'cloudy')
+        np.testing.assert_equal(label_raster.get_band(0), outputs.label.reshape(LINES, SAMPLES))
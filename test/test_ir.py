@@ -0,0 +1,83 @@
+import unittest
+
+from dectree.ir import And, Assign, Const, Elif, Else, If, Membership, Not, Or
+from dectree.ir import format_condition, ir_to_rules, iter_assignments, iter_conditions, iter_memberships
+from dectree.ir import parse_condition, rules_to_ir
+
+
+class ConditionTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_condition('x == HI'), Membership('x', 'HI', '=='))
+        self.assertEqual(parse_condition('x is not HI'), Membership('x', 'HI', 'is not'))
+        self.assertEqual(parse_condition('x == HI and not (y != LO or x is LO)'),
+                         And((Membership('x', 'HI'),
+                              Not(Or((Membership('y', 'LO', '!='),
+                                      Membership('x', 'LO', 'is')))))))
+        self.assertEqual(parse_condition('x == HI and 0.5'),
+                         And((Membership('x', 'HI'), Const(0.5))))
+
+    def test_negated(self):
+        self.assertFalse(Membership('x', 'HI', '==').negated)
+        self.assertFalse(Membership('x', 'HI', 'is').negated)
+        self.assertTrue(Membership('x', 'HI', '!=').negated)
+        self.assertTrue(Membership('x', 'HI', 'is not').negated)
+
+    def test_format(self):
+        for condition in ['x == HI',
+                          'x is not HI',
+                          'not x == HI',
+                          'x == HI and 0.5',
+                          '(x is HI or y is LO) and x is LO',
+                          'x == HI and not (y != LO or x is LO)']:
+            self.assertEqual(format_condition(parse_condition(condition)), condition)
+        self.assertEqual(str(parse_condition('x == HI or y == LO and x == LO')),
+                         'x == HI or (y == LO and x == LO)')
+
+    def test_hashable(self):
+        self.assertEqual(len({parse_condition('x == HI'), parse_condition('x == HI'),
+                              parse_condition('x == LO')}), 2)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Membership('x', 'HI').value = 1.0
+
+    def test_failures(self):
+        with self.assertRaises(ValueError) as cm:
+            parse_condition('for i in range(3): pass')
+        self.assertEqual(str(cm.exception), 'Invalid condition expression: [for i in range(3): pass]')
+
+        with self.assertRaises(ValueError) as cm:
+            parse_condition('x == 7')
+        self.assertEqual(str(cm.exception), 'Right side of comparison must be the name of a property')
+
+        with self.assertRaises(ValueError) as cm:
+            parse_condition('True')
+        self.assertEqual(str(cm.exception), 'Unsupported expression')
+
+
+class RulesTest(unittest.TestCase):
+    RULES = [[('if', 'x == HI',
+               [('if', 'y == LO', [('=', 'z', 'TRUE')]),
+                ('elif', 'y == HI or x == LO', [('=', 'z', 'FALSE')]),
+                ('else', [('=', 'w', 'TRUE')])])],
+             [('=', 'w', 'FALSE')]]
+
+    def test_rules_to_ir(self):
+        self.assertEqual(rules_to_ir(self.RULES),
+                         [[If(Membership('x', 'HI'),
+                              [If(Membership('y', 'LO'), [Assign('z', 'TRUE')]),
+                               Elif(Or((Membership('y', 'HI'), Membership('x', 'LO'))), [Assign('z', 'FALSE')]),
+                               Else([Assign('w', 'TRUE')])])],
+                          [Assign('w', 'FALSE')]])
+
+    def test_ir_to_rules(self):
+        self.assertEqual(ir_to_rules(rules_to_ir(self.RULES)), self.RULES)
+
+    def test_iterators(self):
+        ir_rules = rules_to_ir(self.RULES)
+        self.assertEqual([str(condition) for condition in iter_conditions(ir_rules)],
+                         ['x == HI', 'y == LO', 'y == HI or x == LO'])
+        self.assertEqual([(assignment.var_name, assignment.prop_name) for assignment in iter_assignments(ir_rules)],
+                         [('z', 'TRUE'), ('z', 'FALSE'), ('w', 'TRUE'), ('w', 'FALSE')])
+        self.assertEqual(list(iter_memberships(parse_condition('x == HI and not (y != LO or x is HI)'))),
+                         [Membership('x', 'HI'), Membership('y', 'LO', '!='), Membership('x', 'HI', 'is')])
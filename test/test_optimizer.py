@@ -0,0 +1,110 @@
+import unittest
+
+from dectree.ir import ir_to_rules, iter_conditions, rules_to_ir
+from dectree.optimizer import CommonMembershipsPass, FoldConstantsPass, PassManager, Program, SliceOutputsPass
+from dectree.optimizer import get_passes
+
+TYPE_DEFS = dict(
+    XType=dict(HI=('ramp()', dict(x1=0.5, x2=1.0), ''),
+               LO=('inv_ramp()', dict(x1=0.0, x2=0.5), '')),
+    CType=dict(TRUE=('true()', {}, 'return 1.0'),
+               FALSE=('false()', {}, 'return 0.0'),
+               HALF=('const(0.5)', dict(t=0.5), 'return {t}')),
+)
+
+VAR_DEFS = dict(x='XType', y='XType', c='CType')
+
+
+def fold_constants(rules, parameterize=False):
+    program = Program(TYPE_DEFS, VAR_DEFS, {}, {}, rules_to_ir(rules))
+    FoldConstantsPass(parameterize=parameterize).run(program)
+    return ir_to_rules(program.rules)
+
+
+def simplify(condition, parameterize=False):
+    rules = [[('if', condition, [('=', 'z', 'TRUE')])]]
+    rules = fold_constants(rules, parameterize=parameterize)
+    return rules[0][0][1]
+
+
+class FoldConstantsPassTest(unittest.TestCase):
+    def test_unchanged(self):
+        self.assertEqual(simplify('x == HI'), 'x == HI')
+        self.assertEqual(simplify('x is HI and y is not LO'),
+                         'x is HI and y is not LO')
+        self.assertEqual(simplify('(x is HI or y is LO) and x is LO'),
+                         '(x is HI or y is LO) and x is LO')
+
+    def test_double_negation(self):
+        self.assertEqual(simplify('not not x is HI'), 'x is HI')
+        self.assertEqual(simplify('not (not (x is HI or y is LO))'),
+                         'x is HI or y is LO')
+
+    def test_constant_properties(self):
+        self.assertEqual(simplify('x is HI and c is TRUE'), 'x is HI')
+        self.assertEqual(simplify('x is HI or c is FALSE'), 'x is HI')
+        self.assertEqual(simplify('x is HI and c is not FALSE'), 'x is HI')
+        self.assertEqual(simplify('(x is HI or c is TRUE) and y is LO'),
+                         'y is LO')
+        self.assertEqual(simplify('x is HI and c is HALF'),
+                         'x is HI and 0.5')
+        self.assertEqual(simplify('x is HI and c is HALF', parameterize=True),
+                         'x is HI and c is HALF')
+
+    def test_constant_conditions_are_kept(self):
+        self.assertEqual(simplify('c is TRUE'), 'c is TRUE')
+        self.assertEqual(simplify('x is HI and c is FALSE'),
+                         'x is HI and c is FALSE')
+
+    def test_nested_rules(self):
+        rules = [[('if', 'x is HI',
+                   [('if', 'not not y is LO', [('=', 'z', 'TRUE')]),
+                    ('elif', 'y is HI or c is FALSE', [('=', 'z', 'FALSE')]),
+                    ('else', [('=', 'z', 'TRUE')])])]]
+        self.assertEqual(fold_constants(rules),
+                         [[('if', 'x is HI',
+                            [('if', 'y is LO', [('=', 'z', 'TRUE')]),
+                             ('elif', 'y is HI', [('=', 'z', 'FALSE')]),
+                             ('else', [('=', 'z', 'TRUE')])])]])
+
+
+class PassesTest(unittest.TestCase):
+    RULES = [[('if', 'x is HI and c is TRUE',
+               [('=', 'z', 'TRUE')]),
+              ('elif', 'y is LO', [('=', 'w', 'TRUE')]),
+              ('else', [('=', 'z', 'FALSE')])],
+             [('if', 'x is HI', [('=', 'w', 'FALSE')])]]
+
+    def new_program(self):
+        return Program(TYPE_DEFS,
+                       dict(x='XType', y='XType', c='CType'),
+                       dict(z='CType', w='CType', _d='XType'),
+                       dict(_d=('XType', 'y')),
+                       rules_to_ir(self.RULES))
+
+    def test_get_passes(self):
+        self.assertEqual(PassManager(get_passes({})).pass_names, [])
+        self.assertEqual(PassManager(get_passes(dict(simplify=True, outputs='z', cse=True))).pass_names,
+                         ['fold_constants', 'slice_outputs', 'common_memberships'])
+
+    def test_fold_constants(self):
+        program = PassManager([FoldConstantsPass()]).run(self.new_program())
+        self.assertEqual([str(condition) for condition in iter_conditions(program.rules)],
+                         ['x is HI', 'y is LO', 'x is HI'])
+
+    def test_slice_outputs(self):
+        program = PassManager([SliceOutputsPass(['w'])]).run(self.new_program())
+        self.assertEqual(ir_to_rules(program.rules),
+                         [[('if', 'x is HI and c is TRUE', []),
+                           ('elif', 'y is LO', [('=', 'w', 'TRUE')])],
+                          [('if', 'x is HI', [('=', 'w', 'FALSE')])]])
+        self.assertEqual(list(program.output_defs.keys()), ['w'])
+        self.assertEqual(list(program.derived_defs.keys()), [])
+
+        with self.assertRaises(ValueError) as cm:
+            SliceOutputsPass(['_d']).run(self.new_program())
+        self.assertEqual(str(cm.exception), 'Option "outputs" refers to unknown output "_d"')
+
+    def test_common_memberships(self):
+        program = PassManager([CommonMembershipsPass()]).run(self.new_program())
+        self.assertEqual(program.common_memberships, [('x', 'HI')])
@@ -3,6 +3,7 @@ import unittest
 import numpy as np
 
 import dectree.propfuncs as pf
+from dectree.codegen import _get_array_func_body
 
 
 class GeneratorsTest(unittest.TestCase):
@@ -193,11 +194,18 @@ class GeneratorsTest(unittest.TestCase):
         y_actual = g2(x)
         np.testing.assert_array_almost_equal(y_actual, y, err_msg=g2_code)
 
+        g3, g3_code = gen_func(f, f_params, array=True)
+        y_actual = g3(x)
+        np.testing.assert_array_almost_equal(y_actual, y, err_msg=g3_code)
 
-def gen_func(f, f_params, vectorize=False):
+
+def gen_func(f, f_params, vectorize=False, array=False):
     func_params, func_body_pattern = f(**f_params)
     func_body = func_body_pattern.format(**func_params)
     code_lines = []
+    if array:
+        func_body = _get_array_func_body(func_body)
+        code_lines.append('import numpy as np')
     if vectorize:
         code_lines.append('from numba import vectorize, float64')
         code_lines.append('@vectorize([float64(float64)])')
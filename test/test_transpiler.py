@@ -1,7 +1,15 @@
 import unittest
 import os.path
+import linecache
+import subprocess
+import sys
+import tempfile
+import textwrap
+import gc
+import weakref
 import numpy as np
-from dectree.codegen import VECTORIZE_PROP, FuzzyExprGen
+from dectree.codegen import VECTORIZE_PROP, VECTORIZE_FUNC, FuzzyExprGen
+from dectree.compiler import dispose
 from dectree.transpiler import transpile, compile
 from io import StringIO
 
@@ -39,6 +47,69 @@ def get_src(no1='false()', a='a', p1='P1', b='b', no2='NO'):
     return code.format(a=a, b=b, p1=p1, no1=no1, no2=no2)
 
 
+# The decision tree used by most tests, and input values for it
+TEST_SRC_FILE = os.path.join(os.path.dirname(__file__), 'dectree_test.yml')
+TEST_INPUTS = dict(glint=np.array([0.2, 0.3, 0.9, 0.5]),
+                   radiance=np.array([60.0, 80.0, 100.0, 10.0]))
+
+# A decision tree with two radiance inputs and a derived output,
+# see get_radiance_src()
+RADIANCE_SRC = """
+    types:
+        Radiance:
+            DARK: lt(20)
+            LOW: inv_ramp(x1=0, x2=127)
+            HIGH: ramp(x1=127, x2=255)
+            BRIGHT: ge(255)
+        Certain:
+            "YES": true()
+            "NO": false()
+    inputs:
+        - red: Radiance{red_dtype}
+        - blue: Radiance{blue_dtype}
+    outputs:
+        - bright: Certain
+        - dark: Certain
+        - mean: Radiance
+    derived:
+        - mean = (red + blue) / 2: Radiance
+    rules:
+        - |
+{rules}
+    """
+
+
+def get_radiance_src(rules, red_dtype='', blue_dtype=''):
+    rules = textwrap.indent(textwrap.dedent(rules).strip(), ' ' * 12)
+    return RADIANCE_SRC.format(rules=rules,
+                               red_dtype=red_dtype,
+                               blue_dtype=blue_dtype)
+
+
+def apply_compiled(compiled, input_values, param_values=None,
+                   vectorize=VECTORIZE_FUNC):
+    # Apply the rules returned by compile() to the given input arrays,
+    # with the given parameter values if parameterized
+    apply_rules, Inputs, Outputs = compiled[:3]
+    if vectorize == VECTORIZE_FUNC:
+        size = len(next(iter(input_values.values())))
+        inputs = Inputs(size)
+        outputs = Outputs(size)
+    else:
+        inputs = Inputs()
+        outputs = Outputs()
+    for var_name, values in input_values.items():
+        setattr(inputs, var_name, values)
+    if len(compiled) == 3:
+        apply_rules(inputs, outputs)
+        return outputs
+    params = compiled[3]()
+    for param_name, value in (param_values or {}).items():
+        setattr(params, param_name, value)
+    apply_rules(inputs, outputs, params)
+    return outputs
+
+
 class TranspileTest(unittest.TestCase):
     def test_transpile_success(self):
         src_file = StringIO(get_src())
@@ -219,3 +290,1048 @@ class TranspileTest(unittest.TestCase):
         np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
         np.testing.assert_almost_equal(outputs.certain, np.array([1.0, 1.0]))
 
+    def test_compile_parallel(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC,
+                                               parallel=True)
+        inputs = Inputs(2)
+        outputs = Outputs(2)
+
+        inputs.glint = np.array([0.2, 0.3])
+        inputs.radiance = np.array([60.0, 10.0])
+        apply_rules(inputs, outputs)
+        np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
+        np.testing.assert_almost_equal(outputs.certain, np.array([1.0, 1.0]))
+
+        apply_rules(inputs, outputs, 1)
+        np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
+
+    def test_transpile_parallel_failures(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(), parallel=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "parallel" requires JIT'
+                         ' and vectorize="func"')
+
+    def test_compile_cse(self):
+        src_code = """
+            types:
+                Radiance:
+                    LOW: inv_ramp(x1=0, x2=50)
+                    HIGH: ramp(x1=50, x2=120)
+                Certain:
+                    "YES": true()
+                    "NO": false()
+            inputs:
+                - red: Radiance
+                - blue: Radiance
+            outputs:
+                - dark: Certain
+                - bright: Certain
+            rules:
+                - |
+                    if red is LOW and blue is LOW:
+                        dark = YES
+                - |
+                    if red is not LOW and blue is HIGH:
+                        bright = YES
+                    else if red is HIGH:
+                        bright = YES
+            """
+        red = np.array([10.0, 60.0, 100.0])
+        blue = np.array([20.0, 100.0, 30.0])
+        for vectorize in (VECTORIZE_PROP, VECTORIZE_FUNC):
+            out_file = StringIO()
+            transpile(StringIO(src_code), out_file=out_file,
+                      vectorize=vectorize, cse=True)
+            self.assertIn('m_red_LOW = ', out_file.getvalue())
+            self.assertNotIn('m_blue_LOW = ', out_file.getvalue())
+
+            apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                                   vectorize=vectorize,
+                                                   cse=True)
+            if vectorize == VECTORIZE_FUNC:
+                inputs = Inputs(3)
+                outputs = Outputs(3)
+            else:
+                inputs = Inputs()
+                outputs = Outputs()
+
+            inputs.red = red
+            inputs.blue = blue
+            apply_rules(inputs, outputs)
+            np.testing.assert_almost_equal(outputs.dark,
+                                           np.array([0.6, 0.0, 0.0]))
+            np.testing.assert_almost_equal(
+                outputs.bright, np.array([0.0, 0.7142857, 0.7142857])
+            )
+
+    def test_compile_short_circuit(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+
+        out_file = StringIO()
+        transpile(src_file, out_file=out_file,
+                  vectorize=VECTORIZE_FUNC, short_circuit=True)
+        self.assertIn('if t1 != 0.0:', out_file.getvalue())
+
+        glint = np.array([0.2, 0.3, 0.6, 0.9, 0.4])
+        radiance = np.array([60.0, 10.0, 200.0, 0.0, 130.0])
+
+        results = []
+        for short_circuit in (False, True):
+            apply_rules, Inputs, Outputs = compile(src_file,
+                                                   vectorize=VECTORIZE_FUNC,
+                                                   short_circuit=short_circuit)
+            inputs = Inputs(glint.size)
+            outputs = Outputs(glint.size)
+            inputs.glint = glint
+            inputs.radiance = radiance
+            apply_rules(inputs, outputs)
+            results.append((outputs.cloudy, outputs.certain))
+        np.testing.assert_almost_equal(results[1][0],
+                                       results[0][0])
+        np.testing.assert_almost_equal(results[1][1],
+                                       results[0][1])
+
+        apply_rules, Inputs, Outputs = compile(src_file, short_circuit=True)
+        inputs = Inputs()
+        outputs = Outputs()
+        inputs.glint = 0.2
+        inputs.radiance = 60.
+        apply_rules(inputs, outputs)
+        self.assertAlmostEqual(outputs.cloudy, 0.6)
+        self.assertAlmostEqual(outputs.certain, 1.0)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(),
+                      vectorize=VECTORIZE_PROP, short_circuit=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "short_circuit" cannot be used with'
+                         ' vectorize="prop"')
+
+    def test_compile_crisp(self):
+        src_code = """
+            types:
+                Reflectance:
+                    DARK: lt(0.1)
+                    BRIGHT: ge(0.6)
+                    ZERO: eq(0.0)
+                Certain:
+                    "YES": true()
+                    "NO": false()
+            inputs:
+                - red: Reflectance
+                - nir: Reflectance
+            outputs:
+                - nodata: Certain
+                - water: Certain
+                - cloud: Certain
+            rules:
+                - |
+                    if red is ZERO and nir is ZERO:
+                        nodata = YES
+                    else if nir is DARK:
+                        water = YES
+                    else if red is not BRIGHT:
+                        cloud = NO
+                    else:
+                        cloud = YES
+            """
+        red = np.array([0.0, 0.05, 0.3, 0.7, 0.0])
+        nir = np.array([0.0, 0.05, 0.3, 0.8, 0.2])
+
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file,
+                  vectorize=VECTORIZE_FUNC, crisp=True)
+        self.assertIn('elif _Reflectance_DARK(inputs.nir[i]):',
+                      out_file.getvalue())
+
+        results = []
+        for crisp in (False, True):
+            apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                                   vectorize=VECTORIZE_FUNC,
+                                                   crisp=crisp)
+            inputs = Inputs(red.size)
+            outputs = Outputs(red.size)
+            inputs.red = red
+            inputs.nir = nir
+            apply_rules(inputs, outputs)
+            results.append(outputs)
+        fuzzy_outputs, crisp_outputs = results
+        self.assertEqual(crisp_outputs.nodata.dtype, np.bool_)
+        for name in ('nodata', 'water', 'cloud'):
+            np.testing.assert_equal(getattr(crisp_outputs, name),
+                                    getattr(fuzzy_outputs, name) == 1.0)
+
+        apply_rules, Inputs, Outputs = compile(StringIO(src_code), crisp=True)
+        inputs = Inputs()
+        outputs = Outputs()
+        inputs.red = 0.3
+        inputs.nir = 0.3
+        apply_rules(inputs, outputs)
+        self.assertEqual(outputs.nodata, False)
+        self.assertEqual(outputs.water, False)
+        self.assertEqual(outputs.cloud, False)
+
+        apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                               vectorize=VECTORIZE_FUNC,
+                                               crisp=True,
+                                               bitmask_output='mask')
+        module_dict = apply_rules.py_func.__globals__
+        self.assertEqual(module_dict['get_output_names'](), ('mask',))
+        self.assertEqual(module_dict['get_bitmask_names'](),
+                         ('nodata', 'water', 'cloud'))
+        inputs = Inputs(red.size)
+        outputs = Outputs(red.size)
+        inputs.red = red
+        inputs.nir = nir
+        apply_rules(inputs, outputs)
+        self.assertEqual(outputs.mask.dtype, np.uint8)
+        expected_mask = crisp_outputs.nodata \
+            + 2 * crisp_outputs.water.astype(np.uint8) \
+            + 4 * crisp_outputs.cloud.astype(np.uint8)
+        np.testing.assert_equal(outputs.mask, expected_mask)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(StringIO(src_code), out_file=StringIO(),
+                      bitmask_output='mask')
+        self.assertEqual(str(cm.exception),
+                         'Option "bitmask_output" requires "crisp"')
+
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(), crisp=True)
+        self.assertEqual(str(cm.exception),
+                         'Property "LOW" of type "Radiance" is not crisp:'
+                         ' inv_ramp(x1=0, x2=50)')
+
+    def test_compile_blocked(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_PROP,
+                                               block_size=2)
+        inputs = Inputs(5)
+        outputs = Outputs(5)
+        inputs.glint = np.array([0.2, 0.3, 0.6, 0.9, 0.4])
+        inputs.radiance = np.array([60.0, 10.0, 200.0, 0.0, 130.0])
+        apply_rules(inputs, outputs)
+
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_PROP)
+        expected_inputs = Inputs()
+        expected_outputs = Outputs()
+        expected_inputs.glint = inputs.glint
+        expected_inputs.radiance = inputs.radiance
+        apply_rules(expected_inputs, expected_outputs)
+        np.testing.assert_almost_equal(outputs.cloudy,
+                                       expected_outputs.cloudy)
+        np.testing.assert_almost_equal(outputs.certain,
+                                       expected_outputs.certain)
+        np.testing.assert_almost_equal(outputs.radiance_mod,
+                                       expected_outputs.radiance_mod)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(),
+                      vectorize=VECTORIZE_FUNC, block_size=1024)
+        self.assertEqual(str(cm.exception),
+                         'Option "block_size" must be a positive integer'
+                         ' and requires vectorize="prop"')
+
+    def test_compile_vectorized_no_jit(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_PROP,
+                                               no_jit=True)
+        inputs = Inputs()
+        outputs = Outputs()
+        inputs.glint = np.array([0.2, 0.3])
+        inputs.radiance = np.array([60.0, 10.0])
+        apply_rules(inputs, outputs)
+        np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
+        np.testing.assert_almost_equal(outputs.certain, np.array([1.0, 1.0]))
+
+    def test_compile_cached(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            apply_rules, Inputs, Outputs = compile(src_file,
+                                                   cache_dir=cache_dir)
+            module_files = [name for name in os.listdir(cache_dir)
+                            if name.endswith('.py')]
+            self.assertEqual(len(module_files), 1)
+            with open(os.path.join(cache_dir, module_files[0])) as fp:
+                self.assertIn('cache=True', fp.read())
+
+            apply_rules2, _, _ = compile(src_file, cache_dir=cache_dir)
+            self.assertIs(apply_rules2, apply_rules)
+            self.assertEqual(sorted(name for name in os.listdir(cache_dir)
+                                    if name.endswith('.py')),
+                             module_files)
+
+            compile(src_file, cache_dir=cache_dir, vectorize=VECTORIZE_PROP)
+            self.assertEqual(len([name for name in os.listdir(cache_dir)
+                                  if name.endswith('.py')]), 2)
+
+            inputs = Inputs()
+            outputs = Outputs()
+            inputs.glint = 0.2
+            inputs.radiance = 60.
+            apply_rules(inputs, outputs)
+            self.assertAlmostEqual(outputs.cloudy, 0.6)
+            self.assertAlmostEqual(outputs.certain, 1.0)
+
+            # Another process imports the stored module and loads the
+            # machine code Numba has cached for it
+            child_code = textwrap.dedent('''
+                import sys
+                from dectree.compiler import compile
+                apply_rules, Inputs, Outputs = compile(sys.argv[1],
+                                                       cache_dir=sys.argv[2])
+                inputs = Inputs()
+                outputs = Outputs()
+                inputs.glint = 0.2
+                inputs.radiance = 60.
+                apply_rules(inputs, outputs)
+                cache_hits = sum(sum(obj.stats.cache_hits.values())
+                                 for obj in vars(sys.modules[
+                                     apply_rules.__module__]).values()
+                                 if hasattr(obj, 'stats'))
+                print(outputs.cloudy, cache_hits)
+                ''')
+            root_dir = os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)))
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join(
+                [root_dir] + [path for path
+                              in [env.get('PYTHONPATH')] if path]
+            )
+            process = subprocess.run([sys.executable, '-c', child_code,
+                                      os.path.abspath(src_file), cache_dir],
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE,
+                                     universal_newlines=True,
+                                     env=env)
+            self.assertEqual(process.returncode, 0, process.stderr)
+            cloudy, cache_hits = process.stdout.split()
+            self.assertAlmostEqual(float(cloudy), 0.6)
+            self.assertGreater(int(cache_hits), 0)
+
+    def test_compile_in_memory_and_dispose(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file)
+        module_dict = apply_rules.py_func.__globals__
+        self.assertTrue(module_dict['__file__'].startswith('<dectree:'))
+        self.assertIn(module_dict['__file__'], linecache.cache)
+
+        inputs = Inputs()
+        outputs = Outputs()
+        inputs.glint = 0.2
+        inputs.radiance = 60.
+        apply_rules(inputs, outputs)
+        self.assertAlmostEqual(outputs.cloudy, 0.6)
+
+        file_name = module_dict['__file__']
+        apply_rules_ref = weakref.ref(apply_rules)
+        py_func_ref = weakref.ref(apply_rules.py_func)
+        # Numba classes are enough to find the module
+        dispose(Inputs)
+        self.assertNotIn(file_name, linecache.cache)
+        del apply_rules, module_dict
+        gc.collect()
+        self.assertIsNone(apply_rules_ref())
+        self.assertIsNone(py_func_ref())
+
+        # Numba cannot cache the functions of in-memory modules
+        with self.assertRaises(ValueError) as cm:
+            compile(src_file, jit_cache=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "jit_cache" requires a cache_dir, as Numba'
+                         ' cannot cache the functions of in-memory modules')
+        with open(src_file) as fp:
+            src_code = fp.read().replace('options:\n',
+                                         'options:\n  jit_cache: true\n')
+        apply_rules, Inputs, Outputs = compile(StringIO(src_code))
+        module_dict = apply_rules.py_func.__globals__
+        self.assertNotIn('cache=True', ''.join(
+            linecache.getlines(module_dict['__file__'])))
+        dispose(apply_rules)
+
+    def test_compile_warmup(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        out_file = StringIO()
+        transpile(src_file, out_file=out_file, vectorize=VECTORIZE_FUNC)
+        code = out_file.getvalue()
+        self.assertIn('@jit(float64(float64), nopython=True)', code)
+        self.assertIn('@jit(void(Inputs.class_type.instance_type,'
+                      ' Outputs.class_type.instance_type), nopython=True)',
+                      code)
+
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC,
+                                               warmup=True)
+        self.assertEqual(len(apply_rules.signatures), 1)
+        inputs = Inputs(2)
+        outputs = Outputs(2)
+        inputs.glint = np.array([0.2, 0.3])
+        inputs.radiance = np.array([60.0, 10.0])
+        apply_rules(inputs, outputs)
+        np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
+
+        # Classes take a size if the source's options say so
+        with open(src_file) as fp:
+            src_code = fp.read().replace('options:\n',
+                                         'options:\n'
+                                         '  vectorize: func\n')
+        apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                               warmup=True)
+        inputs = Inputs(2)
+        outputs = Outputs(2)
+        inputs.glint = np.array([0.2, 0.3])
+        inputs.radiance = np.array([60.0, 10.0])
+        apply_rules(inputs, outputs)
+        np.testing.assert_almost_equal(outputs.cloudy, np.array([0.6, 0.0]))
+
+    def test_compile_array_kernel(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC,
+                                               array_kernel=True)
+        apply_rules_kernel = apply_rules.py_func.__globals__[
+            'apply_rules_kernel']
+        glint = np.array([0.2, 0.3])
+        radiance = np.array([60.0, 10.0])
+        cloudy = np.zeros(2)
+        certain = np.zeros(2)
+        radiance_mod = np.zeros(2)
+        apply_rules_kernel(glint, radiance, cloudy, certain, radiance_mod)
+        np.testing.assert_almost_equal(cloudy, np.array([0.6, 0.0]))
+        np.testing.assert_almost_equal(certain, np.array([1.0, 1.0]))
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(), array_kernel=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "array_kernel" requires JIT and'
+                         ' vectorize="func"')
+
+    def test_compile_arrays(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC,
+                                               arrays=True)
+        module_dict = apply_rules.py_func.__globals__
+        self.assertEqual(module_dict['get_input_names'](),
+                         ('glint', 'radiance'))
+        self.assertEqual(module_dict['get_output_names'](),
+                         ('cloudy', 'certain', 'radiance_mod'))
+        apply_rules_arrays = module_dict['apply_rules_arrays']
+        inputs = np.array([[0.2, 0.3],
+                           [60.0, 10.0]])
+        outputs = np.zeros((3, 2))
+        apply_rules_arrays(inputs, outputs)
+        np.testing.assert_almost_equal(outputs[0], np.array([0.6, 0.0]))
+        np.testing.assert_almost_equal(outputs[1], np.array([1.0, 1.0]))
+
+        with self.assertRaises(ValueError) as cm:
+            apply_rules_arrays(inputs, np.zeros((2, 2)))
+        self.assertEqual(str(cm.exception),
+                         'inputs and outputs must have shapes'
+                         ' (2, N) and (3, N)')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(), arrays=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "arrays" requires JIT and vectorize="func"')
+
+        # The arrays function passes its rows to the kernel, quantized
+        # outputs are converted
+        apply_rules, Inputs, Outputs, Params = compile(
+            src_file, vectorize=VECTORIZE_FUNC, arrays=True,
+            parameterize=True, quantize='uint8')
+        module_dict = apply_rules.py_func.__globals__
+        self.assertIn('apply_rules_kernel', module_dict)
+        outputs = np.zeros((3, 2))
+        module_dict['apply_rules_arrays'](inputs, outputs, Params())
+        np.testing.assert_equal(outputs[0], np.array([153.0, 0.0]))
+        np.testing.assert_equal(outputs[1], np.array([255.0, 255.0]))
+
+    def test_compile_from_arrays(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC)
+        module_dict = apply_rules.py_func.__globals__
+        glint = np.array([0.2, 0.3])
+        radiance = np.array([60.0, 10.0])
+        inputs = module_dict['inputs_from_arrays'](glint, radiance)
+        self.assertTrue(np.shares_memory(inputs.glint, glint))
+        self.assertTrue(np.shares_memory(inputs.radiance, radiance))
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            buffer = np.memmap(os.path.join(out_dir, 'outputs.bin'),
+                               dtype=np.float64, mode='w+', shape=(3, 2))
+            outputs = module_dict['outputs_from_arrays'](buffer[0],
+                                                         buffer[1],
+                                                         buffer[2])
+            apply_rules(inputs, outputs)
+            np.testing.assert_almost_equal(buffer[0], np.array([0.6, 0.0]))
+            np.testing.assert_almost_equal(buffer[1], np.array([1.0, 1.0]))
+            del outputs, buffer
+
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_PROP)
+        module_dict = apply_rules.py_func.__globals__
+        self.assertIn('inputs_from_arrays', module_dict)
+        self.assertNotIn('outputs_from_arrays', module_dict)
+
+    def test_compile_intermediates(self):
+        src_code = """
+            types:
+                Radiance:
+                    LOW: inv_ramp(x1=0, x2=50)
+                    HIGH: ramp(x1=50, x2=120)
+                Certain:
+                    "YES": true()
+                    "NO": false()
+            inputs:
+                - red: Radiance
+                - blue: Radiance
+            outputs:
+                - bright: Certain
+            derived:
+                - _mean = (red + blue) / 2: Radiance
+                - mean = _mean: Radiance
+            rules:
+                - |
+                    if _mean is HIGH:
+                        bright = YES
+            """
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file,
+                  vectorize=VECTORIZE_FUNC)
+        code = out_file.getvalue()
+        self.assertNotIn('_mean = np.zeros', code)
+        self.assertIn('_mean = (inputs.red[i] + inputs.blue[i]) / 2', code)
+
+        apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                               vectorize=VECTORIZE_FUNC)
+        inputs = Inputs(3)
+        outputs = Outputs(3)
+        inputs.red = np.array([10.0, 60.0, 150.0])
+        inputs.blue = np.array([20.0, 100.0, 130.0])
+        apply_rules(inputs, outputs)
+        np.testing.assert_almost_equal(outputs.mean,
+                                       np.array([15.0, 80.0, 140.0]))
+        np.testing.assert_almost_equal(outputs.bright,
+                                       np.array([0.0, 30.0 / 70.0, 1.0]))
+
+    def test_compile_outputs(self):
+        src_file = os.path.join(os.path.dirname(__file__),
+                                'dectree_test.yml')
+        out_file = StringIO()
+        transpile(src_file, out_file=out_file, outputs=['cloudy'])
+        code = out_file.getvalue()
+        self.assertNotIn('outputs.certain', code)
+        self.assertIn('outputs.radiance_mod', code)
+        # Trailing "else" parts only assign "certain"
+        self.assertNotIn('else:', code)
+        self.assertNotIn('if glint == HIGH:', code)
+
+        out_file = StringIO()
+        transpile(src_file, out_file=out_file, outputs='certain')
+        code = out_file.getvalue()
+        self.assertNotIn('outputs.cloudy', code)
+        self.assertIn('if glint == HIGH:', code)
+
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC,
+                                               outputs=['certain'])
+        module_dict = apply_rules.py_func.__globals__
+        self.assertEqual(module_dict['get_output_names'](),
+                         ('certain', 'radiance_mod'))
+        inputs = Inputs(3)
+        outputs = Outputs(3)
+        inputs.glint = np.array([0.2, 0.3, 0.9])
+        inputs.radiance = np.array([60.0, 10.0, 200.0])
+        apply_rules(inputs, outputs)
+
+        apply_rules, Inputs, Outputs = compile(src_file,
+                                               vectorize=VECTORIZE_FUNC)
+        expected_inputs = Inputs(3)
+        expected_outputs = Outputs(3)
+        expected_inputs.glint = inputs.glint
+        expected_inputs.radiance = inputs.radiance
+        apply_rules(expected_inputs, expected_outputs)
+        np.testing.assert_almost_equal(outputs.certain,
+                                       expected_outputs.certain)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(src_file, out_file=StringIO(), outputs=['cloudiness'])
+        self.assertEqual(str(cm.exception),
+                         'Option "outputs" refers to unknown'
+                         ' output "cloudiness"')
+
+    def test_compile_class_output(self):
+        out_file = StringIO()
+        transpile(TEST_SRC_FILE, out_file=out_file, vectorize=VECTORIZE_FUNC,
+                  class_output='label', class_values='cloudy=7,certain=300',
+                  class_confidence='confidence')
+        code = out_file.getvalue()
+        self.assertIn('("label", uint16[:]),', code)
+        self.assertNotIn('("cloudy",', code)
+        self.assertNotIn('outputs.certain', code)
+        self.assertIn('o_certain = ', code)
+
+        expected_outputs = apply_compiled(
+            compile(TEST_SRC_FILE, vectorize=VECTORIZE_FUNC), TEST_INPUTS)
+        truths = np.array([expected_outputs.cloudy, expected_outputs.certain])
+
+        compiled = compile(TEST_SRC_FILE, vectorize=VECTORIZE_FUNC,
+                           class_output='label', class_confidence='confidence')
+        module_dict = compiled[0].py_func.__globals__
+        self.assertEqual(module_dict['get_output_names'](),
+                         ('radiance_mod', 'label', 'confidence'))
+        outputs = apply_compiled(compiled, TEST_INPUTS)
+        self.assertEqual(outputs.label.dtype, np.uint8)
+        expected_labels = np.where(truths.max(axis=0) > 0.0,
+                                   truths.argmax(axis=0) + 1, 0)
+        np.testing.assert_equal(outputs.label, expected_labels)
+        np.testing.assert_almost_equal(outputs.confidence,
+                                       truths.max(axis=0))
+        np.testing.assert_almost_equal(outputs.radiance_mod,
+                                       expected_outputs.radiance_mod)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(),
+                      class_output='label', class_values='cloudiness=1')
+        self.assertEqual(str(cm.exception),
+                         'Option "class_values" refers to unknown'
+                         ' output "cloudiness"')
+
+        # Class values of outputs removed by slicing are ignored
+        out_file = StringIO()
+        transpile(TEST_SRC_FILE, out_file=out_file, vectorize=VECTORIZE_FUNC,
+                  outputs='certain', class_output='label',
+                  class_values='cloudy=7,certain=3')
+        code = out_file.getvalue()
+        self.assertIn('("label", uint8[:]),', code)
+        self.assertNotIn('o_cloudy', code)
+        self.assertIn('o_certain = ', code)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(), outputs='certain',
+                      class_output='label', class_values='cloudiness=1')
+        self.assertEqual(str(cm.exception),
+                         'Option "class_values" refers to unknown'
+                         ' output "cloudiness"')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(), outputs='certain',
+                      class_output='label', class_values='cloudy=1')
+        self.assertEqual(str(cm.exception),
+                         'Option "class_values" refers to none'
+                         ' of the requested outputs')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(),
+                      class_output='label', class_values={'cloudy': 70000})
+        self.assertEqual(str(cm.exception),
+                         'Class value of output "cloudy" must be an integer'
+                         ' in the range 1 to 65535')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(),
+                      class_output='cloudy')
+        self.assertEqual(str(cm.exception),
+                         'Option "class_output" must be the name'
+                         ' of a new output, got "cloudy"')
+
+    def test_compile_quantize(self):
+        out_file = StringIO()
+        transpile(TEST_SRC_FILE, out_file=out_file, vectorize=VECTORIZE_FUNC,
+                  quantize='uint8')
+        code = out_file.getvalue()
+        self.assertIn('("cloudy", uint8[:]),', code)
+        self.assertIn('("radiance_mod", float64[:]),', code)
+        self.assertIn('outputs.cloudy[i] = np.uint8(o_cloudy * 255.0 + 0.5)',
+                      code)
+
+        expected_outputs = apply_compiled(
+            compile(TEST_SRC_FILE, vectorize=VECTORIZE_FUNC), TEST_INPUTS)
+
+        for quantize, quantize_scale, max_value in (('uint8', 0.0, 255),
+                                                    ('uint16', 1000.0, 1000)):
+            outputs = apply_compiled(
+                compile(TEST_SRC_FILE,
+                        vectorize=VECTORIZE_FUNC,
+                        quantize=quantize,
+                        quantize_scale=quantize_scale),
+                TEST_INPUTS
+            )
+            for var_name in ('cloudy', 'certain'):
+                values = getattr(outputs, var_name)
+                expected_values = getattr(expected_outputs, var_name)
+                self.assertEqual(values.dtype, np.dtype(quantize))
+                np.testing.assert_equal(
+                    values,
+                    np.floor(expected_values * max_value + 0.5)
+                )
+            np.testing.assert_almost_equal(outputs.radiance_mod,
+                                           expected_outputs.radiance_mod)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(), quantize='uint8',
+                      quantize_scale=1000.0)
+        self.assertEqual(str(cm.exception),
+                         'Option "quantize_scale" must be in the range'
+                         ' 0 to 255 for "uint8"')
+
+    def test_compile_simplify(self):
+        src_code = """
+            types:
+                Radiance:
+                    LOW: inv_ramp(x1=0, x2=50)
+                    HIGH: ramp(x1=50, x2=120)
+                Certain:
+                    "YES": true()
+                    "NO": false()
+            inputs:
+                - red: Radiance
+                - blue: Radiance
+            outputs:
+                - bright: Certain
+                - dark: Certain
+            rules:
+                - |
+                    if red is HIGH and bright is YES:
+                        bright = YES
+                    elif not not blue is HIGH or dark is NO:
+                        bright = YES
+                        dark = NO
+                    else:
+                        dark = YES
+            """
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file, simplify=True)
+        code = out_file.getvalue()
+        self.assertNotIn('_Certain_YES(outputs', code)
+        self.assertNotIn('_Certain_NO(outputs', code)
+        self.assertIn('t1 = _Radiance_HIGH(inputs.red)', code)
+        self.assertIn('t1 = 1.0 - t1', code)
+        self.assertIn('t2 = min(t1, _Radiance_HIGH(inputs.blue))', code)
+
+        red = np.array([10.0, 60.0, 100.0, 130.0])
+        blue = np.array([20.0, 100.0, 30.0, 80.0])
+        for vectorize in (VECTORIZE_PROP, VECTORIZE_FUNC):
+            results = []
+            for simplify in (False, True):
+                apply_rules, Inputs, Outputs = compile(StringIO(src_code),
+                                                       vectorize=vectorize,
+                                                       simplify=simplify)
+                if vectorize == VECTORIZE_FUNC:
+                    inputs = Inputs(4)
+                    outputs = Outputs(4)
+                else:
+                    inputs = Inputs()
+                    outputs = Outputs()
+                inputs.red = red
+                inputs.blue = blue
+                apply_rules(inputs, outputs)
+                results.append((outputs.bright.copy(), outputs.dark.copy()))
+            np.testing.assert_almost_equal(results[1][0], results[0][0])
+            np.testing.assert_almost_equal(results[1][1], results[0][1])
+
+    def test_compile_bucketing(self):
+        src_code = get_radiance_src("""
+            if red is HIGH or red is BRIGHT:
+                bright = YES
+            elif blue is LOW and not red is DARK:
+                dark = NO
+            else:
+                dark = YES
+            """)
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file,
+                  vectorize=VECTORIZE_FUNC, bucketing=True)
+        code = out_file.getvalue()
+        self.assertIn('_Radiance_BREAKPOINTS'
+                      ' = np.array([0.0, 20.0, 127.0, 255.0])', code)
+        self.assertIn('k_red = _Radiance_bucket(inputs.red[i])', code)
+        self.assertIn('_Radiance_BRIGHT_TRUTHS[k_red]', code)
+        self.assertIn('_Radiance_HIGH_bucketed(inputs.red[i], k_red)', code)
+
+        input_values = dict(
+            red=np.array([10.0, 20.0, 127.0, 200.0, 255.0, 300.0, np.nan]),
+            blue=np.array([20.0, 0.0, 30.0, 80.0, np.nan, 127.0, 10.0])
+        )
+        results = []
+        for bucketing in (False, True):
+            outputs = apply_compiled(compile(StringIO(src_code),
+                                             vectorize=VECTORIZE_FUNC,
+                                             bucketing=bucketing),
+                                     input_values)
+            results.append((outputs.bright, outputs.dark, outputs.mean))
+        for values, expected_values in zip(results[1], results[0]):
+            np.testing.assert_equal(values, expected_values)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(StringIO(src_code), vectorize=VECTORIZE_PROP,
+                      bucketing=True)
+        self.assertEqual(str(cm.exception),
+                         'Option "bucketing" cannot be used with'
+                         ' vectorize="prop", "parameterize", or "crisp"')
+
+    def test_compile_lookup_dtypes(self):
+        rules = """
+            if red is HIGH and blue is not LOW:
+                bright = YES
+            """
+        out_file = StringIO()
+        transpile(StringIO(get_radiance_src(rules, red_dtype='[uint8]')),
+                  out_file=out_file, vectorize=VECTORIZE_FUNC)
+        code = out_file.getvalue()
+        self.assertIn('_Radiance_HIGH_uint8 = np.array('
+                      '[_Radiance_HIGH(x) for x in range(256)],'
+                      ' dtype=np.float64)', code)
+        self.assertIn('("red", uint8[:]),', code)
+        self.assertIn('_Radiance_HIGH_uint8[inputs.red[i]]', code)
+        self.assertIn('outputs.mean[i] = (np.float64(inputs.red[i])'
+                      ' + inputs.blue[i]) / 2', code)
+
+        red = np.array([0, 100, 200, 250, 255], dtype=np.uint8)
+        blue = np.array([255.0, 20.0, 200.0, 100.0, 255.0])
+        for vectorize in (VECTORIZE_PROP, VECTORIZE_FUNC):
+            results = []
+            for red_dtype in ('', '[uint8]'):
+                src_code = get_radiance_src(rules, red_dtype=red_dtype)
+                input_values = dict(
+                    red=red if red_dtype else red.astype(np.float64),
+                    blue=blue
+                )
+                outputs = apply_compiled(compile(StringIO(src_code),
+                                                 vectorize=vectorize),
+                                         input_values,
+                                         vectorize=vectorize)
+                results.append((outputs.bright, outputs.mean))
+            np.testing.assert_equal(results[1][0], results[0][0])
+            np.testing.assert_equal(results[1][1], results[0][1])
+
+        # Inputs of built-in types have no lookup tables
+        with open(TEST_SRC_FILE) as fp:
+            src_code = fp.read().replace('  radiance: Radiance\n',
+                                         '  radiance: Radiance[uint8]\n'
+                                         '  idx: int[uint16]\n')
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file,
+                  vectorize=VECTORIZE_FUNC)
+        code = out_file.getvalue()
+        self.assertIn('_Radiance_HIGH_uint8 = ', code)
+        self.assertNotIn('_int_', code)
+        outputs = apply_compiled(
+            compile(StringIO(src_code), vectorize=VECTORIZE_FUNC),
+            dict(TEST_INPUTS,
+                 radiance=TEST_INPUTS['radiance'].astype(np.uint8),
+                 idx=np.arange(4, dtype=np.uint16))
+        )
+        expected_outputs = apply_compiled(
+            compile(TEST_SRC_FILE, vectorize=VECTORIZE_FUNC), TEST_INPUTS)
+        np.testing.assert_almost_equal(outputs.cloudy,
+                                       expected_outputs.cloudy)
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(StringIO(get_radiance_src(rules,
+                                                red_dtype='[complex64]')))
+        self.assertEqual(str(cm.exception),
+                         'Unsupported dtype "complex64" of input "red",'
+                         ' must be one of int8, int16, int32, int64,'
+                         ' uint8, uint16, uint32, uint64, float32, float64')
+
+    def test_compile_input_dtypes(self):
+        rules = """
+            if red is HIGH or blue is not LOW:
+                bright = YES
+            """
+        out_file = StringIO()
+        transpile(StringIO(get_radiance_src(rules, red_dtype='[int16]',
+                                            blue_dtype='[float32]')),
+                  out_file=out_file, vectorize=VECTORIZE_FUNC,
+                  parameterize=True)
+        code = out_file.getvalue()
+        self.assertIn('("red", int16[:]),', code)
+        self.assertIn('("blue", float32[:]),', code)
+        self.assertIn('_Radiance_HIGH(np.float64(inputs.red[i]),'
+                      ' x1=params.Radiance_HIGH_x1,', code)
+
+        red = np.array([-100, 50, 130, 200, 450], dtype=np.int16)
+        blue = np.array([400.0, 2.0, 60.0, 10.0, 90.5], dtype=np.float32)
+        for vectorize in (VECTORIZE_PROP, VECTORIZE_FUNC):
+            results = []
+            for red_dtype, blue_dtype in (('', ''), ('[int16]', '[float32]')):
+                src_code = get_radiance_src(rules, red_dtype=red_dtype,
+                                            blue_dtype=blue_dtype)
+                input_values = dict(
+                    red=red if red_dtype else red.astype(np.float64),
+                    blue=blue if blue_dtype else blue.astype(np.float64)
+                )
+                outputs = apply_compiled(compile(StringIO(src_code),
+                                                 vectorize=vectorize),
+                                         input_values,
+                                         vectorize=vectorize)
+                results.append(outputs.bright)
+            np.testing.assert_equal(results[1], results[0])
+
+    def test_compile_param_arrays(self):
+        with open(TEST_SRC_FILE) as fp:
+            src_code = fp.read().replace('  radiance: Radiance\n',
+                                         '  radiance: Radiance\n'
+                                         '  region: int[uint8]\n')
+        input_values = dict(TEST_INPUTS,
+                            region=np.array([0, 1, 1, 0], dtype=np.uint8))
+        x1 = np.array([40.0, 70.0])
+
+        out_file = StringIO()
+        transpile(StringIO(src_code), out_file=out_file,
+                  vectorize=VECTORIZE_FUNC, parameterize=True,
+                  param_arrays='Radiance_HIGH_x1', region_input='region')
+        code = out_file.getvalue()
+        self.assertIn('("Radiance_HIGH_x1", float64[:]),', code)
+        self.assertIn('x1=params.Radiance_HIGH_x1[inputs.region[i]]', code)
+        self.assertIn('x2=params.Radiance_HIGH_x2)', code)
+
+        compiled = compile(StringIO(src_code),
+                           vectorize=VECTORIZE_FUNC,
+                           parameterize=True)
+        expected_cloudy = [
+            apply_compiled(compiled, input_values,
+                           dict(Radiance_HIGH_x1=region_x1)).cloudy
+            for region_x1 in x1
+        ]
+        expected_cloudy = np.where(input_values['region'] == 0,
+                                   expected_cloudy[0],
+                                   expected_cloudy[1])
+
+        for vectorize, region_input in ((VECTORIZE_FUNC, 'region'),
+                                        (VECTORIZE_FUNC, ''),
+                                        (VECTORIZE_PROP, 'region'),
+                                        (VECTORIZE_PROP, '')):
+            compiled = compile(StringIO(src_code),
+                               vectorize=vectorize,
+                               parameterize=True,
+                               param_arrays='Radiance_HIGH_x1',
+                               region_input=region_input)
+            region_x1 = x1 if region_input else x1[input_values['region']]
+            outputs = apply_compiled(compiled, input_values,
+                                     dict(Radiance_HIGH_x1=region_x1),
+                                     vectorize=vectorize)
+            np.testing.assert_almost_equal(outputs.cloudy, expected_cloudy)
+
+        compiled = compile(StringIO(src_code),
+                           vectorize=VECTORIZE_FUNC,
+                           parameterize=True,
+                           param_arrays='*')
+        with self.assertRaises(ValueError) as cm:
+            apply_compiled(compiled, input_values)
+        self.assertEqual(str(cm.exception),
+                         'parameter array Radiance_LOW_x1 must have'
+                         ' a value for each element')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(StringIO(src_code), out_file=StringIO(),
+                      vectorize=VECTORIZE_FUNC, parameterize=True,
+                      param_arrays='Radiance_HIGH_x3')
+        self.assertEqual(str(cm.exception),
+                         'Option "param_arrays" refers to unknown'
+                         ' parameter "Radiance_HIGH_x3"')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(StringIO(src_code), out_file=StringIO(),
+                      parameterize=True, param_arrays='*',
+                      region_input='glint')
+        self.assertEqual(str(cm.exception),
+                         'Option "region_input" must be the name of an input'
+                         ' declared with an unsigned integer dtype,'
+                         ' got "glint"')
+
+    def test_compile_sweep(self):
+        param_matrix = np.array([[50.0, 120.0],
+                                 [40.0, 100.0],
+                                 [70.0, 130.0]])
+
+        out_file = StringIO()
+        transpile(TEST_SRC_FILE, out_file=out_file,
+                  vectorize=VECTORIZE_FUNC, parameterize=True,
+                  sweep='Radiance_HIGH_x1,Radiance_HIGH_x2')
+        code = out_file.getvalue()
+        # Memberships not depending on the swept parameters are hoisted
+        self.assertIn('\n        m_glint_LOW = _Glint_LOW(v_glint,'
+                      ' x1=params.Glint_LOW_x1, x2=params.Glint_LOW_x2)\n',
+                      code)
+        self.assertIn('\n            t3 = min(t2, m_glint_HIGH)\n', code)
+        self.assertIn('_Radiance_HIGH(v_radiance,'
+                      ' x1=param_matrix[k, 0], x2=param_matrix[k, 1])', code)
+
+        for options in ({}, {'parallel': True},
+                        {'cse': True, 'short_circuit': True}):
+            compiled = compile(TEST_SRC_FILE,
+                               vectorize=VECTORIZE_FUNC,
+                               parameterize=True,
+                               sweep='Radiance_HIGH_x1,Radiance_HIGH_x2',
+                               **options)
+            apply_rules, Inputs, Outputs, Params = compiled
+            module_dict = apply_rules.py_func.__globals__
+            self.assertEqual(module_dict['get_sweep_param_names'](),
+                             ('Radiance_HIGH_x1', 'Radiance_HIGH_x2'))
+            apply_rules_sweep = module_dict['apply_rules_sweep']
+            inputs = Inputs(4)
+            inputs.glint = TEST_INPUTS['glint']
+            inputs.radiance = TEST_INPUTS['radiance']
+            # Parameters not swept are taken from the params object
+            params = Params()
+            params.Glint_HIGH_x1 = 0.4
+            outputs_cube = np.zeros((3, 3, 4))
+            apply_rules_sweep(inputs, params, param_matrix, outputs_cube)
+            for k, (x1, x2) in enumerate(param_matrix):
+                outputs = apply_compiled(compiled, TEST_INPUTS,
+                                         dict(Glint_HIGH_x1=0.4,
+                                              Radiance_HIGH_x1=x1,
+                                              Radiance_HIGH_x2=x2))
+                np.testing.assert_almost_equal(outputs_cube[k, 0],
+                                               outputs.cloudy)
+                np.testing.assert_almost_equal(outputs_cube[k, 1],
+                                               outputs.certain)
+                np.testing.assert_almost_equal(outputs_cube[k, 2],
+                                               outputs.radiance_mod)
+
+            with self.assertRaises(ValueError) as cm:
+                apply_rules_sweep(inputs, params, param_matrix,
+                                  np.zeros((2, 3, 4)))
+            self.assertEqual(str(cm.exception),
+                             'param_matrix and outputs must have shapes'
+                             ' (K, 2) and (K, 3, N)')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(),
+                      parameterize=True, sweep='*')
+        self.assertEqual(str(cm.exception),
+                         'Option "sweep" requires "parameterize", JIT,'
+                         ' and vectorize="func"')
+
+        with self.assertRaises(ValueError) as cm:
+            transpile(TEST_SRC_FILE, out_file=StringIO(),
+                      vectorize=VECTORIZE_FUNC, parameterize=True,
+                      sweep='*', class_output='label')
+        self.assertEqual(str(cm.exception),
+                         'Option "sweep" cannot be used with'
+                         ' "param_arrays", "class_output", "quantize",'
+                         ' or "bitmask_output"')